@@ -0,0 +1,160 @@
+"""
+In-process prefix indexes of id/name pairs for the typeahead endpoint
+"""
+import os
+import time
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+from database import execute_query_async
+
+logger = logging.getLogger(__name__)
+
+# How often an index checks table_stats for writes made by other workers
+AUTOCOMPLETE_REFRESH_SECONDS = float(os.getenv('AUTOCOMPLETE_REFRESH_SECONDS', 30))
+
+def normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+def word_suffixes(key: str) -> List[str]:
+    """"acme steel ltd" -> ["steel ltd", "ltd"], so any word of a name can match"""
+    words = key.split(" ")
+    return [" ".join(words[i:]) for i in range(1, len(words))]
+
+class PrefixIndex:
+    """Sorted (key, row_id) arrays of one table's names, answered with bisect.
+
+    Names matching from their first word rank before names matching from a
+    later one. The create/update/delete handlers apply their own writes at
+    once; writes from other workers (or psql) show up within
+    AUTOCOMPLETE_REFRESH_SECONDS through the table's table_stats version.
+    """
+
+    def __init__(self, table: str):
+        self.table = table
+        self._names: Dict[int, str] = {}
+        self._starts: List[Tuple[str, int]] = []
+        self._words: List[Tuple[str, int]] = []
+        self._version: Optional[int] = None
+        self._loaded = False
+        self._checked_at = 0.0
+        self._load_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Writes made while a reload is in flight, replayed onto its result
+        self._pending: Optional[List[Tuple[int, Optional[str], bool]]] = None
+
+    async def search(self, prefix: str, limit: int) -> List[Dict]:
+        if not self._loaded:
+            async with self._load_lock:
+                if not self._loaded:
+                    await self._load()
+        elif time.monotonic() - self._checked_at > AUTOCOMPLETE_REFRESH_SECONDS and self._refresh_task is None:
+            # Answer from the current index; catch up in the background
+            self._checked_at = time.monotonic()
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return self.lookup(prefix, limit)
+
+    def lookup(self, prefix: str, limit: int) -> List[Dict]:
+        prefix = normalize(prefix)
+        ids: List[int] = []
+        for entries in (self._starts, self._words):
+            i = bisect_left(entries, (prefix,))
+            while i < len(entries) and len(ids) < limit and entries[i][0].startswith(prefix):
+                if entries[i][1] not in ids:
+                    ids.append(entries[i][1])
+                i += 1
+        return [{"id": row_id, "name": self._names[row_id]} for row_id in ids]
+
+    def add(self, row_id: int, name: str):
+        """Apply a create"""
+        self._apply(row_id, name, False)
+
+    def rename(self, row_id: int, name: str):
+        """Apply an update; ids the index does not hold are left alone"""
+        self._apply(row_id, name, True)
+
+    def remove(self, row_id: int):
+        self._apply(row_id, None, False)
+
+    def _apply(self, row_id: int, name: Optional[str], known_only: bool):
+        if self._pending is not None:
+            self._pending.append((row_id, name, known_only))
+        if not self._loaded or (known_only and row_id not in self._names):
+            return
+        self._remove(row_id)
+        if name is not None:
+            self._add(row_id, name)
+
+    def _add(self, row_id: int, name: str):
+        key = normalize(name)
+        self._names[row_id] = name
+        insort(self._starts, (key, row_id))
+        for suffix in word_suffixes(key):
+            insort(self._words, (suffix, row_id))
+
+    def _remove(self, row_id: int):
+        name = self._names.pop(row_id, None)
+        if name is None:
+            return
+        key = normalize(name)
+        for entries, entry_keys in ((self._starts, [key]), (self._words, word_suffixes(key))):
+            for entry_key in entry_keys:
+                i = bisect_left(entries, (entry_key, row_id))
+                if i < len(entries) and entries[i] == (entry_key, row_id):
+                    del entries[i]
+
+    async def load(self):
+        """(Re)build the index from the table"""
+        async with self._load_lock:
+            await self._load()
+
+    async def _load(self):
+        self._pending = []
+        try:
+            # Version and rows from one snapshot, as in count_rows
+            rows = await execute_query_async(
+                f"SELECT (SELECT version FROM table_stats WHERE table_name = %s) as version, id, name FROM {self.table}",
+                (self.table,), fetch_all=True
+            )
+            names = {row['id']: row['name'] for row in rows}
+            starts = []
+            words = []
+            for row_id, name in names.items():
+                key = normalize(name)
+                starts.append((key, row_id))
+                words.extend((suffix, row_id) for suffix in word_suffixes(key))
+            starts.sort()
+            words.sort()
+
+            self._names, self._starts, self._words = names, starts, words
+            self._version = rows[0]['version'] if rows else await self._current_version()
+            self._loaded = True
+            self._checked_at = time.monotonic()
+            pending, self._pending = self._pending, None
+            for change in pending:
+                self._apply(*change)
+        finally:
+            self._pending = None
+        logger.info(f"Autocomplete index for {self.table} loaded with {len(self._names)} names")
+
+    async def _current_version(self) -> Optional[int]:
+        result = await execute_query_async(
+            "SELECT version FROM table_stats WHERE table_name = %s", (self.table,), fetch_one=True
+        )
+        return result['version'] if result else None
+
+    async def _refresh(self):
+        try:
+            version = await self._current_version()
+            # Without table_stats there is no version to compare, so reload
+            if version is None or version != self._version:
+                await self.load()
+        except Exception as e:
+            logger.warning(f"Autocomplete index refresh for {self.table} failed: {e}")
+        finally:
+            self._refresh_task = None
+
+# Global autocomplete indexes, one per entity
+autocomplete_indexes = {table: PrefixIndex(table) for table in ("customers", "suppliers", "users")}
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN check for the route queries.
+Plans each query of routes/projects.py and routes/customers.py that relies on
+an index, plus the foreign key actions behind deleting a customer, user or
+project, and reports whether the planner uses the expected indexes.
+
+The statements come from the route modules' own query builders and from
+sql_json, so what is planned is what the routes send, including the
+row_to_json wrappers of the JSON lists and the customer workspace.
+
+Nothing is executed: the queries are only EXPLAINed, inside a transaction
+that is rolled back. On a database with little data the planner rightly
+prefers sequential scans; pass --no-seqscan there to check that each index
+at least matches its query.
+"""
+
+import asyncio
+import psycopg2
+from psycopg2 import Error
+import os
+import sys
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from database import cleanup_database, cleanup_database_async
+from pagination import sort_clause, output_order, where_clause, offset_page_query
+from sql_json import json_rows_query, json_document_query
+from routes.projects import (
+    PROJECT_SORTS, QUOTE_SORTS, ACCOUNT_SORTS, project_filters, quote_filters, account_filters,
+    project_list_query, quote_list_query, account_list_query, CUSTOMER_PROJECTS_BY_DATE, CUSTOMER_ACCOUNTS_BY_DATE
+)
+from routes.customers import (
+    CUSTOMER_AFTER_CURSOR, CUSTOMER_QUOTES_BY_DATE, customer_filters, customer_page_query, workspace_sections
+)
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'database': os.getenv('DB_NAME', 'postgres'),
+    'user': os.getenv('DB_USER', 'postgres'),
+    'password': os.getenv('DB_PASSWORD', ''),
+    'port': int(os.getenv('DB_PORT', 5432))
+}
+
+# The statements PostgreSQL runs for ON DELETE CASCADE / SET NULL:
+# (what, statement, parameters, indexes its plan must use)
+FOREIGN_KEY_CHECKS = [
+    ("DELETE /customers/{id}: cascade to projects",
+     "DELETE FROM ONLY projects WHERE customer_id = %s", (1,), ["idx_projects_customer_id_date"]),
+    ("DELETE /customers/{id}: cascade to quotes",
+     "DELETE FROM ONLY quotes WHERE customer_id = %s", (1,), ["idx_quotes_customer_id_date"]),
+    ("DELETE /customers/{id}: cascade to accounts",
+     "DELETE FROM ONLY customer_accounts WHERE customer_id = %s", (1,), ["idx_customer_accounts_customer_id_date"]),
+    ("DELETE /projects/{id}: unlink accounts",
+     "UPDATE ONLY customer_accounts SET project_id = NULL WHERE project_id = %s", (1,), ["idx_customer_accounts_project_id"]),
+    ("DELETE /users/{id}: unlink project engineers",
+     "UPDATE ONLY projects SET engineer_id = NULL WHERE engineer_id = %s", (1,), ["idx_projects_engineer_id"]),
+    ("DELETE /users/{id}: unlink project salesmen",
+     "UPDATE ONLY projects SET salesman_id = NULL WHERE salesman_id = %s", (1,), ["idx_projects_salesman_id"]),
+    ("DELETE /users/{id}: unlink quote engineers",
+     "UPDATE ONLY quotes SET engineer_id = NULL WHERE engineer_id = %s", (1,), ["idx_quotes_engineer_id"]),
+    ("DELETE /users/{id}: unlink quote salesmen",
+     "UPDATE ONLY quotes SET salesman_id = NULL WHERE salesman_id = %s", (1,), ["idx_quotes_salesman_id"]),
+    ("DELETE /users/{id}: unlink customer sales reps",
+     "UPDATE ONLY customers SET sales_rep_id = NULL WHERE sales_rep_id = %s", (1,), ["idx_customers_sales_rep_id"]),
+]
+
+async def json_list_check(what, list_query, filters, sorts, alias, expected):
+    """First page of a JSON list route, as paginated_response sends it"""
+    conditions, params = filters
+    order_by = sort_clause(None, None, sorts, "date", "desc", f"{alias}.id")
+    query = offset_page_query(list_query(where_clause(conditions), order_by))
+    params += (10, 0)
+    # Rows sql_json cannot encode are listed by the plain query
+    return (what, await json_rows_query(query, output_order(order_by, alias), params) or query, params, expected)
+
+async def route_checks():
+    """(what, statement as the route sends it, parameters, indexes its plan must use)"""
+    # None (and a failed check) if the workspace falls back to one query per section
+    workspace, workspace_params = await json_document_query(workspace_sections(1)) or (None, None)
+    after_cursor = [CUSTOMER_AFTER_CURSOR]
+    return [
+        ("GET /customers/{id}/projects", CUSTOMER_PROJECTS_BY_DATE, (1,), ["idx_projects_customer_id_date"]),
+        ("GET /customers/{id}/quotes", CUSTOMER_QUOTES_BY_DATE, (1,), ["idx_quotes_customer_id_date"]),
+        ("GET /customers/{id}/accounts", CUSTOMER_ACCOUNTS_BY_DATE, (1,), ["idx_customer_accounts_customer_id_date"]),
+        ("GET /customers/{id}/workspace", workspace, workspace_params, [
+            "idx_customers_id_name", "idx_quotes_customer_id_date", "idx_projects_customer_id_date",
+            "idx_customer_accounts_customer_id_date"
+        ]),
+        ("GET /customers?page=1", customer_page_query(where_clause(customer_filters()[0]), keyset=False),
+         (11, 0), ["idx_customers_name_id"]),
+        ("GET /customers?cursor=", customer_page_query(where_clause(after_cursor), keyset=True),
+         ("Acme", 1, 11), ["idx_customers_name_id"]),
+        await json_list_check("GET /projects?page=1", project_list_query, project_filters(), PROJECT_SORTS, "p",
+                              ["idx_projects_date_id", "idx_customers_id_name", "idx_users_id_name"]),
+        await json_list_check("GET /projects?page=1&status=", project_list_query, project_filters(status="Active"),
+                              PROJECT_SORTS, "p", ["idx_projects_status_date_id"]),
+        await json_list_check("GET /quotes?page=1", quote_list_query, quote_filters(), QUOTE_SORTS, "q",
+                              ["idx_quotes_date_id", "idx_customers_id_name", "idx_users_id_name"]),
+        await json_list_check("GET /accounts?page=1", account_list_query, account_filters(), ACCOUNT_SORTS, "ca",
+                              ["idx_customer_accounts_date_id", "idx_customers_id_name", "idx_projects_id_name"]),
+        await json_list_check("GET /accounts?page=1&status=outstanding", account_list_query,
+                              account_filters(status="outstanding"), ACCOUNT_SORTS, "ca",
+                              ["idx_customer_accounts_open_date_id"]),
+    ]
+
+async def build_checks():
+    """Every check; the JSON wrappers need the column types, so this reads the catalog"""
+    try:
+        return await route_checks() + FOREIGN_KEY_CHECKS
+    finally:
+        await cleanup_database_async()
+        cleanup_database()
+
+def plan_indexes(node):
+    """Names of the indexes a JSON plan node and its children read"""
+    indexes = {node['Index Name']} if 'Index Name' in node else set()
+    for child in node.get('Plans', []):
+        indexes |= plan_indexes(child)
+    return indexes
+
+def check_indexes(no_seqscan=False):
+    """EXPLAIN every check; True if all of them use their indexes."""
+    connection = None
+    try:
+        connection = psycopg2.connect(**DB_CONFIG)
+        cursor = connection.cursor()
+        if no_seqscan:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        checks = asyncio.run(build_checks())
+        failed = 0
+        for what, query, params, expected in checks:
+            if query is None:
+                failed += 1
+                print(f"❌ {what}: not encoded in SQL, so not one statement to plan")
+                continue
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {query}", params)
+            used = plan_indexes(cursor.fetchone()[0][0]['Plan'])
+            missing = [index for index in expected if index not in used]
+            if missing:
+                failed += 1
+                print(f"❌ {what}: does not use {', '.join(missing)} (uses {', '.join(sorted(used)) or 'no index'})")
+            else:
+                print(f"✅ {what}: {', '.join(expected)}")
+
+        print(f"\n{len(checks) - failed} of {len(checks)} queries use their indexes")
+        return failed == 0
+
+    except Exception as e:
+        print(f"❌ Error checking indexes: {e}")
+        return False
+
+    finally:
+        if connection:
+            connection.rollback()
+            connection.close()
+
+if __name__ == "__main__":
+    success = check_indexes(no_seqscan="--no-seqscan" in sys.argv[1:])
+    sys.exit(0 if success else 1)
@@ -0,0 +1,159 @@
+"""
+Response compression: content coding negotiation, compressors, and a cache
+of compressed bodies for responses identified by an ETag
+"""
+import os
+import zlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Bodies smaller than this are sent as they are: compressing them saves
+# less than it costs
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_CACHE_BYTES = int(os.getenv('COMPRESSION_CACHE_BYTES', 64 * 1024 * 1024))
+GZIP_LEVEL = 6
+# Brotli's fast end: compresses better than gzip -6 in about the same time
+BROTLI_QUALITY = 4
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/x-ndjson", "application/javascript",
+    "application/xml", "image/svg+xml"
+)
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """The coding to use for an Accept-Encoding header: br, gzip or None"""
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, parameters = part.strip().partition(";")
+        quality = 1.0
+        if parameters.strip().startswith("q="):
+            try:
+                quality = float(parameters.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[coding.strip()] = quality
+
+    available = ["br", "gzip"] if brotli is not None else ["gzip"]
+    candidates = [
+        coding for coding in available
+        if offered.get(coding, offered.get("*", 0.0)) > 0
+    ]
+    if not candidates:
+        return None
+    # Highest quality wins; on a tie the order of available (br first)
+    return max(candidates, key=lambda coding: (offered.get(coding, offered.get("*", 0.0)), -available.index(coding)))
+
+class Compressor:
+    """Incremental compressor for one response body"""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._compress = compressor.process
+            self._flush = compressor.flush
+            self._finish = compressor.finish
+        else:
+            compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress = compressor.compress
+            self._flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = compressor.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def flush(self) -> bytes:
+        """The rest of what was compressed so far, decodable by the client now"""
+        return self._flush()
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+def compress(data: bytes, encoding: str) -> bytes:
+    compressor = Compressor(encoding)
+    return compressor.compress(data) + compressor.finish()
+
+class CompressedHit(Exception):
+    """A cached compressed body answers the request before the route runs"""
+
+    def __init__(self, content_type: str, encoding: str, body: bytes):
+        self.content_type = content_type
+        self.encoding = encoding
+        self.body = body
+
+def cache_key(scope: Scope, etag: str, encoding: str) -> tuple:
+    return (scope["path"], scope.get("query_string", b""), etag, encoding)
+
+class CompressedCache:
+    """Compressed bodies by (URL, ETag, coding), least recently used first out.
+
+    A response with the same ETag at the same URL has the same body, so
+    its compressed form can be sent again instead of compressing the body
+    anew. Bounded by the total size of the bodies held.
+    """
+
+    def __init__(self, max_bytes: int = COMPRESSION_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bodies = OrderedDict()
+        self._size = 0
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, key: tuple) -> Optional[Tuple[str, bytes]]:
+        """(content type, compressed body) or None"""
+        with self._lock:
+            entry = self._bodies.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            self._bodies.move_to_end(key)
+            return entry
+
+    @property
+    def max_body_bytes(self) -> int:
+        """One body may take at most a quarter of the cache"""
+        return self.max_bytes // 4
+
+    def put(self, key: tuple, content_type: str, body: bytes):
+        if len(body) > self.max_body_bytes:
+            return
+        with self._lock:
+            previous = self._bodies.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[1])
+            self._bodies[key] = (content_type, body)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._bodies.popitem(last=False)
+                self._size -= len(evicted)
+
+    def check(self, scope: Scope, etag: str):
+        """Raise CompressedHit if a GET's response for etag is cached in a
+        coding the client accepts, so the route need not build the body"""
+        if scope["method"] != "GET":
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            return
+        entry = self.get(cache_key(scope, etag, encoding))
+        if entry is not None:
+            raise CompressedHit(entry[0], encoding, entry[1])
+
+    def get_status(self):
+        with self._lock:
+            return {"entries": len(self._bodies), "bytes": self._size, "max_bytes": self.max_bytes, **self._stats}
+
+# Global compressed body cache
+compressed_cache = CompressedCache()
@@ -0,0 +1,81 @@
+"""
+Conditional GET: ETags for list and detail endpoints, and 304 Not Modified
+"""
+import os
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+
+from compression import compressed_cache
+from database import execute_query_async
+from responses import encode_json
+
+logger = logging.getLogger(__name__)
+
+# Part of every ETag: set it to the release id so clients refetch after a
+# deploy that changes what the endpoints return
+ETAG_RELEASE = os.getenv('ETAG_RELEASE', '')
+
+class NotModified(Exception):
+    """The client's copy is current; answered with 304 and no body"""
+
+    def __init__(self, etag: str):
+        self.etag = etag
+
+def make_etag(*parts: Any) -> str:
+    # Weak: the same data may be sent compressed or encoded differently
+    digest = hashlib.sha1(repr((ETAG_RELEASE,) + parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:24]}"'
+
+def content_etag(content: Any) -> str:
+    """ETag of a response body, for data already held in memory"""
+    return make_etag(hashlib.sha1(encode_json(content)).hexdigest())
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison against an If-None-Match header"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+def check_etag(request: Request, etag: str):
+    """Raise NotModified if the client already holds etag, or CompressedHit
+    if its compressed body is cached; otherwise the response carries it
+    (see ConditionalGetMiddleware)"""
+    request.state.etag = etag
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        raise NotModified(etag)
+    compressed_cache.check(request.scope, etag)
+
+async def table_versions(*tables: str) -> Optional[Dict[str, int]]:
+    """Change versions of tables from table_stats, or None if one is not tracked"""
+    rows = await execute_query_async(
+        "SELECT table_name, version FROM table_stats WHERE table_name = ANY(%s)",
+        (list(tables),), fetch_all=True
+    )
+    versions = {row['table_name']: row['version'] for row in rows}
+    if len(versions) != len(tables):
+        logger.warning(f"No table_stats for {', '.join(sorted(set(tables) - set(versions)))}; sending no ETag")
+        return None
+    return versions
+
+def table_etag(*tables: str):
+    """Dependency for a GET whose response depends only on tables and the URL.
+
+    The ETag combines the URL with the tables' table_stats versions, so an
+    unchanged response is answered with one primary key lookup before the
+    route runs its query. The versions are read like the route's data: from
+    the request's replica (see ReplicaRouter), whose data is then at least
+    as new as the versions, or from the primary.
+    """
+    async def dependency(request: Request):
+        versions = await table_versions(*tables)
+        if versions is None:
+            return
+        check_etag(request, make_etag(
+            request.url.path, request.url.query, request.headers.get("accept", ""), sorted(versions.items())
+        ))
+    return dependency
@@ -2,13 +2,27 @@
 Database connection pool manager for PostgreSQL
 """
 import os
+import time
+import asyncio
+import threading
+import re
+import uuid
+import itertools
+import contextvars
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import psycopg2
-from psycopg2 import pool, Error
+import psycopg2.errors
+from psycopg2 import Error
 from psycopg2.extras import RealDictCursor
-from contextlib import contextmanager
-from typing import Optional, Any, Dict, List, Union
+import psycopg
+from psycopg.rows import dict_row, tuple_row
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
+from contextlib import contextmanager, asynccontextmanager, closing, aclosing
+from typing import Optional, Any, Dict, List, Union, Iterator, AsyncIterator
 import logging
 from dotenv import load_dotenv
+from query_stats import query_stats
 
 # Load environment variables
 load_dotenv()
@@ -17,21 +31,268 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# "psycopg" uses the native async pool, "threadpool" runs the psycopg2 helpers
+# on the bounded DatabaseExecutor instead
+ASYNC_BACKEND = os.getenv('DB_ASYNC_BACKEND', 'psycopg').lower()
+
+def get_db_config() -> Dict[str, Any]:
+    """Database connection settings shared by the sync and async pools"""
+    return {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'database': os.getenv('DB_NAME', 'postgres'),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD', ''),
+        'port': int(os.getenv('DB_PORT', 5432))
+    }
+
+def get_replica_configs() -> List[tuple]:
+    """(name, settings) for each DB_REPLICA_HOSTS entry, given as host or host:port.
+
+    Replicas share DB_NAME, DB_USER and DB_PASSWORD with the primary.
+    """
+    replicas = []
+    for entry in os.getenv('DB_REPLICA_HOSTS', '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        db_config = get_db_config()
+        host, separator, port = entry.rpartition(':')
+        if separator and port.isdigit():
+            db_config['host'], db_config['port'] = host, int(port)
+        else:
+            db_config['host'] = entry
+        replicas.append((f"replica-{len(replicas) + 1}", db_config))
+    return replicas
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection frees up within DB_POOL_TIMEOUT"""
+
+class RowSet:
+    """Column names once plus plain tuple rows.
+
+    Cheaper than a dict per row: no per-row key storage and no second copy.
+    responses.py serializes it directly as a JSON array of objects.
+    """
+
+    __slots__ = ('columns', 'rows')
+
+    def __init__(self, columns: List[str], rows: List[tuple]):
+        self.columns = columns
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __bool__(self) -> bool:
+        return bool(self.rows)
+
+    def to_dicts(self) -> List[Dict]:
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in self.rows]
+
+# FOR UPDATE, FOR NO KEY UPDATE, FOR SHARE and FOR KEY SHARE
+_LOCKING_CLAUSE = re.compile(r'\bfor\s+(?:no\s+key\s+)?update\b|\bfor\s+(?:key\s+)?share\b')
+
+def is_read_query(query: str) -> bool:
+    """True for plain SELECTs (and EXPLAINs that do not run the statement),
+    which are safe to retry and need no commit"""
+    statement = query.lstrip().lower()
+    if statement.startswith('explain'):
+        return 'analyze' not in statement
+    return statement.startswith('select') and not ('for' in statement and _LOCKING_CLAUSE.search(statement))
+
+def _is_connection_error(error: Exception) -> bool:
+    """True when an error means the connection itself is gone, not the statement"""
+    if isinstance(error, PoolTimeout):
+        return False
+    if not isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError,
+                              psycopg.OperationalError, psycopg.InterfaceError)):
+        return False
+    code = getattr(error, 'pgcode', None) or getattr(error, 'sqlstate', None)
+    return code is None or code.startswith('08') or code in ('57P01', '57P02', '57P03')
+
+class PooledConnection(psycopg2.extensions.connection):
+    """psycopg2 connection carrying the bookkeeping the pool needs"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.broken = False
+        # SQL text -> server-side prepared statement name, least recently used first
+        self.statements = OrderedDict()
+
+_PLACEHOLDER = re.compile(r'%(s|%)')
+_PREPARABLE = re.compile(r'\s*(select|insert|update|delete|with|values)\b', re.IGNORECASE)
+
+class PreparedStatementCache:
+    """Transparently PREPAREs hot statements on each pooled connection.
+
+    A statement is prepared on a connection once the process has run it
+    DB_PREPARE_THRESHOLD times; each connection keeps at most
+    DB_PREPARED_MAX statements and deallocates the least recently used.
+    """
+
+    def __init__(self):
+        self.threshold = int(os.getenv('DB_PREPARE_THRESHOLD', 5))
+        self.max_size = int(os.getenv('DB_PREPARED_MAX', 100))
+        self._lock = threading.Lock()
+        self._uses = OrderedDict()
+        self._unpreparable = set()
+        self._next_id = 0
+        self._stats = {"hits": 0, "misses": 0, "prepared": 0, "evicted": 0, "failed": 0}
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _should_prepare(self, query: str) -> bool:
+        with self._lock:
+            if query in self._unpreparable:
+                return False
+            uses = self._uses.pop(query, 0) + 1
+            self._uses[query] = uses
+            # Dynamic SQL must not grow the usage table without bound
+            while len(self._uses) > self.max_size * 10:
+                self._uses.popitem(last=False)
+            return uses >= self.threshold
+
+    def _mark_unpreparable(self, query: str):
+        with self._lock:
+            self._unpreparable.add(query)
+            self._stats["failed"] += 1
+
+    @staticmethod
+    def _to_positional(query: str, params) -> Optional[str]:
+        """Rewrite %s placeholders as $n, or None if the query can't be prepared"""
+        if not _PREPARABLE.match(query):
+            return None
+        if params is None:
+            return query
+        if not isinstance(params, (tuple, list)):
+            return None
+
+        position = 0
+        def substitute(match):
+            nonlocal position
+            if match.group(1) == '%':
+                return '%'
+            position += 1
+            return f'${position}'
+
+        converted = _PLACEHOLDER.sub(substitute, query)
+        return converted if position == len(params) else None
+
+    @staticmethod
+    def _execute_statement(cursor, name: str, params):
+        if params:
+            cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+        else:
+            cursor.execute(f"EXECUTE {name}")
+
+    def execute(self, cursor, query: str, params=None):
+        """cursor.execute() that reuses a prepared statement when one exists"""
+        connection = cursor.connection
+        if self.threshold <= 0 or not isinstance(connection, PooledConnection):
+            cursor.execute(query, params)
+            return
+
+        name = connection.statements.get(query)
+        if name is not None:
+            connection.statements.move_to_end(query)
+            self._count("hits")
+            try:
+                self._execute_statement(cursor, name, params)
+                return
+            except psycopg2.errors.InvalidSqlStatementName:
+                # Someone ran DEALLOCATE behind our back
+                connection.rollback()
+                del connection.statements[query]
+            except psycopg2.errors.FeatureNotSupported:
+                # "cached plan must not change result type" after a schema change
+                connection.rollback()
+                del connection.statements[query]
+                cursor.execute(f"DEALLOCATE {name}")
+            cursor.execute(query, params)
+            return
+
+        self._count("misses")
+        if not self._should_prepare(query):
+            cursor.execute(query, params)
+            return
+
+        converted = self._to_positional(query, params)
+        if converted is None:
+            self._mark_unpreparable(query)
+            cursor.execute(query, params)
+            return
+
+        with self._lock:
+            self._next_id += 1
+            name = f"ps_{self._next_id}"
+        try:
+            cursor.execute(f"PREPARE {name} AS {converted}")
+        except Error as e:
+            logger.info(f"Statement will not be prepared: {e}")
+            connection.rollback()
+            self._mark_unpreparable(query)
+            cursor.execute(query, params)
+            return
+
+        connection.statements[query] = name
+        self._count("prepared")
+        while len(connection.statements) > self.max_size:
+            _, evicted = connection.statements.popitem(last=False)
+            cursor.execute(f"DEALLOCATE {evicted}")
+            self._count("evicted")
+
+        self._execute_statement(cursor, name, params)
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            return {
+                "threshold": self.threshold,
+                "max_per_connection": self.max_size,
+                "hit_ratio": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+                **stats
+            }
+
+# Global prepared statement cache
+prepared_statements = PreparedStatementCache()
+
+class _Waiter:
+    """A thread queued for a connection; woken with a connection or a free slot"""
+
+    __slots__ = ('event', 'connection', 'may_open')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.connection = None
+        self.may_open = False
+
 class DatabasePool:
-    """Singleton database connection pool manager"""
+    """Database connection pool manager, one instance per server (primary or replica)"""
 
-    _instance = None
-    _pool = None
+    _instances: Dict[str, 'DatabasePool'] = {}
     _initialized = False
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(DatabasePool, cls).__new__(cls)
-        return cls._instance
+    def __new__(cls, name: str = 'primary', db_config: Optional[Dict[str, Any]] = None):
+        if name not in cls._instances:
+            instance = super(DatabasePool, cls).__new__(cls)
+            instance.name = name
+            instance._config_override = db_config
+            cls._instances[name] = instance
+        return cls._instances[name]
 
-    def __init__(self):
+    def __init__(self, name: str = 'primary', db_config: Optional[Dict[str, Any]] = None):
         # Don't initialize pool in __init__ to avoid import-time errors
         pass
+
+    @property
+    def db_config(self) -> Dict[str, Any]:
+        return self._config_override or get_db_config()
     
     def _initialize_pool(self):
         """Initialize the connection pool"""
@@ -40,16 +301,10 @@ class DatabasePool:
 
         try:
             # Database configuration
-            db_config = {
-                'host': os.getenv('DB_HOST', 'localhost'),
-                'database': os.getenv('DB_NAME', 'postgres'),
-                'user': os.getenv('DB_USER', 'postgres'),
-                'password': os.getenv('DB_PASSWORD', ''),
-                'port': int(os.getenv('DB_PORT', 5432))
-            }
+            db_config = self.db_config
 
             # Debug logging
-            logger.info(f"Database config: host={db_config['host']}, database={db_config['database']}, user={db_config['user']}, port={db_config['port']}")
+            logger.info(f"Database config ({self.name}): host={db_config['host']}, database={db_config['database']}, user={db_config['user']}, port={db_config['port']}")
             logger.info(f"Password provided: {'Yes' if db_config['password'] else 'No'}")
 
             # Validate required configuration
@@ -57,133 +312,802 @@ class DatabasePool:
                 logger.warning("No database password provided. This may cause connection failures.")
 
             # Pool configuration
-            min_connections = int(os.getenv('DB_POOL_MIN', 2))
-            max_connections = int(os.getenv('DB_POOL_MAX', 20))
+            self._db_config = db_config
+            self._minconn = int(os.getenv('DB_POOL_MIN', 2))
+            self._maxconn = int(os.getenv('DB_POOL_MAX', 20))
+            self._timeout = float(os.getenv('DB_POOL_TIMEOUT', 10))
+            self._resize_interval = float(os.getenv('DB_POOL_RESIZE_INTERVAL', 60))
+            self._ping_after = float(os.getenv('DB_POOL_PING_AFTER', 5))
+            self._max_lifetime = float(os.getenv('DB_POOL_MAX_LIFETIME', 3600))
+            self._max_idle = float(os.getenv('DB_POOL_MAX_IDLE', 600))
+
+            self._lock = threading.Lock()
+            self._idle = deque()
+            self._waiters = deque()
+            self._in_use = 0
+            self._opening = 0
+            self._window_start = time.monotonic()
+            self._window_peak = 0
+            # Connections idle since before this instant are pinged before reuse
+            self._validate_before = 0.0
+            self._stats = {
+                "connections_opened": 0,
+                "connections_closed": 0,
+                "validations": 0,
+                "validation_failures": 0,
+                "discarded_broken": 0,
+                "expired_lifetime": 0,
+                "reaped_idle": 0,
+                "acquire_waits": 0,
+                "acquire_timeouts": 0,
+                "total_wait": 0.0,
+                "max_wait": 0.0
+            }
 
             logger.info(f"Attempting to connect to database at {db_config['host']}:{db_config['port']}")
 
-            self._pool = psycopg2.pool.ThreadedConnectionPool(
-                minconn=min_connections,
-                maxconn=max_connections,
-                **db_config
-            )
+            for _ in range(self._minconn):
+                self._idle.append(self._open_connection())
+
+            self._stop_reaper = threading.Event()
+            self._reaper = threading.Thread(target=self._reap_loop, name=f"db-pool-reaper-{self.name}", daemon=True)
+            self._reaper.start()
 
             self._initialized = True
-            logger.info(f"Database pool initialized with {min_connections}-{max_connections} connections")
+            logger.info(f"Database pool '{self.name}' initialized with {self._minconn}-{self._maxconn} connections")
 
         except Exception as e:
-            logger.error(f"Failed to initialize database pool: {e}")
-            self._pool = None
+            logger.error(f"Failed to initialize database pool '{self.name}': {e}")
+            for connection in getattr(self, '_idle', ()):
+                connection.close()
             self._initialized = False
             raise
-    
+
+    def _open_connection(self):
+        connection = psycopg2.connect(connection_factory=PooledConnection, **self._db_config)
+        with self._lock:
+            self._stats["connections_opened"] += 1
+        return connection
+
+    def _close_connection(self, connection):
+        try:
+            connection.close()
+        except Exception as e:
+            logger.error(f"Error closing pooled connection: {e}")
+        with self._lock:
+            self._stats["connections_closed"] += 1
+
+    def _total(self) -> int:
+        return len(self._idle) + self._in_use + self._opening
+
+    def _release_slot(self):
+        """A connection was dropped: let the first waiter open a replacement.
+
+        Must be called with the lock held.
+        """
+        if self._waiters and self._total() < self._maxconn:
+            waiter = self._waiters.popleft()
+            waiter.may_open = True
+            self._opening += 1
+            waiter.event.set()
+
+    def _finish_open(self):
+        """Open a connection for a reserved slot, giving the slot back on failure"""
+        try:
+            connection = self._open_connection()
+        except Exception:
+            with self._lock:
+                self._opening -= 1
+                self._release_slot()
+            raise
+        with self._lock:
+            self._opening -= 1
+            self._in_use += 1
+            self._window_peak = max(self._window_peak, self._in_use)
+        return connection
+
     def get_connection(self):
-        """Get a connection from the pool"""
+        """Get a validated connection from the pool, waiting in FIFO order when all are busy"""
         # Initialize pool if not already done
         if not self._initialized:
             self._initialize_pool()
 
-        if self._pool is None:
-            raise Exception("Database pool not initialized")
+        while True:
+            connection = self._acquire()
+            if self._is_usable(connection):
+                return connection
+            self._discard(connection)
 
-        try:
-            connection = self._pool.getconn()
-            if connection:
+    def _acquire(self):
+        with self._lock:
+            # Only take an idle connection if nobody queued ahead of us
+            if self._idle and not self._waiters:
+                connection = self._idle.pop()
+                self._in_use += 1
+                self._window_peak = max(self._window_peak, self._in_use)
                 return connection
+
+            if not self._waiters and self._total() < self._maxconn:
+                self._opening += 1
+                grow = True
             else:
-                raise Exception("Unable to get connection from pool")
-        except Exception as e:
-            logger.error(f"Error getting connection from pool: {e}")
-            raise
-    
+                grow = False
+                waiter = _Waiter()
+                self._waiters.append(waiter)
+                self._stats["acquire_waits"] += 1
+
+        if grow:
+            return self._finish_open()
+
+        started = time.monotonic()
+        waiter.event.wait(self._timeout)
+        waited = time.monotonic() - started
+
+        with self._lock:
+            self._stats["total_wait"] += waited
+            self._stats["max_wait"] = max(self._stats["max_wait"], waited)
+            if not waiter.event.is_set():
+                self._waiters.remove(waiter)
+                self._stats["acquire_timeouts"] += 1
+                raise PoolTimeoutError(
+                    f"Timed out after {self._timeout}s waiting for a database connection "
+                    f"({self._maxconn} in use, {len(self._waiters)} waiting)"
+                )
+
+        if waiter.may_open:
+            return self._finish_open()
+        return waiter.connection
+
+    def _is_usable(self, connection) -> bool:
+        """Cheap checkout validation: age checks always, a ping only when the
+        connection sat idle for a while or predates a connection failure"""
+        if connection.closed or connection.broken:
+            return False
+
+        now = time.monotonic()
+        if now - connection.created_at > self._max_lifetime:
+            with self._lock:
+                self._stats["expired_lifetime"] += 1
+            return False
+
+        if now - connection.last_used <= self._ping_after and connection.last_used >= self._validate_before:
+            return True
+
+        with self._lock:
+            self._stats["validations"] += 1
+        try:
+            # Autocommit keeps the ping to a single round trip (no BEGIN/ROLLBACK)
+            connection.autocommit = True
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            connection.autocommit = False
+            return True
+        except Error as e:
+            logger.warning(f"Discarding pooled connection that failed validation: {e}")
+            with self._lock:
+                self._stats["validation_failures"] += 1
+                # One dead connection usually means the server restarted or
+                # failed over: make every idle connection prove itself
+                self._validate_before = time.monotonic()
+            return False
+
+    def _discard(self, connection):
+        """Drop a checked-out connection and free its slot"""
+        with self._lock:
+            self._in_use -= 1
+            self._stats["discarded_broken"] += 1
+            self._release_slot()
+        self._close_connection(connection)
+
+    def _handoff_or_idle(self, connection) -> List[Any]:
+        """Give a connection to the oldest waiter or park it as idle.
+
+        Must be called with the lock held; returns the connections to close.
+        """
+        if self._waiters:
+            waiter = self._waiters.popleft()
+            waiter.connection = connection
+            waiter.event.set()
+            return []
+        self._in_use -= 1
+        self._idle.append(connection)
+        return self._shrink()
+
     def return_connection(self, connection):
-        """Return a connection to the pool"""
-        if self._pool and connection:
+        """Return a connection to the pool, handing it straight to the oldest waiter"""
+        if not connection:
+            return
+        if not self._initialized:
+            # The pool was closed while this connection was checked out
+            connection.close()
+            return
+
+        discard = connection.closed or connection.broken
+        if not discard and connection.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
             try:
-                self._pool.putconn(connection)
+                connection.rollback()
             except Exception as e:
-                logger.error(f"Error returning connection to pool: {e}")
-    
+                logger.error(f"Error resetting connection before returning it to the pool: {e}")
+                discard = True
+        if not discard and connection.autocommit:
+            # Undo the read-only fast path; this is client-side, no round trip
+            connection.autocommit = False
+
+        if discard:
+            with self._lock:
+                # A connection-level failure: revalidate the rest before reuse
+                self._validate_before = time.monotonic()
+            self._discard(connection)
+            return
+
+        if time.monotonic() - connection.created_at > self._max_lifetime:
+            with self._lock:
+                self._stats["expired_lifetime"] += 1
+                self._in_use -= 1
+                self._release_slot()
+            self._close_connection(connection)
+            return
+
+        connection.last_used = time.monotonic()
+        with self._lock:
+            to_close = self._handoff_or_idle(connection)
+
+        for stale in to_close:
+            self._close_connection(stale)
+
+    def _reap_loop(self):
+        interval = max(1.0, min(self._max_idle, self._max_lifetime) / 10)
+        while not self._stop_reaper.wait(interval):
+            try:
+                self.reap()
+            except Exception as e:
+                logger.error(f"Database pool reaper failed: {e}")
+
+    def reap(self):
+        """Close expired and long-idle connections, then top back up to DB_POOL_MIN"""
+        now = time.monotonic()
+        to_close = []
+
+        with self._lock:
+            keep = deque()
+            for connection in self._idle:
+                if now - connection.created_at > self._max_lifetime:
+                    self._stats["expired_lifetime"] += 1
+                    to_close.append(connection)
+                elif now - connection.last_used > self._max_idle and self._total() - len(to_close) > self._minconn:
+                    self._stats["reaped_idle"] += 1
+                    to_close.append(connection)
+                else:
+                    keep.append(connection)
+            self._idle = keep
+
+            missing = max(0, self._minconn - self._total())
+            self._opening += missing
+
+        for connection in to_close:
+            self._close_connection(connection)
+
+        for _ in range(missing):
+            try:
+                connection = self._open_connection()
+            except Exception as e:
+                logger.warning(f"Could not replenish database pool: {e}")
+                with self._lock:
+                    self._opening -= 1
+                continue
+            with self._lock:
+                self._opening -= 1
+                self._in_use += 1
+                surplus = self._handoff_or_idle(connection)
+            for stale in surplus:
+                self._close_connection(stale)
+
+    def _shrink(self) -> List[Any]:
+        """Trim idle connections down to the peak demand seen over the last window.
+
+        Must be called with the lock held; returns the connections to close.
+        """
+        now = time.monotonic()
+        if now - self._window_start < self._resize_interval:
+            return []
+
+        target = max(self._minconn, self._window_peak)
+        self._window_start = now
+        self._window_peak = self._in_use
+
+        surplus = []
+        # popleft takes the connections that have sat idle the longest
+        while self._idle and self._total() > target:
+            surplus.append(self._idle.popleft())
+        if surplus:
+            logger.info(f"Shrinking database pool by {len(surplus)} idle connections (target {target})")
+        return surplus
+
     def close_all_connections(self):
+        """Close all connections in the pool"""
+        if not self._initialized:
+            return
+
+        self._stop_reaper.set()
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._initialized = False
+
+        for connection in idle:
+            self._close_connection(connection)
+        logger.info(f"All database connections closed ({self.name})")
+    
+    def get_pool_status(self) -> Dict[str, Any]:
+        """Get current pool status"""
+        if not self._initialized:
+            return {"status": "not_initialized"}
+
+        try:
+            with self._lock:
+                stats = dict(self._stats)
+                waits = stats["acquire_waits"]
+                return {
+                    "status": "active",
+                    "min_connections": self._minconn,
+                    "max_connections": self._maxconn,
+                    "open_connections": self._total(),
+                    "available_connections": len(self._idle),
+                    "used_connections": self._in_use,
+                    "requests_waiting": len(self._waiters),
+                    "acquire_timeout_s": self._timeout,
+                    "acquire_waits": waits,
+                    "acquire_timeouts": stats["acquire_timeouts"],
+                    "avg_wait_ms": round(stats["total_wait"] / waits * 1000, 3) if waits else 0.0,
+                    "max_wait_ms": round(stats["max_wait"] * 1000, 3),
+                    "connections_opened": stats["connections_opened"],
+                    "connections_closed": stats["connections_closed"],
+                    "max_lifetime_s": self._max_lifetime,
+                    "max_idle_s": self._max_idle,
+                    "validations": stats["validations"],
+                    "validation_failures": stats["validation_failures"],
+                    "discarded_broken": stats["discarded_broken"],
+                    "expired_lifetime": stats["expired_lifetime"],
+                    "reaped_idle": stats["reaped_idle"],
+                    "prepared_statements": prepared_statements.get_status()
+                }
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+
+# Global pool instances: writes always go to the primary, plain reads may be
+# routed to a replica
+db_pool = DatabasePool()
+replica_pools = [DatabasePool(name, db_config) for name, db_config in get_replica_configs()]
+
+async def _configure_async_connection(connection):
+    connection.prepared_max = prepared_statements.max_size
+
+async def _reset_async_connection(connection):
+    if connection.autocommit:
+        await connection.set_autocommit(False)
+    connection._pool_last_used = time.monotonic()
+
+class AsyncDatabasePool:
+    """Asyncio connection pool manager (psycopg 3), one instance per server"""
+
+    _instances: Dict[str, 'AsyncDatabasePool'] = {}
+    _pool = None
+    _initialized = False
+    _init_lock = None
+    # Connections last used before this are pinged before reuse, however
+    # briefly they sat idle (see connection())
+    _validate_before = 0.0
+
+    def __new__(cls, name: str = 'primary', db_config: Optional[Dict[str, Any]] = None):
+        if name not in cls._instances:
+            instance = super(AsyncDatabasePool, cls).__new__(cls)
+            instance.name = name
+            instance._config_override = db_config
+            cls._instances[name] = instance
+        return cls._instances[name]
+
+    @property
+    def db_config(self) -> Dict[str, Any]:
+        return self._config_override or get_db_config()
+
+    async def _initialize_pool(self):
+        """Open the async pool on first use, inside the running event loop"""
+        if self._initialized:
+            return
+
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+
+        async with self._init_lock:
+            if self._initialized:
+                return
+
+            pool = None
+            try:
+                db_config = self.db_config
+                min_connections = int(os.getenv('DB_POOL_MIN', 2))
+                max_connections = int(os.getenv('DB_POOL_MAX', 20))
+
+                pool = AsyncConnectionPool(
+                    kwargs={
+                        'host': db_config['host'],
+                        'dbname': db_config['database'],
+                        'user': db_config['user'],
+                        'password': db_config['password'],
+                        'port': db_config['port'],
+                        # psycopg 3 prepares hot statements natively; share the knobs
+                        'prepare_threshold': prepared_statements.threshold if prepared_statements.threshold > 0 else None
+                    },
+                    configure=_configure_async_connection,
+                    min_size=min_connections,
+                    max_size=max_connections,
+                    timeout=float(os.getenv('DB_POOL_TIMEOUT', 10)),
+                    max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', 3600)),
+                    max_idle=float(os.getenv('DB_POOL_MAX_IDLE', 600)),
+                    check=self._check_connection,
+                    reset=_reset_async_connection,
+                    name=f"async-{self.name}",
+                    open=False
+                )
+                # Give up on an unreachable server as quickly as on a busy one
+                await pool.open(wait=True, timeout=pool.timeout)
+
+                self._pool = pool
+                self._initialized = True
+                logger.info(f"Async database pool '{self.name}' initialized with {min_connections}-{max_connections} connections")
+
+            except Exception as e:
+                logger.error(f"Failed to initialize async database pool '{self.name}': {e}")
+                if pool is not None:
+                    await pool.close()
+                self._pool = None
+                self._initialized = False
+                raise
+
+    async def _check_connection(self, connection):
+        """Ping connections that sat idle past DB_POOL_PING_AFTER or predate
+        a connection failure; the pool discards one that fails and tries the next"""
+        last_used = getattr(connection, '_pool_last_used', 0.0)
+        if time.monotonic() - last_used > float(os.getenv('DB_POOL_PING_AFTER', 5)) or last_used < self._validate_before:
+            await AsyncConnectionPool.check_connection(connection)
+
+    @asynccontextmanager
+    async def connection(self):
+        """Borrow a connection; commits on success and rolls back on error"""
+        if not self._initialized:
+            await self._initialize_pool()
+
+        try:
+            async with self._pool.connection() as connection:
+                yield connection
+        except Exception as e:
+            if _is_connection_error(e):
+                # One dead connection usually means the server restarted or
+                # failed over: make every idle connection prove itself, so a
+                # retry does not draw another dead one
+                self._validate_before = time.monotonic()
+            raise
+
+    async def close_all_connections(self):
         """Close all connections in the pool"""
         if self._pool:
             try:
-                self._pool.closeall()
-                logger.info("All database connections closed")
+                await self._pool.close()
+                logger.info(f"All async database connections closed ({self.name})")
             except Exception as e:
-                logger.error(f"Error closing connections: {e}")
-    
+                logger.error(f"Error closing async connections: {e}")
+            finally:
+                self._pool = None
+                self._initialized = False
+                self._init_lock = None
+
     def get_pool_status(self) -> Dict[str, Any]:
         """Get current pool status"""
         if not self._initialized or not self._pool:
             return {"status": "not_initialized"}
 
         try:
+            stats = self._pool.get_stats()
             return {
                 "status": "active",
-                "min_connections": self._pool.minconn,
-                "max_connections": self._pool.maxconn,
-                "available_connections": len(self._pool._pool),
-                "used_connections": len(self._pool._used)
+                "min_connections": self._pool.min_size,
+                "max_connections": self._pool.max_size,
+                "available_connections": stats.get("pool_available", 0),
+                "used_connections": stats.get("pool_size", 0) - stats.get("pool_available", 0),
+                "requests_waiting": stats.get("requests_waiting", 0),
+                "acquire_timeouts": stats.get("requests_errors", 0),
+                "connections_opened": stats.get("connections_num", 0),
+                "connections_lost": stats.get("connections_lost", 0),
+                "returns_bad": stats.get("returns_bad", 0)
             }
         except Exception as e:
             return {"status": "error", "error": str(e)}
 
-# Global pool instance
-db_pool = DatabasePool()
+# Global async pool instances, mirroring db_pool and replica_pools
+async_db_pool = AsyncDatabasePool()
+async_replica_pools = [AsyncDatabasePool(name, db_config) for name, db_config in get_replica_configs()]
 
-def get_direct_connection():
-    """Get a direct database connection (fallback when pool fails)"""
+READ_YOUR_WRITES_SECONDS = float(os.getenv('DB_READ_YOUR_WRITES_SECONDS', 5))
+
+class ReadYourWrites:
+    """Until when one client's reads must go to the primary, and the replica
+    the current request reads from.
+
+    Mutable on purpose: the executor runs queries in copies of the request
+    context, and a write noted there still has to reach the middleware.
+    """
+
+    __slots__ = ('primary_until', 'wrote', 'replica')
+
+    def __init__(self, primary_until: float = 0.0):
+        self.primary_until = primary_until
+        self.wrote = False
+        self.replica = None
+
+_read_your_writes: contextvars.ContextVar[Optional[ReadYourWrites]] = contextvars.ContextVar('read_your_writes', default=None)
+
+# Writes made outside any request (scripts, background jobs) pin the process
+_process_primary_until = 0.0
+
+def start_read_your_writes(primary_until: float = 0.0) -> ReadYourWrites:
+    """Begin tracking writes for the current request; primary_until is a wall clock time"""
+    state = ReadYourWrites(primary_until)
+    _read_your_writes.set(state)
+    return state
+
+def note_write():
+    """Keep this client's reads on the primary while replicas catch up"""
+    global _process_primary_until
+    primary_until = time.time() + READ_YOUR_WRITES_SECONDS
+    state = _read_your_writes.get()
+    if state is None:
+        _process_primary_until = primary_until
+    else:
+        state.primary_until = max(state.primary_until, primary_until)
+        state.wrote = True
+
+@contextmanager
+def read_from_primary():
+    """Send every read in the block to the primary"""
+    token = _read_your_writes.set(ReadYourWrites(float('inf')))
     try:
-        db_config = {
-            'host': os.getenv('DB_HOST', 'localhost'),
-            'database': os.getenv('DB_NAME', 'postgres'),
-            'user': os.getenv('DB_USER', 'postgres'),
-            'password': os.getenv('DB_PASSWORD', ''),
-            'port': int(os.getenv('DB_PORT', 5432))
-        }
+        yield
+    finally:
+        _read_your_writes.reset(token)
 
-        connection = psycopg2.connect(**db_config)
-        return connection
-    except Exception as e:
-        logger.error(f"Failed to create direct connection: {e}")
-        raise
+class ReplicaRouter:
+    """Round-robins plain reads over the replicas that are currently reachable.
+
+    All reads of one request go to the same replica, so they see one point
+    in the replica's history or later, never an older one: a replica only
+    moves forward. If that replica goes down mid-request, the rest of the
+    request reads from the primary, which is newer still.
+
+    A replica that fails to connect or hands out no connection within
+    DB_POOL_TIMEOUT is skipped for DB_REPLICA_RETRY_SECONDS; its reads go to
+    the primary meanwhile.
+    """
+
+    def __init__(self):
+        self.retry_after = float(os.getenv('DB_REPLICA_RETRY_SECONDS', 30))
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+        self._down_until: Dict[str, float] = {}
+        self._stats = {"replica_reads": 0, "primary_reads": 0, "pinned_reads": 0, "fallbacks": 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def choose(self, query: str, pools: List[Any]) -> Optional[Any]:
+        """The replica pool to run a query on, or None for the primary"""
+        if not pools or not is_read_query(query):
+            return None
+
+        state = _read_your_writes.get()
+        primary_until = state.primary_until if state is not None else _process_primary_until
+        if time.time() < primary_until:
+            self._count("pinned_reads")
+            return None
+
+        now = time.monotonic()
+        if state is not None and state.replica is not None:
+            for pool in pools:
+                if pool.name == state.replica and self._down_until.get(pool.name, 0.0) <= now:
+                    self._count("replica_reads")
+                    return pool
+            self._count("primary_reads")
+            return None
+
+        start = next(self._turn)
+        for offset in range(len(pools)):
+            pool = pools[(start + offset) % len(pools)]
+            if self._down_until.get(pool.name, 0.0) <= now:
+                self._count("replica_reads")
+                if state is not None:
+                    state.replica = pool.name
+                return pool
+
+        self._count("primary_reads")
+        return None
+
+    @staticmethod
+    def is_unavailable(error: Exception) -> bool:
+        return _is_connection_error(error) or isinstance(error, (PoolTimeout, PoolTimeoutError))
+
+    def mark_down(self, pool: Any, error: Exception):
+        logger.warning(f"Replica {pool.name} unavailable, reading from the primary for {self.retry_after}s: {error}")
+        with self._lock:
+            self._down_until[pool.name] = time.monotonic() + self.retry_after
+            self._stats["fallbacks"] += 1
+
+    def get_status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "read_your_writes_s": READ_YOUR_WRITES_SECONDS,
+                "down": sorted(name for name, until in self._down_until.items() if until > now),
+                **self._stats
+            }
+
+# Global replica router
+replica_router = ReplicaRouter()
+
+class DatabaseExecutor:
+    """Bounded thread pool that runs the sync query helpers off the event loop"""
+
+    def __init__(self):
+        self._executor = None
+        self._max_workers = 0
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # One worker per pooled connection: more threads would only
+                    # queue inside the pools, fewer would leave connections idle
+                    self._max_workers = int(os.getenv('DB_POOL_MAX', 20)) * (1 + len(replica_pools))
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._max_workers,
+                        thread_name_prefix="db-executor"
+                    )
+        return self._executor
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking database call on the executor and await its result"""
+        executor = self._get_executor()
+        submitted_at = time.perf_counter()
+        # Carry the request's read-your-writes state into the worker thread
+        context = contextvars.copy_context()
+
+        def task():
+            wait = time.perf_counter() - submitted_at
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            try:
+                return context.run(func, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        with self._lock:
+            self._queued += 1
+        future = executor.submit(task)
+
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # A task that never started still counts as queued
+            if future.cancel():
+                with self._lock:
+                    self._queued -= 1
+            raise
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get current executor status"""
+        if self._executor is None:
+            return {"status": "not_initialized"}
+
+        with self._lock:
+            completed = self._completed
+            return {
+                "status": "active",
+                "max_workers": self._max_workers,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": completed,
+                "avg_wait_ms": round(self._total_wait / completed * 1000, 3) if completed else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 3)
+            }
+
+    def shutdown(self):
+        """Stop accepting work and release the worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+# Global executor instance
+db_executor = DatabaseExecutor()
 
 @contextmanager
-def get_db_connection():
-    """Context manager for database connections"""
+def get_db_connection(pool: Optional[DatabasePool] = None):
+    """Context manager for database connections (from the primary unless a pool is given)"""
+    pool = pool or db_pool
     connection = None
-    use_pool = True
 
     try:
-        # Try to get connection from pool first
-        try:
-            connection = db_pool.get_connection()
-        except Exception as pool_error:
-            logger.warning(f"Pool connection failed, using direct connection: {pool_error}")
-            use_pool = False
-            connection = get_direct_connection()
+        # Never fall back to unpooled connections: when the pool is saturated
+        # the caller waits its turn or gets a PoolTimeoutError
+        connection = pool.get_connection()
 
         yield connection
 
     except Exception as e:
         if connection:
-            connection.rollback()
+            if _is_connection_error(e):
+                connection.broken = True
+            else:
+                try:
+                    connection.rollback()
+                except Error:
+                    connection.broken = True
         logger.error(f"Database operation failed: {e}")
         raise
     finally:
         if connection:
-            if use_pool:
-                db_pool.return_connection(connection)
-            else:
-                connection.close()
+            pool.return_connection(connection)
+
+def _run_query(pool, query, params, fetch_one, fetch_all, as_tuples=False):
+    read_only = is_read_query(query)
+    with get_db_connection(pool) as connection:
+        if read_only:
+            # Autocommit skips the BEGIN before and the COMMIT after a plain
+            # SELECT: one round trip instead of three
+            connection.autocommit = True
+        if as_tuples:
+            cursor = connection.cursor()
+        else:
+            cursor = connection.cursor(cursor_factory=RealDictCursor)
+
+        with query_stats.timed(query, params, pool) as timer:
+            prepared_statements.execute(cursor, query, params)
+
+            result = None
+            if as_tuples and (fetch_one or fetch_all):
+                rows = [cursor.fetchone()] if fetch_one else cursor.fetchall()
+                result = RowSet([column.name for column in cursor.description], [row for row in rows if row])
+            elif fetch_one:
+                result = cursor.fetchone()
+                result = dict(result) if result else None
+            elif fetch_all:
+                rows = cursor.fetchall()
+                result = [dict(row) for row in rows] if rows else []
+
+            if not read_only:
+                connection.commit()
+            timer.rows = cursor.rowcount
+        cursor.close()
+        
+        return result
 
 def execute_query(
     query: str, 
     params: Optional[tuple] = None, 
     fetch_one: bool = False, 
-    fetch_all: bool = False
-) -> Union[Dict, List[Dict], None]:
+    fetch_all: bool = False,
+    as_tuples: bool = False
+) -> Union[Dict, List[Dict], RowSet, None]:
     """
     Execute a database query with connection pooling
     
@@ -192,27 +1116,32 @@ def execute_query(
         params: Query parameters
         fetch_one: Return single row
         fetch_all: Return all rows
+        as_tuples: Return a RowSet (columns + tuple rows) instead of dicts
     
     Returns:
         Query result or None
     """
     try:
-        with get_db_connection() as connection:
-            cursor = connection.cursor(cursor_factory=RealDictCursor)
-            cursor.execute(query, params)
-            
-            result = None
-            if fetch_one:
-                result = cursor.fetchone()
-                result = dict(result) if result else None
-            elif fetch_all:
-                rows = cursor.fetchall()
-                result = [dict(row) for row in rows] if rows else []
-            
-            connection.commit()
-            cursor.close()
-            
-            return result
+        replica = replica_router.choose(query, replica_pools)
+        if replica is not None:
+            try:
+                return _run_query(replica, query, params, fetch_one, fetch_all, as_tuples)
+            except (Error, PoolTimeoutError) as e:
+                if not replica_router.is_unavailable(e):
+                    raise
+                replica_router.mark_down(replica, e)
+        elif not is_read_query(query):
+            note_write()
+
+        try:
+            return _run_query(db_pool, query, params, fetch_one, fetch_all, as_tuples)
+        except Error as e:
+            # The dead connection has been dropped and the pool revalidates the
+            # rest, so a read can go straight round again
+            if not (_is_connection_error(e) and is_read_query(query)):
+                raise
+            logger.warning(f"Retrying read after connection failure: {e}")
+            return _run_query(db_pool, query, params, fetch_one, fetch_all, as_tuples)
             
     except Error as e:
         logger.error(f"Database query failed: {e}")
@@ -230,12 +1159,15 @@ def execute_transaction(queries_and_params: List[tuple]) -> bool:
     Returns:
         True if successful, raises exception if failed
     """
+    note_write()
     try:
         with get_db_connection() as connection:
             cursor = connection.cursor(cursor_factory=RealDictCursor)
             
             for query, params in queries_and_params:
-                cursor.execute(query, params)
+                with query_stats.timed(query, params, db_pool) as timer:
+                    cursor.execute(query, params)
+                    timer.rows = cursor.rowcount
             
             connection.commit()
             cursor.close()
@@ -246,6 +1178,373 @@ def execute_transaction(queries_and_params: List[tuple]) -> bool:
         logger.error(f"Transaction failed: {e}")
         raise Exception(f"Transaction error: {str(e)}")
 
+SNAPSHOT_READ = "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY"
+
+def _run_snapshot(pool, queries_and_params: List[tuple]) -> List[RowSet]:
+    with get_db_connection(pool) as connection:
+        cursor = connection.cursor()
+        # The first statement of the implicit transaction fixes its snapshot
+        cursor.execute(SNAPSHOT_READ)
+        results = []
+        for query, params in queries_and_params:
+            with query_stats.timed(query, params, pool) as timer:
+                cursor.execute(query, params)
+                results.append(RowSet([column.name for column in cursor.description], cursor.fetchall()))
+                timer.rows = cursor.rowcount
+        connection.rollback()
+        cursor.close()
+        return results
+
+def fetch_snapshot(queries_and_params: List[tuple]) -> List[RowSet]:
+    """
+    Run several reads on one connection in one REPEATABLE READ transaction,
+    so every result describes the same state of the database
+
+    Args:
+        queries_and_params: List of (query, params) tuples, all plain SELECTs
+
+    Returns:
+        A RowSet per query
+    """
+    try:
+        replica = replica_router.choose(queries_and_params[0][0], replica_pools)
+        if replica is not None:
+            try:
+                return _run_snapshot(replica, queries_and_params)
+            except (Error, PoolTimeoutError) as e:
+                if not replica_router.is_unavailable(e):
+                    raise
+                replica_router.mark_down(replica, e)
+
+        try:
+            return _run_snapshot(db_pool, queries_and_params)
+        except Error as e:
+            if not _is_connection_error(e):
+                raise
+            logger.warning(f"Retrying snapshot read after connection failure: {e}")
+            return _run_snapshot(db_pool, queries_and_params)
+
+    except Error as e:
+        logger.error(f"Snapshot read failed: {e}")
+        raise Exception(f"Database error: {str(e)}")
+
+async def _run_query_async(pool, query, params, fetch_one, fetch_all, as_tuples=False):
+    async with pool.connection() as connection:
+        if is_read_query(query):
+            # No implicit BEGIN, so the pool's commit on exit has nothing to
+            # send; the reset hook turns autocommit back off
+            await connection.set_autocommit(True)
+        async with connection.cursor(row_factory=tuple_row if as_tuples else dict_row) as cursor:
+            with query_stats.timed(query, params, pool) as timer:
+                await cursor.execute(query, params)
+
+                result = None
+                if as_tuples and (fetch_one or fetch_all):
+                    rows = [await cursor.fetchone()] if fetch_one else await cursor.fetchall()
+                    result = RowSet([column.name for column in cursor.description], [row for row in rows if row])
+                elif fetch_one:
+                    result = await cursor.fetchone()
+                elif fetch_all:
+                    result = await cursor.fetchall()
+                timer.rows = cursor.rowcount
+
+        return result
+
+async def execute_query_async(
+    query: str,
+    params: Optional[tuple] = None,
+    fetch_one: bool = False,
+    fetch_all: bool = False,
+    as_tuples: bool = False
+) -> Union[Dict, List[Dict], RowSet, None]:
+    """
+    Execute a database query on the async pool without blocking the event loop
+
+    Args:
+        query: SQL query string
+        params: Query parameters
+        fetch_one: Return single row
+        fetch_all: Return all rows
+        as_tuples: Return a RowSet (columns + tuple rows) instead of dicts
+
+    Returns:
+        Query result or None
+    """
+    if ASYNC_BACKEND == 'threadpool':
+        return await execute_query_threaded(query, params, fetch_one, fetch_all, as_tuples)
+
+    try:
+        replica = replica_router.choose(query, async_replica_pools)
+        if replica is not None:
+            try:
+                return await _run_query_async(replica, query, params, fetch_one, fetch_all, as_tuples)
+            except (psycopg.Error, PoolTimeout) as e:
+                if not replica_router.is_unavailable(e):
+                    raise
+                replica_router.mark_down(replica, e)
+        elif not is_read_query(query):
+            note_write()
+
+        try:
+            return await _run_query_async(async_db_pool, query, params, fetch_one, fetch_all, as_tuples)
+        except psycopg.Error as e:
+            if not (_is_connection_error(e) and is_read_query(query)):
+                raise
+            logger.warning(f"Retrying read after connection failure: {e}")
+            return await _run_query_async(async_db_pool, query, params, fetch_one, fetch_all, as_tuples)
+
+    except PoolTimeout as e:
+        raise PoolTimeoutError(str(e))
+    except psycopg.Error as e:
+        logger.error(f"Database query failed: {e}")
+        logger.error(f"Query: {query}")
+        logger.error(f"Params: {params}")
+        raise Exception(f"Database error: {str(e)}")
+
+async def execute_transaction_async(queries_and_params: List[tuple]) -> bool:
+    """
+    Execute multiple queries in a single transaction on the async pool
+
+    Args:
+        queries_and_params: List of (query, params) tuples
+
+    Returns:
+        True if successful, raises exception if failed
+    """
+    if ASYNC_BACKEND == 'threadpool':
+        return await execute_transaction_threaded(queries_and_params)
+
+    note_write()
+    try:
+        async with async_db_pool.connection() as connection:
+            async with connection.cursor() as cursor:
+                for query, params in queries_and_params:
+                    with query_stats.timed(query, params, async_db_pool) as timer:
+                        await cursor.execute(query, params)
+                        timer.rows = cursor.rowcount
+
+            return True
+
+    except PoolTimeout as e:
+        raise PoolTimeoutError(str(e))
+    except psycopg.Error as e:
+        logger.error(f"Transaction failed: {e}")
+        raise Exception(f"Transaction error: {str(e)}")
+
+async def _run_snapshot_async(pool, queries_and_params: List[tuple]) -> List[RowSet]:
+    async with pool.connection() as connection:
+        async with connection.cursor(row_factory=tuple_row) as cursor:
+            await cursor.execute(SNAPSHOT_READ)
+            results = []
+            for query, params in queries_and_params:
+                with query_stats.timed(query, params, pool) as timer:
+                    await cursor.execute(query, params)
+                    results.append(RowSet([column.name for column in cursor.description], await cursor.fetchall()))
+                    timer.rows = cursor.rowcount
+        await connection.rollback()
+        return results
+
+async def fetch_snapshot_async(queries_and_params: List[tuple]) -> List[RowSet]:
+    """Async counterpart of fetch_snapshot"""
+    if ASYNC_BACKEND == 'threadpool':
+        return await db_executor.run(fetch_snapshot, queries_and_params)
+
+    try:
+        replica = replica_router.choose(queries_and_params[0][0], async_replica_pools)
+        if replica is not None:
+            try:
+                return await _run_snapshot_async(replica, queries_and_params)
+            except (psycopg.Error, PoolTimeout) as e:
+                if not replica_router.is_unavailable(e):
+                    raise
+                replica_router.mark_down(replica, e)
+
+        try:
+            return await _run_snapshot_async(async_db_pool, queries_and_params)
+        except psycopg.Error as e:
+            if not _is_connection_error(e):
+                raise
+            logger.warning(f"Retrying snapshot read after connection failure: {e}")
+            return await _run_snapshot_async(async_db_pool, queries_and_params)
+
+    except PoolTimeout as e:
+        raise PoolTimeoutError(str(e))
+    except psycopg.Error as e:
+        logger.error(f"Snapshot read failed: {e}")
+        raise Exception(f"Database error: {str(e)}")
+
+STREAM_BATCH_SIZE = int(os.getenv('DB_STREAM_BATCH_SIZE', 500))
+
+def _cursor_name() -> str:
+    return f"stream_{uuid.uuid4().hex}"
+
+def _stream_batches(pool, query, params, batch_size, as_tuples):
+    with get_db_connection(pool) as connection:
+        if as_tuples:
+            cursor = connection.cursor(name=_cursor_name())
+        else:
+            cursor = connection.cursor(name=_cursor_name(), cursor_factory=RealDictCursor)
+        cursor.itersize = batch_size
+        # Database time only: the time spent waiting on the client between
+        # batches is not the query's
+        elapsed = 0.0
+        total_rows = 0
+        error = None
+        try:
+            started = time.perf_counter()
+            cursor.execute(query, params)
+
+            columns = None
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                elapsed += time.perf_counter() - started
+                if not rows:
+                    break
+                total_rows += len(rows)
+                if as_tuples:
+                    # A named cursor only has a description after the first fetch
+                    columns = columns or [column.name for column in cursor.description]
+                    yield RowSet(columns, rows)
+                else:
+                    yield [dict(row) for row in rows]
+                started = time.perf_counter()
+
+            cursor.close()
+            connection.commit()
+        except Exception as e:
+            elapsed += time.perf_counter() - started
+            error = e
+            raise
+        finally:
+            query_stats.record(query, params, elapsed, pool, rows=total_rows, error=error)
+
+def stream_query_batches(
+    query: str,
+    params: Optional[tuple] = None,
+    batch_size: int = STREAM_BATCH_SIZE,
+    as_tuples: bool = False
+) -> Iterator[Union[List[Dict], RowSet]]:
+    """
+    Iterate a query through a server-side (named) cursor in batches
+
+    Only one batch is held in memory at a time; the pooled connection stays
+    checked out until the generator is exhausted or closed.
+
+    Args:
+        query: SQL query string
+        params: Query parameters
+        batch_size: Rows fetched per round trip
+        as_tuples: Yield RowSets instead of lists of dicts
+
+    Yields:
+        Lists of row dicts, or RowSets
+    """
+    try:
+        replica = replica_router.choose(query, replica_pools)
+        if replica is not None:
+            started = False
+            try:
+                with closing(_stream_batches(replica, query, params, batch_size, as_tuples)) as batches:
+                    for rows in batches:
+                        started = True
+                        yield rows
+                return
+            except (Error, PoolTimeoutError) as e:
+                # Once rows went out, switching servers would splice two snapshots
+                if started or not replica_router.is_unavailable(e):
+                    raise
+                replica_router.mark_down(replica, e)
+
+        with closing(_stream_batches(db_pool, query, params, batch_size, as_tuples)) as batches:
+            yield from batches
+
+    except Error as e:
+        logger.error(f"Streaming query failed: {e}")
+        logger.error(f"Query: {query}")
+        raise Exception(f"Database error: {str(e)}")
+
+async def _stream_batches_async(pool, query, params, batch_size, as_tuples):
+    async with pool.connection() as connection:
+        row_factory = tuple_row if as_tuples else dict_row
+        async with connection.cursor(name=_cursor_name(), row_factory=row_factory) as cursor:
+            cursor.itersize = batch_size
+            elapsed = 0.0
+            total_rows = 0
+            error = None
+            try:
+                started = time.perf_counter()
+                await cursor.execute(query, params)
+
+                columns = None
+                while True:
+                    rows = await cursor.fetchmany(batch_size)
+                    elapsed += time.perf_counter() - started
+                    if not rows:
+                        break
+                    total_rows += len(rows)
+                    if as_tuples:
+                        columns = columns or [column.name for column in cursor.description]
+                        yield RowSet(columns, rows)
+                    else:
+                        yield rows
+                    started = time.perf_counter()
+            except Exception as e:
+                elapsed += time.perf_counter() - started
+                error = e
+                raise
+            finally:
+                query_stats.record(query, params, elapsed, pool, rows=total_rows, error=error)
+
+async def stream_query_async(
+    query: str,
+    params: Optional[tuple] = None,
+    batch_size: int = STREAM_BATCH_SIZE,
+    as_tuples: bool = False
+) -> AsyncIterator[Union[List[Dict], RowSet]]:
+    """
+    Async counterpart of stream_query_batches
+
+    Yields:
+        Lists of row dicts, or RowSets
+    """
+    if ASYNC_BACKEND == 'threadpool':
+        batches = stream_query_batches(query, params, batch_size, as_tuples)
+        try:
+            while True:
+                rows = await db_executor.run(next, batches, None)
+                if rows is None:
+                    break
+                yield rows
+        finally:
+            await db_executor.run(batches.close)
+        return
+
+    try:
+        replica = replica_router.choose(query, async_replica_pools)
+        if replica is not None:
+            started = False
+            try:
+                async with aclosing(_stream_batches_async(replica, query, params, batch_size, as_tuples)) as batches:
+                    async for rows in batches:
+                        started = True
+                        yield rows
+                return
+            except (psycopg.Error, PoolTimeout) as e:
+                if started or not replica_router.is_unavailable(e):
+                    raise
+                replica_router.mark_down(replica, e)
+
+        async with aclosing(_stream_batches_async(async_db_pool, query, params, batch_size, as_tuples)) as batches:
+            async for rows in batches:
+                yield rows
+
+    except PoolTimeout as e:
+        raise PoolTimeoutError(str(e))
+    except psycopg.Error as e:
+        logger.error(f"Streaming query failed: {e}")
+        logger.error(f"Query: {query}")
+        raise Exception(f"Database error: {str(e)}")
+
 def health_check() -> Dict[str, Any]:
     """
     Check database connectivity and pool status
@@ -255,7 +1554,8 @@ def health_check() -> Dict[str, Any]:
     """
     try:
         # Test connection
-        result = execute_query("SELECT 1 as test", fetch_one=True)
+        with read_from_primary():
+            result = execute_query("SELECT 1 as test", fetch_one=True)
         
         if result and result.get('test') == 1:
             pool_status = db_pool.get_pool_status()
@@ -279,7 +1579,83 @@ def health_check() -> Dict[str, Any]:
             "pool": db_pool.get_pool_status()
         }
 
+async def execute_query_threaded(
+    query: str,
+    params: Optional[tuple] = None,
+    fetch_one: bool = False,
+    fetch_all: bool = False,
+    as_tuples: bool = False
+) -> Union[Dict, List[Dict], RowSet, None]:
+    """Await the sync execute_query on the bounded database executor"""
+    return await db_executor.run(execute_query, query, params, fetch_one, fetch_all, as_tuples)
+
+async def execute_transaction_threaded(queries_and_params: List[tuple]) -> bool:
+    """Await the sync execute_transaction on the bounded database executor"""
+    return await db_executor.run(execute_transaction, queries_and_params)
+
+def _active_pool_status() -> Dict[str, Any]:
+    """Status of whichever pool currently serves the async helpers"""
+    if ASYNC_BACKEND == 'threadpool':
+        return db_pool.get_pool_status()
+    return async_db_pool.get_pool_status()
+
+def _replica_status() -> Dict[str, Any]:
+    pools = replica_pools if ASYNC_BACKEND == 'threadpool' else async_replica_pools
+    return {
+        "routing": replica_router.get_status(),
+        **{pool.name: pool.get_pool_status() for pool in pools}
+    }
+
+async def health_check_async() -> Dict[str, Any]:
+    """
+    Check database connectivity through the async query helpers
+
+    Returns:
+        Health status dictionary
+    """
+    try:
+        # The primary is the one that has to be up; replicas report their pools
+        with read_from_primary():
+            result = await execute_query_async("SELECT 1 as test", fetch_one=True)
+
+        if result and result.get('test') == 1:
+            status = {
+                "status": "healthy",
+                "database": "connected",
+                "pool": _active_pool_status(),
+                "executor": db_executor.get_status()
+            }
+        else:
+            status = {
+                "status": "unhealthy",
+                "database": "query_failed",
+                "pool": _active_pool_status(),
+                "executor": db_executor.get_status()
+            }
+
+    except Exception as e:
+        status = {
+            "status": "unhealthy",
+            "database": "disconnected",
+            "error": str(e),
+            "pool": _active_pool_status(),
+            "executor": db_executor.get_status()
+        }
+
+    if replica_pools:
+        status["replicas"] = _replica_status()
+    return status
+
 # Cleanup function for application shutdown
 def cleanup_database():
     """Clean up database connections on application shutdown"""
     db_pool.close_all_connections()
+    for pool in replica_pools:
+        pool.close_all_connections()
+
+async def cleanup_database_async():
+    """Close the async pool; must run inside the application's event loop"""
+    await async_db_pool.close_all_connections()
+    for pool in async_replica_pools:
+        await pool.close_all_connections()
+    db_executor.shutdown()
@@ -1,18 +1,32 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from dotenv import load_dotenv
-from database import health_check, cleanup_database
+from database import health_check_async, cleanup_database, cleanup_database_async, PoolTimeoutError
+from middleware import ReadYourWritesMiddleware, QueryTaggingMiddleware, ConditionalGetMiddleware, CompressionMiddleware
+from conditional import NotModified
+from compression import CompressedHit
+from responses import RowsJSONResponse, JSONRoute
 import atexit
 
 # Import route modules
-from routes import users, accounting, business, customers, projects, files, websocket_routes
+from routes import users, accounting, business, customers, projects, files, websocket_routes, admin, autocomplete, search, dashboard
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="Full Stack App API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # The async pool is bound to the server's event loop, so close it here
+    await cleanup_database_async()
+
+# Every route's JSON is encoded by orjson, without a jsonable_encoder pass
+app = FastAPI(title="Full Stack App API", version="1.0.0", lifespan=lifespan, default_response_class=RowsJSONResponse)
+app.router.route_class = JSONRoute
 
 # Create uploads directory if it doesn't exist
 uploads_dir = Path("uploads")
@@ -37,6 +51,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Pins a client's reads to the primary right after its writes (replicas only)
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Attributes each query to its route in the /admin/queries statistics
+app.add_middleware(QueryTaggingMiddleware)
+
+# Sends the ETags of conditional GETs (see conditional.py)
+app.add_middleware(ConditionalGetMiddleware)
+
+# Compresses JSON and text responses with brotli or gzip (see compression.py);
+# outermost, so it sees the final headers and body
+app.add_middleware(CompressionMiddleware)
+
+# A saturated pool is back-pressure, not a server fault: ask the client to retry
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database is busy, please retry"},
+        headers={"Retry-After": "1"}
+    )
+
+# The client's copy is current: no body
+@app.exception_handler(NotModified)
+async def not_modified_handler(request: Request, exc: NotModified):
+    return Response(status_code=304)
+
+# The compressed body of this exact response is cached: send it as it is
+@app.exception_handler(CompressedHit)
+async def compressed_hit_handler(request: Request, exc: CompressedHit):
+    return Response(exc.body, headers={"content-type": exc.content_type, "content-encoding": exc.encoding})
+
 # Register cleanup function for application shutdown
 atexit.register(cleanup_database)
 
@@ -48,6 +94,10 @@ app.include_router(customers.router, tags=["customers"])
 app.include_router(projects.router, tags=["projects"])
 app.include_router(files.router, tags=["files"])
 app.include_router(websocket_routes.router, tags=["websocket"])
+app.include_router(admin.router, tags=["admin"])
+app.include_router(autocomplete.router, tags=["autocomplete"])
+app.include_router(search.router, tags=["search"])
+app.include_router(dashboard.router, tags=["dashboard"])
 
 # API Routes
 @app.get("/")
@@ -56,7 +106,7 @@ async def root():
 
 @app.get("/health")
 async def health_check_endpoint():
-    return health_check()
+    return await health_check_async()
 
 @app.api_route("/{full_path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
 async def catch_all(full_path: str):
@@ -0,0 +1,217 @@
+"""
+ASGI middleware for the API
+"""
+import math
+import time
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from compression import (
+    COMPRESSION_MIN_SIZE, Compressor, cache_key as compressed_cache_key, choose_encoding, compress,
+    compressed_cache, is_compressible
+)
+from database import replica_pools, start_read_your_writes
+from query_stats import set_request_scope
+
+READ_YOUR_WRITES_COOKIE = "db_primary_until"
+# Complete bodies larger than this are compressed off the event loop
+COMPRESS_IN_THREAD_ABOVE = 256 * 1024
+
+class QueryTaggingMiddleware:
+    """Tag every query a request runs with the request's route for query_stats"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            set_request_scope(scope)
+        await self.app(scope, receive, send)
+
+class ReadYourWritesMiddleware:
+    """Keep a client's reads on the primary for a short while after it writes.
+
+    The deadline travels in a cookie so it holds across requests and across
+    workers; a no-op when no replicas are configured.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not replica_pools:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            primary_until = float(HTTPConnection(scope).cookies.get(READ_YOUR_WRITES_COOKIE, 0))
+        except ValueError:
+            primary_until = 0.0
+        state = start_read_your_writes(primary_until)
+
+        async def send_with_cookie(message: Message):
+            if message["type"] == "http.response.start" and state.wrote:
+                max_age = max(1, math.ceil(state.primary_until - time.time()))
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{READ_YOUR_WRITES_COOKIE}={state.primary_until:.3f}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+class ConditionalGetMiddleware:
+    """Send the ETag a route set with conditional.check_etag.
+
+    Cache-Control: no-cache lets browsers keep the response but revalidate
+    it on every use, which is what makes them send If-None-Match.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_etag(message: Message):
+            if message["type"] == "http.response.start" and message["status"] in (200, 304):
+                etag = scope.get("state", {}).get("etag")
+                if etag:
+                    headers = MutableHeaders(scope=message)
+                    headers["etag"] = etag
+                    headers.setdefault("cache-control", "no-cache")
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, as the client accepts.
+
+    Bodies under COMPRESSION_MIN_SIZE and types that do not compress (images,
+    archives) pass through. A response with an ETag has the same body each
+    time, so its compressed body is kept in compressed_cache. Routes with
+    an ETag (conditional.check_etag) are answered from it before they run
+    their query; other responses, such as static files, are built and then
+    replaced by the cached body. Streamed bodies are compressed chunk by
+    chunk.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+
+        start = None
+        compressor = None
+        content_type = ""
+        cache_key = None
+        cached = None
+        chunks = []
+        chunks_size = 0
+        passthrough = False
+
+        async def send_compressed(message: Message):
+            nonlocal start, compressor, content_type, cache_key, cached, chunks_size, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if is_compressible(content_type):
+                    MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+                content_length = headers.get("content-length")
+                if (
+                    encoding is None
+                    or message["status"] != 200
+                    or "content-encoding" in headers
+                    or "content-range" in headers
+                    or not is_compressible(content_type)
+                    or (content_length is not None and int(content_length) < COMPRESSION_MIN_SIZE)
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                start = message
+                etag = headers.get("etag")
+                if etag:
+                    cache_key = compressed_cache_key(scope, etag, encoding)
+                    # check_etag already looked this response up
+                    if scope.get("state", {}).get("etag") != etag:
+                        cached = compressed_cache.get(cache_key)
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if cached is not None:
+                # The app's body is the one cached: drop it and send ours
+                if not more_body:
+                    await send(self._start(start, encoding, len(cached[1])))
+                    await send({"type": "http.response.body", "body": cached[1]})
+                return
+
+            if compressor is None and not more_body:
+                # The whole body in one message
+                if len(body) < COMPRESSION_MIN_SIZE:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                if len(body) > COMPRESS_IN_THREAD_ABOVE:
+                    compressed = await run_in_threadpool(compress, body, encoding)
+                else:
+                    compressed = compress(body, encoding)
+                if cache_key is not None:
+                    compressed_cache.put(cache_key, content_type, compressed)
+                await send(self._start(start, encoding, len(compressed)))
+                await send({"type": "http.response.body", "body": compressed})
+                return
+
+            if compressor is None:
+                compressor = Compressor(encoding)
+                await send(self._start(start, encoding, None))
+            # Flushed per chunk: a streamed list's first rows go out at once
+            # instead of waiting in the compressor's buffer
+            data = compressor.compress(body) + (compressor.flush() if more_body else compressor.finish())
+            if cache_key is not None:
+                chunks.append(data)
+                chunks_size += len(data)
+                # Too big for the cache to keep: stop holding the body
+                if chunks_size > compressed_cache.max_body_bytes:
+                    cache_key = None
+                    chunks.clear()
+            if data or not more_body:
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+            if not more_body and cache_key is not None:
+                compressed_cache.put(cache_key, content_type, b"".join(chunks))
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _start(start: Message, encoding: str, content_length):
+        headers = MutableHeaders(scope=start)
+        headers["content-encoding"] = encoding
+        if content_length is None:
+            del headers["content-length"]
+        else:
+            headers["content-length"] = str(content_length)
+        # The compressed body differs byte for byte: a strong ETag becomes weak
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["etag"] = f"W/{etag}"
+        return start
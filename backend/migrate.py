@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Versioned migration runner.
+Applies the pending files of migrations/ in version order and records each
+one, with a checksum, in the schema_migrations table.
+
+Migration files are named NNNN_description.sql and never edited once
+applied; a changed checksum stops the run. Each file runs in its own
+transaction, unless its first line is `-- migrate:no-transaction`: such a
+file runs statement by statement, which CREATE/DROP INDEX CONCURRENTLY
+requires, so building an index never blocks writes to a large table. Its
+statements must be safe to re-run (IF NOT EXISTS), since a failure leaves
+the earlier ones applied.
+
+An advisory lock lets only one runner at a time work on a database, so
+every instance of a deploy can run it.
+
+Usage:
+    python migrate.py                   apply pending migrations
+    python migrate.py --status          list applied and pending migrations
+    python migrate.py --baseline 0001   record migrations up to 0001 as
+                                        applied without running them (for a
+                                        database set up from the old schema)
+    python migrate.py --sql             print all migrations as one script,
+                                        for SQL editors such as Supabase's
+"""
+
+import psycopg2
+from psycopg2 import Error
+import argparse
+import hashlib
+import os
+import re
+import sys
+import time
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'database': os.getenv('DB_NAME', 'postgres'),
+    'user': os.getenv('DB_USER', 'postgres'),
+    'password': os.getenv('DB_PASSWORD', ''),
+    'port': int(os.getenv('DB_PORT', 5432))
+}
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+NO_TRANSACTION = '-- migrate:no-transaction'
+# Any fixed key works, as long as nothing else takes the same advisory lock
+MIGRATION_LOCK_ID = 8021341
+LOCK_POLL_SECONDS = 1
+
+MIGRATIONS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    checksum CHAR(64) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    duration_ms INTEGER
+);
+"""
+
+class Migration:
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.version = int(self.name.split('_', 1)[0])
+        with open(path, 'rb') as file:
+            content = file.read()
+        self.checksum = hashlib.sha256(content).hexdigest()
+        self.sql = content.decode('utf-8')
+        self.transactional = not self.sql.startswith(NO_TRANSACTION)
+
+def load_migrations():
+    """Migration files in version order; refuses duplicate versions."""
+    migrations = [
+        Migration(os.path.join(MIGRATIONS_DIR, name))
+        for name in sorted(os.listdir(MIGRATIONS_DIR))
+        if re.match(r'^\d+_\w+\.sql$', name)
+    ]
+    versions = [migration.version for migration in migrations]
+    duplicates = sorted({version for version in versions if versions.count(version) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate migration versions: {', '.join(map(str, duplicates))}")
+    return migrations
+
+def split_statements(sql):
+    """Split a script into statements at the semicolons outside of quotes,
+    dollar-quoted bodies and comments."""
+    statements = []
+    start = 0
+    i = 0
+    while i < len(sql):
+        if sql.startswith('--', i):
+            end = sql.find('\n', i)
+            i = len(sql) if end == -1 else end + 1
+        elif sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            i = len(sql) if end == -1 else end + 2
+        elif sql[i] in ("'", '"'):
+            end = sql.find(sql[i], i + 1)
+            i = len(sql) if end == -1 else end + 1
+        elif sql[i] == '$':
+            tag = re.match(r'\$\w*\$', sql[i:])
+            if tag:
+                end = sql.find(tag.group(), i + len(tag.group()))
+                i = len(sql) if end == -1 else end + len(tag.group())
+            else:
+                i += 1
+        elif sql[i] == ';':
+            statements.append(sql[start:i + 1])
+            start = i = i + 1
+        else:
+            i += 1
+    statements.append(sql[start:])
+    # Drop what is only whitespace and comments
+    return [
+        statement.strip() for statement in statements
+        if re.sub(r'--[^\n]*', '', statement).strip(' \t\r\n;')
+    ]
+
+def drop_invalid_index(cursor, statement):
+    """A failed CREATE INDEX CONCURRENTLY leaves an invalid index behind, which
+    IF NOT EXISTS would then skip on the next run: drop it."""
+    match = re.search(r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)', statement, re.IGNORECASE)
+    if not match:
+        return
+    cursor.execute(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = %s AND NOT i.indisvalid", (match.group(1),)
+    )
+    if cursor.fetchone():
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {match.group(1)}")
+        print(f"   Dropped the invalid index {match.group(1)} left by the failure")
+
+def record(cursor, migration, duration_ms):
+    cursor.execute(
+        "INSERT INTO schema_migrations (version, name, checksum, duration_ms) VALUES (%s, %s, %s, %s)",
+        (migration.version, migration.name, migration.checksum, duration_ms)
+    )
+
+def apply_migration(connection, migration):
+    """Apply one migration and record it; raises on failure."""
+    started = time.monotonic()
+    cursor = connection.cursor()
+    if migration.transactional:
+        connection.autocommit = False
+        try:
+            cursor.execute(migration.sql)
+            record(cursor, migration, int((time.monotonic() - started) * 1000))
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.autocommit = True
+    else:
+        for statement in split_statements(migration.sql):
+            try:
+                cursor.execute(statement)
+            except Exception:
+                drop_invalid_index(cursor, statement)
+                raise
+        record(cursor, migration, int((time.monotonic() - started) * 1000))
+    cursor.close()
+
+def applied_migrations(cursor):
+    cursor.execute("SELECT version, name, checksum FROM schema_migrations ORDER BY version")
+    return {version: (name, checksum) for version, name, checksum in cursor.fetchall()}
+
+def changed_migrations(migrations, applied):
+    """Applied migrations whose file no longer matches what was applied"""
+    return [
+        migration for migration in migrations
+        if migration.version in applied and applied[migration.version][1] != migration.checksum
+    ]
+
+def migrate(baseline=None, status=False):
+    """Apply pending migrations (or record/list them); True on success."""
+    connection = None
+    try:
+        migrations = load_migrations()
+
+        print("Connecting to database...")
+        connection = psycopg2.connect(**DB_CONFIG)
+        connection.autocommit = True
+        cursor = connection.cursor()
+
+        # Poll rather than block in pg_advisory_lock(): a session waiting
+        # inside a statement holds a snapshot, and CREATE INDEX CONCURRENTLY
+        # in the session holding the lock would wait for it - a deadlock
+        waiting = False
+        while True:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+            if cursor.fetchone()[0]:
+                break
+            if not waiting:
+                print("Another migration run holds the lock, waiting for it to finish...")
+                waiting = True
+            time.sleep(LOCK_POLL_SECONDS)
+
+        cursor.execute(MIGRATIONS_TABLE_SQL)
+        applied = applied_migrations(cursor)
+
+        changed = changed_migrations(migrations, applied)
+        for migration in changed:
+            print(f"❌ {migration.name} was changed after it was applied (checksum mismatch)")
+        if changed:
+            print("Applied migrations must not be edited; add a new migration instead.")
+            return False
+
+        pending = [migration for migration in migrations if migration.version not in applied]
+
+        if status:
+            for migration in migrations:
+                mark = "✅ applied" if migration.version in applied else "⏳ pending"
+                print(f"{mark}  {migration.name}")
+            print(f"\n{len(migrations) - len(pending)} applied, {len(pending)} pending")
+            return True
+
+        if baseline is not None:
+            for migration in pending:
+                if migration.version <= baseline:
+                    record(cursor, migration, None)
+                    print(f"✅ Recorded {migration.name} as applied")
+            return True
+
+        if not pending:
+            print("✅ Database is up to date")
+            return True
+
+        for migration in pending:
+            mode = "" if migration.transactional else " (outside a transaction)"
+            print(f"Applying {migration.name}{mode}...")
+            started = time.monotonic()
+            apply_migration(connection, migration)
+            print(f"✅ {migration.name} applied in {time.monotonic() - started:.1f}s")
+        return True
+
+    except (Error, ValueError) as e:
+        print(f"❌ Migration failed: {e}")
+        return False
+
+    finally:
+        if connection:
+            # Closing the session releases the advisory lock
+            connection.close()
+        print("Database connection closed.")
+
+def migrations_sql():
+    """All migrations as one script for SQL editors, which run a script in a
+    single transaction: CONCURRENTLY cannot run there and is not needed on
+    a new database."""
+    parts = [
+        "-- Generated by `python backend/migrate.py --sql` from backend/migrations/.\n"
+        "-- Edit the migrations, not this file. For a new database only: existing\n"
+        "-- databases are upgraded with `python backend/migrate.py`.\n"
+    ]
+    for migration in load_migrations():
+        sql = migration.sql
+        if not migration.transactional:
+            sql = re.sub(r'\s+CONCURRENTLY\b', '', sql[len(NO_TRANSACTION):].lstrip('\n'))
+        parts.append(f"\n-- {migration.name}\n\n{sql.rstrip()}\n")
+    parts.append("\n" + MIGRATIONS_TABLE_SQL.strip() + "\n")
+    parts.append(
+        "\nINSERT INTO schema_migrations (version, name, checksum) VALUES\n" +
+        ",\n".join(f"({m.version}, '{m.name}', '{m.checksum}')" for m in load_migrations()) +
+        "\nON CONFLICT (version) DO NOTHING;\n"
+    )
+    return "".join(parts)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply the database migrations in migrations/")
+    parser.add_argument('--status', action='store_true', help="list applied and pending migrations")
+    parser.add_argument('--baseline', type=int, metavar='VERSION',
+                        help="record migrations up to VERSION as applied without running them")
+    parser.add_argument('--sql', action='store_true', help="print all migrations as one SQL script")
+    args = parser.parse_args()
+
+    if args.sql:
+        sys.stdout.write(migrations_sql())
+        sys.exit(0)
+
+    print("🚀 Starting database migration...")
+    success = migrate(baseline=args.baseline, status=args.status)
+
+    if success:
+        print("\n🎉 Migration completed successfully!")
+    else:
+        print("\n💥 Migration failed!")
+        print("Please check your database configuration and try again.")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,7 @@
+-- migrate:no-transaction
+-- Composite indexes matching the ORDER BY of the paginated /customers and
+-- /users lists, so a keyset page is an index range scan of `limit` rows
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_name_id ON customers(name, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_name_id ON users(name, id);
@@ -0,0 +1,25 @@
+-- migrate:no-transaction
+-- Indexes behind the sort and filter options of the paginated /projects,
+-- /quotes, /accounts and /suppliers lists. Every sort key is paired with
+-- the id tiebreaker so a page is read in index order and the scan stops
+-- after LIMIT + OFFSET rows; status filters get (status, date, id) so the
+-- default newest-first order still comes straight from the index.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_date_id ON projects(date, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_name_id ON projects(name, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_status_date_id ON projects(status, date, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_quotes_date_id ON quotes(date, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_quotes_name_id ON quotes(name, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_quotes_sell_price_id ON quotes(sell_price, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_quotes_status_date_id ON quotes(status, date, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customer_accounts_date_id ON customer_accounts(date, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customer_accounts_name_id ON customer_accounts(name, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customer_accounts_outstanding_id ON customer_accounts(outstanding, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customer_accounts_open_date_id ON customer_accounts(date, id) WHERE outstanding > 0;
+
+-- (name, id) covers everything the single-column name index did
+DROP INDEX CONCURRENTLY IF EXISTS idx_suppliers_name;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_suppliers_name_id ON suppliers(name, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_suppliers_category_id ON suppliers(category, id);
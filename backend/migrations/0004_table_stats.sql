@@ -0,0 +1,88 @@
+-- Row counts and change versions for the paginated tables, maintained by
+-- statement-level triggers. List endpoints read unfiltered totals from here
+-- instead of running COUNT(*), and cache filtered counts per version.
+
+CREATE TABLE IF NOT EXISTS table_stats (
+    table_name VARCHAR(63) PRIMARY KEY,
+    row_count BIGINT NOT NULL DEFAULT 0,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION table_stats_after_insert()
+RETURNS TRIGGER AS $$
+DECLARE
+    inserted BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO inserted FROM new_rows;
+    IF inserted > 0 THEN
+        UPDATE table_stats SET row_count = row_count + inserted, version = version + 1
+        WHERE table_name = TG_TABLE_NAME;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION table_stats_after_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM new_rows) THEN
+        UPDATE table_stats SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION table_stats_after_delete()
+RETURNS TRIGGER AS $$
+DECLARE
+    deleted BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO deleted FROM old_rows;
+    IF deleted > 0 THEN
+        UPDATE table_stats SET row_count = row_count - deleted, version = version + 1
+        WHERE table_name = TG_TABLE_NAME;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION table_stats_after_truncate()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE table_stats SET row_count = 0, version = version + 1 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Attach the triggers and take the initial count with writers locked out,
+-- so no row is counted twice or missed
+CREATE OR REPLACE FUNCTION track_table_stats(tracked regclass)
+RETURNS VOID AS $$
+DECLARE
+    name TEXT := (SELECT relname FROM pg_class WHERE oid = tracked);
+BEGIN
+    EXECUTE format('LOCK TABLE %s IN SHARE MODE', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_stats_insert', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_stats_update', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_stats_delete', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_stats_truncate', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER INSERT ON %s REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION table_stats_after_insert()', name || '_stats_insert', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER UPDATE ON %s REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION table_stats_after_update()', name || '_stats_update', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER DELETE ON %s REFERENCING OLD TABLE AS old_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION table_stats_after_delete()', name || '_stats_delete', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER TRUNCATE ON %s
+                    FOR EACH STATEMENT EXECUTE FUNCTION table_stats_after_truncate()', name || '_stats_truncate', tracked);
+    EXECUTE format('INSERT INTO table_stats (table_name, row_count, version) SELECT %L, COUNT(*), 1 FROM %s
+                    ON CONFLICT (table_name) DO UPDATE SET row_count = EXCLUDED.row_count,
+                    version = table_stats.version + 1', name, tracked);
+END;
+$$ language 'plpgsql';
+
+SELECT track_table_stats('users');
+SELECT track_table_stats('customers');
+SELECT track_table_stats('suppliers');
+SELECT track_table_stats('projects');
+SELECT track_table_stats('quotes');
+SELECT track_table_stats('customer_accounts');
@@ -0,0 +1,19 @@
+-- migrate:no-transaction
+-- Trigram indexes for the substring search of /customers, /suppliers and
+-- /users. `col ILIKE '%term%'` can use a gin_trgm_ops index, and the OR of
+-- one ILIKE per column becomes a BitmapOr of these indexes instead of a
+-- sequential scan of the whole table, so search stays fast as tables grow.
+-- Terms shorter than three characters carry no trigrams and still scan.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_name_trgm ON customers USING gin (name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_email_trgm ON customers USING gin (email gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_category_trgm ON customers USING gin (category gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_suppliers_name_trgm ON suppliers USING gin (name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_suppliers_email_trgm ON suppliers USING gin (email gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_suppliers_category_trgm ON suppliers USING gin (category gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_name_trgm ON users USING gin (name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_email_trgm ON users USING gin (email gin_trgm_ops);
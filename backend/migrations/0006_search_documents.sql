@@ -0,0 +1,114 @@
+-- Global search (GET /search): one tsvector document per customer, supplier,
+-- project, quote and account, kept in step with its row by statement-level
+-- triggers and searched through a single GIN index. The documents live in
+-- their own table so the `SELECT t.*` list queries do not carry them.
+
+CREATE TABLE IF NOT EXISTS search_documents (
+    entity VARCHAR(20) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    detail TEXT,
+    document TSVECTOR NOT NULL,
+    PRIMARY KEY (entity, entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_search_documents_document ON search_documents USING gin (document);
+
+-- Words of a column as a weighted tsvector. Punctuation separates words on
+-- both sides of the match (search_query() in routes/search.py splits the
+-- same way), so INV-2024-001 is found by "2024-00" and an email by its
+-- domain. The 'simple' configuration leaves codes and names unstemmed.
+CREATE OR REPLACE FUNCTION search_words(value TEXT, weight "char")
+RETURNS TSVECTOR AS $$
+    SELECT setweight(to_tsvector('simple', regexp_replace(coalesce(value, ''), '[\W_]+', ' ', 'g')), weight)
+$$ language 'sql' IMMUTABLE;
+
+-- What is searchable, defined once for the triggers and the backfill.
+-- Identifiers (A) rank over names (B) over the rest (C).
+CREATE OR REPLACE VIEW search_sources AS
+SELECT 'customer'::VARCHAR(20) AS entity, id AS entity_id, name::TEXT AS label, email::TEXT AS detail,
+       search_words(name, 'A') || search_words(concat_ws(' ', contact_name, email, contact_email), 'B') ||
+       search_words(category, 'C') AS document
+FROM customers
+UNION ALL
+SELECT 'supplier', id, name, email,
+       search_words(name, 'A') || search_words(concat_ws(' ', contact_name, email, contact_email), 'B') ||
+       search_words(category, 'C')
+FROM suppliers
+UNION ALL
+SELECT 'project', id, name, project_id,
+       search_words(project_id, 'A') || search_words(name, 'B') || search_words(end_user, 'C')
+FROM projects
+UNION ALL
+SELECT 'quote', id, name, job_id,
+       search_words(job_id, 'A') || search_words(name, 'B')
+FROM quotes
+UNION ALL
+SELECT 'account', id, name, invoice_number,
+       search_words(invoice_number, 'A') || search_words(name, 'B') || search_words(comments, 'C')
+FROM customer_accounts;
+
+-- TG_ARGV[0] is the entity the table's rows are indexed as
+CREATE OR REPLACE FUNCTION search_documents_after_write()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO search_documents (entity, entity_id, label, detail, document)
+    SELECT entity, entity_id, label, detail, document FROM search_sources
+    WHERE entity = TG_ARGV[0] AND entity_id IN (SELECT id FROM new_rows)
+    ON CONFLICT (entity, entity_id) DO UPDATE
+    SET label = EXCLUDED.label, detail = EXCLUDED.detail, document = EXCLUDED.document
+    -- Updates that touch no searchable column leave the document alone
+    WHERE (search_documents.label, search_documents.detail, search_documents.document)
+          IS DISTINCT FROM (EXCLUDED.label, EXCLUDED.detail, EXCLUDED.document);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION search_documents_after_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM search_documents
+    WHERE entity = TG_ARGV[0] AND entity_id IN (SELECT id FROM old_rows);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION search_documents_after_truncate()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM search_documents WHERE entity = TG_ARGV[0];
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Attach the triggers and index the existing rows with writers locked out,
+-- as track_table_stats does
+CREATE OR REPLACE FUNCTION track_search_documents(tracked regclass, entity_name TEXT)
+RETURNS VOID AS $$
+DECLARE
+    name TEXT := (SELECT relname FROM pg_class WHERE oid = tracked);
+BEGIN
+    EXECUTE format('LOCK TABLE %s IN SHARE MODE', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_search_insert', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_search_update', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_search_delete', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_search_truncate', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER INSERT ON %s REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION search_documents_after_write(%L)', name || '_search_insert', tracked, entity_name);
+    EXECUTE format('CREATE TRIGGER %I AFTER UPDATE ON %s REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION search_documents_after_write(%L)', name || '_search_update', tracked, entity_name);
+    EXECUTE format('CREATE TRIGGER %I AFTER DELETE ON %s REFERENCING OLD TABLE AS old_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION search_documents_after_delete(%L)', name || '_search_delete', tracked, entity_name);
+    EXECUTE format('CREATE TRIGGER %I AFTER TRUNCATE ON %s
+                    FOR EACH STATEMENT EXECUTE FUNCTION search_documents_after_truncate(%L)', name || '_search_truncate', tracked, entity_name);
+    DELETE FROM search_documents WHERE entity = entity_name;
+    INSERT INTO search_documents (entity, entity_id, label, detail, document)
+    SELECT entity, entity_id, label, detail, document FROM search_sources WHERE entity = entity_name;
+END;
+$$ language 'plpgsql';
+
+SELECT track_search_documents('customers', 'customer');
+SELECT track_search_documents('suppliers', 'supplier');
+SELECT track_search_documents('projects', 'project');
+SELECT track_search_documents('quotes', 'quote');
+SELECT track_search_documents('customer_accounts', 'account');
@@ -0,0 +1,27 @@
+-- migrate:no-transaction
+-- Indexes for the foreign key columns and the per-customer lists.
+--
+-- /customers/{id}/projects, /quotes and /accounts filter on customer_id and
+-- order by date DESC: (customer_id, date) serves both, read backwards. The
+-- same indexes turn the ON DELETE CASCADE of a customer from a scan of each
+-- child table into an index lookup, and the engineer/salesman/project
+-- indexes do that for the ON DELETE SET NULL of users and projects.
+--
+-- The list queries join users, customers and projects only for their name;
+-- (id) INCLUDE (name) answers those lookups from the index alone.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_customer_id_date ON projects(customer_id, date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_quotes_customer_id_date ON quotes(customer_id, date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customer_accounts_customer_id_date ON customer_accounts(customer_id, date);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customer_accounts_project_id ON customer_accounts(project_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_engineer_id ON projects(engineer_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_salesman_id ON projects(salesman_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_quotes_engineer_id ON quotes(engineer_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_quotes_salesman_id ON quotes(salesman_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_sales_rep_id ON customers(sales_rep_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_currency_id ON customers(currency_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_id_name ON users(id) INCLUDE (name);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_id_name ON customers(id) INCLUDE (name);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_id_name ON projects(id) INCLUDE (name);
@@ -0,0 +1,34 @@
+-- Notify every app worker when a reference table changes, so each drops its
+-- cached copy (reference_cache.py) whichever worker or client made the write.
+-- The payload is the table name; notifications are delivered on commit.
+
+CREATE OR REPLACE FUNCTION notify_reference_data_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('reference_data_changed', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION track_reference_data(tracked regclass)
+RETURNS VOID AS $$
+DECLARE
+    name TEXT := (SELECT relname FROM pg_class WHERE oid = tracked);
+BEGIN
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_reference_changed', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_reference_truncated', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE ON %s
+                    FOR EACH STATEMENT EXECUTE FUNCTION notify_reference_data_changed()', name || '_reference_changed', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER TRUNCATE ON %s
+                    FOR EACH STATEMENT EXECUTE FUNCTION notify_reference_data_changed()', name || '_reference_truncated', tracked);
+END;
+$$ language 'plpgsql';
+
+SELECT track_reference_data('departments');
+SELECT track_reference_data('locations');
+SELECT track_reference_data('manufacturers');
+SELECT track_reference_data('teams');
+SELECT track_reference_data('warehouses');
+SELECT track_reference_data('commissions');
+SELECT track_reference_data('currencies');
+SELECT track_reference_data('account_types');
@@ -0,0 +1,4 @@
+-- Conditional GETs build their ETags from table_stats versions: track the
+-- tables joined into list responses that are not tracked yet
+SELECT track_table_stats('currencies');
+SELECT track_table_stats('chart_of_accounts');
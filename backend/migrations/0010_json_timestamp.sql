@@ -0,0 +1,19 @@
+-- Timestamps as JSON exactly as the API's encoder writes them (responses.py,
+-- Python's isoformat()): six digits of microseconds, left out entirely when
+-- zero. to_json() trims trailing zeros instead. List responses built in
+-- Postgres (sql_json.py) pass their timestamp columns through these; every
+-- other column type they use already agrees with to_json().
+
+CREATE OR REPLACE FUNCTION json_timestamp(value timestamp)
+RETURNS json AS $$
+    SELECT to_json(to_char(value, CASE WHEN date_part('microseconds', value)::bigint % 1000000 = 0
+                                       THEN 'YYYY-MM-DD"T"HH24:MI:SS'
+                                       ELSE 'YYYY-MM-DD"T"HH24:MI:SS.US' END))
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION json_timestamp(value timestamptz)
+RETURNS json AS $$
+    SELECT to_json(to_char(value, CASE WHEN date_part('microseconds', value)::bigint % 1000000 = 0
+                                       THEN 'YYYY-MM-DD"T"HH24:MI:SSTZH:TZM'
+                                       ELSE 'YYYY-MM-DD"T"HH24:MI:SS.USTZH:TZM' END))
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,89 @@
+-- Row counts and amounts per bucket (a status, active or not, open or
+-- settled) for the /dashboard/summary endpoint, maintained by
+-- statement-level triggers like table_stats. Each write adds the change
+-- of its rows to the buckets they left and entered, so the dashboard reads
+-- a handful of rows instead of scanning the tables.
+
+CREATE TABLE IF NOT EXISTS summary_totals (
+    table_name VARCHAR(63) NOT NULL,
+    bucket VARCHAR(100) NOT NULL,
+    row_count BIGINT NOT NULL DEFAULT 0,
+    amount NUMERIC NOT NULL DEFAULT 0,
+    PRIMARY KEY (table_name, bucket)
+);
+
+-- TG_ARGV: the bucket and amount expressions over a row of the table
+CREATE OR REPLACE FUNCTION summary_totals_changed()
+RETURNS TRIGGER AS $$
+DECLARE
+    added TEXT := format('SELECT %s, 1, %s FROM new_rows', TG_ARGV[0], TG_ARGV[1]);
+    removed TEXT := format('SELECT %s, -1, -(%s) FROM old_rows', TG_ARGV[0], TG_ARGV[1]);
+    changes TEXT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changes := added;
+    ELSIF TG_OP = 'DELETE' THEN
+        changes := removed;
+    ELSE
+        changes := added || ' UNION ALL ' || removed;
+    END IF;
+    -- Updates that leave a bucket's totals as they were write nothing;
+    -- buckets are locked in name order so concurrent writers cannot deadlock
+    EXECUTE format(
+        'INSERT INTO summary_totals (table_name, bucket, row_count, amount)
+         SELECT %L, bucket, SUM(row_count), SUM(amount)
+         FROM (%s) changes(bucket, row_count, amount)
+         GROUP BY bucket
+         HAVING SUM(row_count) <> 0 OR SUM(amount) <> 0
+         ORDER BY bucket
+         ON CONFLICT (table_name, bucket) DO UPDATE
+         SET row_count = summary_totals.row_count + EXCLUDED.row_count,
+             amount = summary_totals.amount + EXCLUDED.amount',
+        TG_TABLE_NAME, changes
+    );
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION summary_totals_truncated()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM summary_totals WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Attach the triggers and take the initial totals with writers locked out
+CREATE OR REPLACE FUNCTION track_summary_totals(tracked regclass, bucket TEXT, amount TEXT)
+RETURNS VOID AS $$
+DECLARE
+    name TEXT := (SELECT relname FROM pg_class WHERE oid = tracked);
+BEGIN
+    EXECUTE format('LOCK TABLE %s IN SHARE MODE', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_summary_insert', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_summary_update', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_summary_delete', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_summary_truncate', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER INSERT ON %s REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION summary_totals_changed(%L, %L)',
+                   name || '_summary_insert', tracked, bucket, amount);
+    EXECUTE format('CREATE TRIGGER %I AFTER UPDATE ON %s REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION summary_totals_changed(%L, %L)',
+                   name || '_summary_update', tracked, bucket, amount);
+    EXECUTE format('CREATE TRIGGER %I AFTER DELETE ON %s REFERENCING OLD TABLE AS old_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION summary_totals_changed(%L, %L)',
+                   name || '_summary_delete', tracked, bucket, amount);
+    EXECUTE format('CREATE TRIGGER %I AFTER TRUNCATE ON %s
+                    FOR EACH STATEMENT EXECUTE FUNCTION summary_totals_truncated()',
+                   name || '_summary_truncate', tracked);
+    DELETE FROM summary_totals WHERE table_name = name;
+    EXECUTE format('INSERT INTO summary_totals (table_name, bucket, row_count, amount)
+                    SELECT %L, %s, COUNT(*), SUM(%s) FROM %s GROUP BY 2',
+                   name, bucket, amount, tracked);
+END;
+$$ language 'plpgsql';
+
+SELECT track_summary_totals('users', 'CASE WHEN active THEN ''active'' ELSE ''inactive'' END', '0');
+SELECT track_summary_totals('quotes', 'COALESCE(status, '''')', 'COALESCE(sell_price, 0)');
+SELECT track_summary_totals('projects', 'COALESCE(status, '''')', '0');
+SELECT track_summary_totals('customer_accounts', 'CASE WHEN outstanding > 0 THEN ''open'' ELSE ''settled'' END', 'outstanding');
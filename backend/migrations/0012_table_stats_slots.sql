@@ -0,0 +1,110 @@
+-- Spread each table's table_stats counters over 16 slot rows. With one row
+-- per table, every write transaction held that row's lock until it
+-- committed, so concurrent writers to a table ran one at a time. Each
+-- backend now updates the slot picked by its process id, and table_stats
+-- becomes a view summing the slots: a version still changes on every
+-- write, and readers are unchanged.
+
+-- The slot a backend's counter updates go to; summary_totals uses it too
+CREATE OR REPLACE FUNCTION counter_slot()
+RETURNS SMALLINT AS $$
+    SELECT (pg_backend_pid() % 16)::SMALLINT;
+$$ language 'sql' STABLE;
+
+CREATE TABLE IF NOT EXISTS table_stats_slots (
+    table_name VARCHAR(63) NOT NULL,
+    slot SMALLINT NOT NULL,
+    row_count BIGINT NOT NULL DEFAULT 0,
+    version BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (table_name, slot)
+);
+
+-- Slot 0 carries the counters so far; the others start at zero
+INSERT INTO table_stats_slots (table_name, slot, row_count, version)
+SELECT table_name, slot, CASE WHEN slot = 0 THEN row_count ELSE 0 END, CASE WHEN slot = 0 THEN version ELSE 0 END
+FROM table_stats CROSS JOIN generate_series(0, 15) slot;
+
+DROP TABLE table_stats;
+
+CREATE VIEW table_stats AS
+SELECT table_name, SUM(row_count)::BIGINT AS row_count, SUM(version)::BIGINT AS version
+FROM table_stats_slots
+GROUP BY table_name;
+
+CREATE OR REPLACE FUNCTION table_stats_after_insert()
+RETURNS TRIGGER AS $$
+DECLARE
+    inserted BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO inserted FROM new_rows;
+    IF inserted > 0 THEN
+        UPDATE table_stats_slots SET row_count = row_count + inserted, version = version + 1
+        WHERE table_name = TG_TABLE_NAME AND slot = counter_slot();
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION table_stats_after_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM new_rows) THEN
+        UPDATE table_stats_slots SET version = version + 1
+        WHERE table_name = TG_TABLE_NAME AND slot = counter_slot();
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION table_stats_after_delete()
+RETURNS TRIGGER AS $$
+DECLARE
+    deleted BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO deleted FROM old_rows;
+    IF deleted > 0 THEN
+        UPDATE table_stats_slots SET row_count = row_count - deleted, version = version + 1
+        WHERE table_name = TG_TABLE_NAME AND slot = counter_slot();
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- TRUNCATE already locks writers out of the table, so taking every slot is free
+CREATE OR REPLACE FUNCTION table_stats_after_truncate()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE table_stats_slots SET row_count = 0, version = version + 1 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- As in 0004, but the initial count goes to slot 0 and the version keeps
+-- growing across re-tracking, so no ETag or cached count comes back
+CREATE OR REPLACE FUNCTION track_table_stats(tracked regclass)
+RETURNS VOID AS $$
+DECLARE
+    name TEXT := (SELECT relname FROM pg_class WHERE oid = tracked);
+    previous BIGINT;
+BEGIN
+    EXECUTE format('LOCK TABLE %s IN SHARE MODE', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_stats_insert', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_stats_update', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_stats_delete', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_stats_truncate', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER INSERT ON %s REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION table_stats_after_insert()', name || '_stats_insert', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER UPDATE ON %s REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION table_stats_after_update()', name || '_stats_update', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER DELETE ON %s REFERENCING OLD TABLE AS old_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION table_stats_after_delete()', name || '_stats_delete', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER TRUNCATE ON %s
+                    FOR EACH STATEMENT EXECUTE FUNCTION table_stats_after_truncate()', name || '_stats_truncate', tracked);
+    previous := COALESCE((SELECT SUM(version) FROM table_stats_slots WHERE table_name = name), 0);
+    DELETE FROM table_stats_slots WHERE table_name = name;
+    EXECUTE format('INSERT INTO table_stats_slots (table_name, slot, row_count, version)
+                    SELECT %L, slot, CASE WHEN slot = 0 THEN total ELSE 0 END, CASE WHEN slot = 0 THEN %s + 1 ELSE 0 END
+                    FROM (SELECT COUNT(*) AS total FROM %s) counted CROSS JOIN generate_series(0, 15) slot',
+                   name, previous, tracked);
+END;
+$$ language 'plpgsql';
@@ -0,0 +1,265 @@
+"""
+Pagination, sorting and filtering helpers for list endpoints
+"""
+import os
+import re
+import base64
+import json
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from database import execute_query_async
+from responses import RowsJSONResponse
+from sql_json import fetch_json_rows
+
+DEFAULT_PAGE_SIZE = 10
+
+# Filtered counts on tables bigger than this are planner estimates
+COUNT_ESTIMATE_ABOVE = int(os.getenv('DB_COUNT_ESTIMATE_ABOVE', 200000))
+COUNT_CACHE_SIZE = int(os.getenv('DB_COUNT_CACHE_SIZE', 1000))
+
+class CountCache:
+    """Exact filtered counts, each valid while its table's version is unchanged.
+
+    Versions live in table_stats and are bumped by triggers on every write,
+    so a write through any worker (or psql) invalidates every cached count
+    of that table.
+    """
+
+    def __init__(self, max_size: int = COUNT_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._counts = OrderedDict()
+
+    def get(self, key: tuple, version: int) -> Optional[int]:
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._counts.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: tuple, version: int, total: int):
+        with self._lock:
+            self._counts[key] = (version, total)
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_size:
+                self._counts.popitem(last=False)
+
+# Global count cache
+count_cache = CountCache()
+
+async def count_rows(table: str, where: str = "", params: tuple = (), alias: str = "") -> Tuple[int, bool]:
+    """
+    Number of rows of table matching where, without rescanning it per request
+
+    Unfiltered totals come from the trigger-maintained table_stats row;
+    filtered totals are counted once per table version, or estimated by the
+    planner when the table holds more than DB_COUNT_ESTIMATE_ABOVE rows.
+
+    Args:
+        table: Table name, as tracked in table_stats
+        where: WHERE clause from where_clause(), or ""
+        params: Parameters of the WHERE clause
+        alias: Table alias the WHERE clause refers to
+
+    Returns:
+        (total, whether the total is exact)
+    """
+    source = f"{table} {alias}".rstrip()
+    stats = await execute_query_async(
+        "SELECT row_count, version FROM table_stats WHERE table_name = %s", (table,), fetch_one=True
+    )
+    if stats is None:
+        result = await execute_query_async(f"SELECT COUNT(*) as total FROM {source}{where}", params or None, fetch_one=True)
+        return result['total'], True
+    if not where:
+        return stats['row_count'], True
+
+    key = (table, alias, where, params)
+    total = count_cache.get(key, stats['version'])
+    if total is not None:
+        return total, True
+
+    if stats['row_count'] > COUNT_ESTIMATE_ABOVE:
+        plan = await execute_query_async(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {source}{where}", params or None, fetch_one=True)
+        return int(plan['QUERY PLAN'][0]['Plan']['Plan Rows']), False
+
+    # Version and count from one statement, i.e. one snapshot, so the count
+    # is never cached under a version it does not belong to
+    result = await execute_query_async(
+        f"SELECT (SELECT version FROM table_stats WHERE table_name = %s) as version, COUNT(*) as total FROM {source}{where}",
+        (table,) + params, fetch_one=True
+    )
+    count_cache.put(key, result['version'], result['total'])
+    return result['total'], True
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque cursor for the sort key values of the last row on a page"""
+    payload = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+# Postgres BIGINT range: a larger integer cannot be compared with an id column
+MAX_CURSOR_INT = 2 ** 63 - 1
+
+def _cursor_value(value: Any, kind: type) -> Any:
+    if kind is int:
+        # bool is an int to Python, not to Postgres
+        if isinstance(value, int) and not isinstance(value, bool) and abs(value) <= MAX_CURSOR_INT:
+            return value
+    elif kind is date:
+        # encode_cursor writes dates as ISO strings
+        if isinstance(value, str):
+            try:
+                return date.fromisoformat(value)
+            except ValueError:
+                pass
+    elif isinstance(value, kind):
+        return value
+    raise ValueError(f"{value!r} is not a {kind.__name__}")
+
+def decode_cursor(cursor: str, types: Tuple[type, ...]) -> List[Any]:
+    """Sort key values from a cursor made by encode_cursor, checked against
+    the types of the sort key columns (int, str or date); 400 if it is not one"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(payload)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("wrong number of values")
+        return [_cursor_value(value, kind) for value, kind in zip(values, types)]
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def next_cursor(rows, limit: int, key_columns: List[str]) -> Optional[str]:
+    """Cursor after the last of limit rows, or None on the last page.
+
+    rows is a list of dicts or a RowSet holding up to limit + 1 rows; the
+    extra row, if present, only signals that there is a next page and is
+    removed here.
+    """
+    if len(rows) <= limit:
+        return None
+    if isinstance(rows, list):
+        del rows[limit:]
+        last = rows[-1]
+        return encode_cursor([last[column] for column in key_columns])
+    del rows.rows[limit:]
+    last = rows.rows[-1]
+    return encode_cursor([last[rows.columns.index(column)] for column in key_columns])
+
+def sort_clause(
+    sort: Optional[str],
+    order: Optional[str],
+    columns: Dict[str, str],
+    default: str,
+    default_order: str,
+    tiebreaker: str
+) -> str:
+    """
+    ORDER BY expression for a whitelisted sort key
+
+    Args:
+        sort: Requested key of columns, or None for the default
+        order: "asc", "desc", or None (the default key's own order, else asc)
+        columns: Sort key -> SQL column; nothing else ever reaches the SQL
+        default: Sort key used when none is requested
+        default_order: Order of the default key
+        tiebreaker: Unique column that makes the order, and so the pages, stable
+
+    Returns:
+        ORDER BY expression
+    """
+    sort = sort or default
+    if sort not in columns:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(columns)}")
+    direction = (order or (default_order if sort == default else "asc")).upper()
+    return f"{columns[sort]} {direction}, {tiebreaker} {direction}"
+
+def output_order(order_by: str, alias: str) -> str:
+    """
+    A sort_clause over alias's columns as the same sort over a query's
+    output columns as t, for sql_json's rewritten queries. The sorted
+    columns must come out under their own names, as with SELECT alias.*
+    """
+    return re.sub(rf'\b{re.escape(alias)}\.', 't.', order_by)
+
+def date_range_filter(column: str, date_from: Optional[date], date_to: Optional[date]) -> Tuple[List[str], tuple]:
+    """WHERE conditions and parameters for an inclusive date range"""
+    conditions = []
+    params = ()
+    if date_from:
+        conditions.append(f"{column} >= %s")
+        params += (date_from,)
+    if date_to:
+        conditions.append(f"{column} <= %s")
+        params += (date_to,)
+    return conditions, params
+
+def search_pattern(search: str) -> str:
+    """ILIKE pattern matching search as a literal substring.
+
+    % and _ typed into a search box are escaped: as wildcards they match
+    far more than the user meant and leave a trigram index nothing to use.
+    """
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def offset_page_query(query: str) -> str:
+    """query limited to one page; parameters (limit, offset) follow its own"""
+    return f"{query} LIMIT %s OFFSET %s"
+
+def where_clause(conditions: List[str]) -> str:
+    return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+async def paginated_response(
+    key: str,
+    query: str,
+    table: str,
+    alias: str,
+    where: str,
+    params: tuple,
+    page: Optional[int],
+    limit: Optional[int],
+    json_order_by: Optional[str] = None
+) -> RowsJSONResponse:
+    """
+    One page of query as {key: [...], pagination: {...}}, like /customers
+
+    Args:
+        key: Name of the list in the response
+        query: Full SELECT including ORDER BY, without LIMIT/OFFSET
+        table: Table being listed, for count_rows
+        alias: Its alias in where
+        where: The query's WHERE clause, for count_rows
+        params: Parameters of the WHERE clause
+        page: Page number (default 1)
+        limit: Page size (default DEFAULT_PAGE_SIZE)
+        json_order_by: Have Postgres encode the rows (see sql_json.py); the
+            query's ORDER BY over its output columns (see output_order)
+    """
+    page = page or 1
+    limit = limit or DEFAULT_PAGE_SIZE
+
+    total, exact = await count_rows(table, where, params, alias)
+
+    page_query = offset_page_query(query)
+    page_params = params + (limit, (page - 1) * limit)
+    if json_order_by is not None:
+        rows = await fetch_json_rows(page_query, json_order_by, page_params)
+    else:
+        rows = await execute_query_async(page_query, page_params, fetch_all=True, as_tuples=True)
+
+    return RowsJSONResponse({
+        key: rows,
+        "pagination": {
+            "page": page,
+            "limit": limit,
+            "total": total,
+            "total_exact": exact,
+            "pages": (total + limit - 1) // limit
+        }
+    })
@@ -0,0 +1,286 @@
+"""
+Per-query timing, latency histograms and the slow-query log
+"""
+import os
+import time
+import random
+import logging
+import threading
+import contextvars
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import psycopg2
+import psycopg2.errors
+
+logger = logging.getLogger(__name__)
+
+# Slow queries go to their own logger so they can be routed to a file
+slow_query_logger = logging.getLogger("slow_queries")
+if os.getenv('DB_SLOW_QUERY_LOG_FILE'):
+    _handler = logging.FileHandler(os.getenv('DB_SLOW_QUERY_LOG_FILE'))
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    slow_query_logger.addHandler(_handler)
+
+SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', 200))
+SLOW_QUERY_PLAN_SAMPLE = float(os.getenv('DB_SLOW_QUERY_PLAN_SAMPLE', 0.1))
+SLOW_QUERY_LOG_SIZE = int(os.getenv('DB_SLOW_QUERY_LOG_SIZE', 200))
+
+# EXPLAIN ANALYZE runs the query again, so a capture must not run away
+PLAN_TIMEOUT_MS = 30000
+# Dynamic SQL must not grow the statistics without bound
+MAX_TRACKED_QUERIES = 2000
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_request_scope: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar('request_scope', default=None)
+
+def set_request_scope(scope: Dict[str, Any]):
+    """Tag the queries of the current request with its route"""
+    _request_scope.set(scope)
+
+def current_route() -> str:
+    """Route template of the request issuing a query, e.g. "GET /customers/{customer_id}/quotes"
+
+    The router fills in scope["route"] after the middleware has run, so it
+    is looked up when the query runs rather than when the request starts.
+    """
+    scope = _request_scope.get()
+    if scope is None:
+        return "-"
+    path = getattr(scope.get("route"), "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}".strip()
+
+@lru_cache(maxsize=4096)
+def normalize_sql(query: str) -> str:
+    """Collapse the indentation of inline SQL so one statement is one key"""
+    return " ".join(query.split())
+
+def redact_params(params) -> Any:
+    """Query parameters with each value replaced by its type name, e.g. ("str", "int")"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {name: type(value).__name__ for name, value in params.items()}
+    return [type(value).__name__ for value in params]
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with call, row and error counts"""
+
+    __slots__ = ('buckets', 'count', 'errors', 'rows', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, elapsed_ms: float, rows: int, failed: bool):
+        self.buckets[bisect_left(HISTOGRAM_BOUNDS_MS, elapsed_ms)] += 1
+        self.count += 1
+        if failed:
+            self.errors += 1
+        if rows > 0:
+            self.rows += rows
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+    def merge(self, other: 'LatencyHistogram'):
+        self.buckets = [mine + theirs for mine, theirs in zip(self.buckets, other.buckets)]
+        self.count += other.count
+        self.errors += other.errors
+        self.rows += other.rows
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of calls"""
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(HISTOGRAM_BOUNDS_MS, self.buckets):
+            seen += count
+            if seen >= target:
+                return round(min(float(bound), self.max_ms), 3)
+        return round(self.max_ms, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}ms" for bound in HISTOGRAM_BOUNDS_MS] + ["inf"]
+        return {
+            "calls": self.count,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "histogram": dict(zip(labels, self.buckets))
+        }
+
+class QueryTimer:
+    """Context manager from QueryStats.timed(); the caller fills in the row count"""
+
+    __slots__ = ('stats', 'query', 'params', 'pool', 'rows', 'started')
+
+    def __init__(self, stats: 'QueryStats', query: str, params, pool):
+        self.stats = stats
+        self.query = query
+        self.params = params
+        self.pool = pool
+        self.rows = -1
+
+    def __enter__(self) -> 'QueryTimer':
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        elapsed = time.perf_counter() - self.started
+        if exc_type is None:
+            self.stats.record(self.query, self.params, elapsed, self.pool, rows=self.rows)
+        elif issubclass(exc_type, Exception):
+            self.stats.record(self.query, self.params, elapsed, self.pool, error=exc)
+
+class QueryStats:
+    """Aggregates every query by route and statement and keeps the slow ones.
+
+    Queries slower than DB_SLOW_QUERY_MS are logged; a DB_SLOW_QUERY_PLAN_SAMPLE
+    fraction of them also get their plan captured in the background.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queries: Dict[tuple, LatencyHistogram] = {}
+        self._slow = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+        self._untracked = 0
+        self._since = datetime.now(timezone.utc)
+        self._plan_executor = None
+        self._capturing = False
+
+    def timed(self, query: str, params, pool) -> QueryTimer:
+        """Time a with block as one execution of query on pool"""
+        return QueryTimer(self, query, params, pool)
+
+    def record(self, query: str, params, elapsed: float, pool, rows: int = -1, error: Optional[Exception] = None):
+        elapsed_ms = elapsed * 1000
+        route = current_route()
+        statement = normalize_sql(query)
+        key = (route, statement)
+
+        with self._lock:
+            histogram = self._queries.get(key)
+            if histogram is None:
+                if len(self._queries) < MAX_TRACKED_QUERIES:
+                    histogram = self._queries[key] = LatencyHistogram()
+                else:
+                    self._untracked += 1
+            if histogram is not None:
+                histogram.add(elapsed_ms, rows, error is not None)
+
+        if elapsed_ms >= SLOW_QUERY_MS:
+            self._log_slow(route, statement, query, params, elapsed_ms, pool, error)
+
+    def _log_slow(self, route, statement, query, params, elapsed_ms, pool, error):
+        # The entry is served by /admin/slow-queries, so it only describes the
+        # parameters; the values themselves go no further than _capture_plan
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "route": route,
+            "server": pool.name,
+            "duration_ms": round(elapsed_ms, 3),
+            "query": statement,
+            "params": redact_params(params),
+            "error": str(error) if error else None,
+            "plan": None
+        }
+        with self._lock:
+            self._slow.append(entry)
+            capture = not self._capturing and error is None and random.random() < SLOW_QUERY_PLAN_SAMPLE
+            if capture:
+                self._capturing = True
+                if self._plan_executor is None:
+                    self._plan_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-explain")
+
+        slow_query_logger.warning(f"Slow query {elapsed_ms:.1f} ms on {pool.name} from {route}: {statement}")
+        if capture:
+            # Off the request path, on a connection of its own
+            self._plan_executor.submit(self._capture_plan, entry, query, params, pool.db_config)
+
+    def _capture_plan(self, entry: Dict[str, Any], query: str, params, db_config: Dict[str, Any]):
+        try:
+            connection = psycopg2.connect(options=f"-c statement_timeout={PLAN_TIMEOUT_MS}", **db_config)
+            try:
+                # A read-only transaction makes ANALYZE refuse to re-run a write,
+                # which then only gets its estimated plan
+                connection.set_session(readonly=True)
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {query}", params)
+                except psycopg2.errors.ReadOnlySqlTransaction:
+                    connection.rollback()
+                    cursor.execute(f"EXPLAIN {query}", params)
+                entry["plan"] = "\n".join(row[0] for row in cursor.fetchall())
+            finally:
+                connection.rollback()
+                connection.close()
+            slow_query_logger.info(f"Plan for {entry['query']}:\n{entry['plan']}")
+        except Exception as e:
+            entry["plan_error"] = str(e)
+            logger.warning(f"Could not capture plan for slow query: {e}")
+        finally:
+            with self._lock:
+                self._capturing = False
+
+    def get_queries(self, route: Optional[str] = None, order_by: str = "total_ms", limit: int = 50) -> List[Dict[str, Any]]:
+        """Per-statement statistics, heaviest first"""
+        with self._lock:
+            queries = [
+                {"route": key[0], "query": key[1], **histogram.to_dict()}
+                for key, histogram in self._queries.items()
+                if route is None or key[0] == route
+            ]
+        queries.sort(key=lambda query: query[order_by], reverse=True)
+        return queries[:limit]
+
+    def get_routes(self) -> List[Dict[str, Any]]:
+        """Per-route statistics over all the queries a route issued"""
+        totals: Dict[str, LatencyHistogram] = {}
+        with self._lock:
+            for (route, _), histogram in self._queries.items():
+                totals.setdefault(route, LatencyHistogram()).merge(histogram)
+        routes = [{"route": route, **histogram.to_dict()} for route, histogram in totals.items()]
+        routes.sort(key=lambda route: route["total_ms"], reverse=True)
+        return routes
+
+    def get_slow_queries(self, route: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent slow queries first"""
+        with self._lock:
+            entries = [dict(entry) for entry in reversed(self._slow) if route is None or entry["route"] == route]
+        return entries[:limit]
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "since": self._since.isoformat(),
+                "slow_query_ms": SLOW_QUERY_MS,
+                "plan_sample_rate": SLOW_QUERY_PLAN_SAMPLE,
+                "tracked_queries": len(self._queries),
+                "untracked_calls": self._untracked,
+                "slow_queries_logged": len(self._slow)
+            }
+
+    def reset(self):
+        with self._lock:
+            self._queries.clear()
+            self._slow.clear()
+            self._untracked = 0
+            self._since = datetime.now(timezone.utc)
+
+# Global query statistics
+query_stats = QueryStats()
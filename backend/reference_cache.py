@@ -0,0 +1,124 @@
+"""
+In-process cache for the small, rarely changed reference tables
+"""
+import os
+import time
+import select
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import Request
+
+import psycopg2
+
+from database import db_pool, read_from_primary
+from conditional import check_etag, content_etag
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_CACHE_TTL_SECONDS = float(os.getenv('REFERENCE_CACHE_TTL_SECONDS', 300))
+# Channel the reference tables' triggers notify with the table name
+REFERENCE_CHANNEL = 'reference_data_changed'
+LISTEN_RETRY_SECONDS = 5
+
+class ReferenceCache:
+    """Whole-table results of the reference data GETs, one entry per table.
+
+    Entries expire after REFERENCE_CACHE_TTL_SECONDS and are dropped at once
+    by the write handlers of this worker, and by a NOTIFY from the tables'
+    triggers for writes made anywhere else (other workers, psql). A
+    background thread LISTENs for those; while it is not connected nothing
+    is cached, so a missed notification can never leave an entry stale.
+
+    Each entry keeps the ETag of its content, so conditional GETs of
+    reference data are answered without a query either.
+    """
+
+    def __init__(self, ttl: float = REFERENCE_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, tuple] = {}
+        # Bumped by every invalidation, so a load that raced one is not kept
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._listening = False
+        self._listener: Optional[threading.Thread] = None
+
+    async def get(self, table: str, load: Callable[[], Awaitable[Any]], request: Optional[Request] = None) -> Any:
+        """Cached result for table, calling load() on a miss.
+
+        With request, raises NotModified if the client already has the result.
+        """
+        entry = self._entries.get(table)
+        if entry is not None and entry[0] > time.monotonic():
+            if request is not None:
+                check_etag(request, entry[2])
+            return entry[1]
+
+        self._start_listener()
+        with self._lock:
+            version = (self._epoch, self._generations.get(table, 0))
+            cacheable = self._listening and self.ttl > 0
+
+        # Replicas may not have the write that caused the miss yet
+        with read_from_primary():
+            value = await load()
+        etag = content_etag(value)
+
+        if cacheable:
+            with self._lock:
+                if self._listening and version == (self._epoch, self._generations.get(table, 0)):
+                    self._entries[table] = (time.monotonic() + self.ttl, value, etag)
+        if request is not None:
+            check_etag(request, etag)
+        return value
+
+    def invalidate(self, table: str):
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            self._entries.pop(table, None)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def _start_listener(self):
+        if self._listener is not None or self.ttl <= 0:
+            return
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(target=self._listen, name="reference-cache-listener", daemon=True)
+        self._listener.start()
+
+    def _listen(self):
+        while True:
+            connection = None
+            try:
+                connection = psycopg2.connect(**db_pool.db_config)
+                connection.autocommit = True
+                connection.cursor().execute(f"LISTEN {REFERENCE_CHANNEL}")
+                with self._lock:
+                    self._listening = True
+                logger.info("Reference data cache listening for changes")
+
+                while True:
+                    if select.select([connection], [], [], 1.0)[0]:
+                        connection.poll()
+                        while connection.notifies:
+                            self.invalidate(connection.notifies.pop(0).payload)
+            except Exception as e:
+                logger.warning(f"Reference data cache listener failed, retrying in {LISTEN_RETRY_SECONDS}s: {e}")
+            finally:
+                with self._lock:
+                    self._listening = False
+                # Notifications may have been missed while disconnected
+                self.clear()
+                if connection is not None:
+                    connection.close()
+            time.sleep(LISTEN_RETRY_SECONDS)
+
+# Global reference data cache
+reference_cache = ReferenceCache()
@@ -0,0 +1,183 @@
+"""
+JSON responses for the API, and helpers for large list endpoints
+"""
+import asyncio
+import logging
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+
+import orjson
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+from database import RowSet
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Compact, non-ASCII as is: the same text as FastAPI's JSONResponse
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+class JSONRows:
+    """Rows that arrive already encoded as JSON objects (see sql_json.py).
+
+    Written into a response as they are, in place of a RowSet.
+    """
+
+    __slots__ = ('rows',)
+
+    def __init__(self, rows: List[str]):
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __bool__(self) -> bool:
+        return bool(self.rows)
+
+    def join(self, separator: str) -> bytes:
+        return separator.join(self.rows).encode("utf-8")
+
+class JSONText:
+    """One value that arrives already encoded as JSON (see sql_json.py)"""
+
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+def _encode_value(value: Any) -> Any:
+    """Types orjson does not handle natively (dates, datetimes, UUIDs and
+    dataclasses it does)"""
+    if isinstance(value, Decimal):
+        # Exact: written as the numeric text, not rounded through a float
+        if not value.is_finite():
+            raise TypeError(f"Decimal {value} is not JSON serializable")
+        return orjson.Fragment(str(value))
+    if isinstance(value, JSONRows):
+        return orjson.Fragment(b"[" + value.join(",") + b"]")
+    if isinstance(value, JSONText):
+        return orjson.Fragment(value.text.encode("utf-8"))
+    if isinstance(value, RowSet):
+        # Short-lived dicts sharing the column name strings, consumed at once
+        # by the C encoder: far cheaper than RealDictRow -> dict per row
+        return value.to_dicts()
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return jsonable_encoder(value)
+
+def encode_json(content: Any) -> bytes:
+    return orjson.dumps(content, default=_encode_value, option=ORJSON_OPTIONS)
+
+def encode_row(row: Dict[str, Any]) -> bytes:
+    return orjson.dumps(row, default=_encode_value, option=ORJSON_OPTIONS)
+
+def _encode_batch(batch: Union[List[Dict], RowSet, JSONRows]) -> bytes:
+    """Comma separated JSON objects for one batch of rows"""
+    if isinstance(batch, JSONRows):
+        return batch.join(",")
+    if isinstance(batch, RowSet):
+        batch = batch.to_dicts()
+    return encode_json(batch)[1:-1]
+
+class RowsJSONResponse(JSONResponse):
+    """The API's JSON response, encoded by orjson.
+
+    Accepts RowSet values anywhere in the content, and Decimals, which are
+    written exactly. Return it directly from a handler, or let JSONRoute
+    wrap the handler's result in it, so FastAPI skips jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
+
+class JSONRoute(APIRoute):
+    """APIRoute that hands a handler's result straight to its response class.
+
+    FastAPI otherwise walks every result with jsonable_encoder before
+    encoding it, which costs more than the encoding itself on long lists.
+    Routes with a response_model keep FastAPI's validation and encoding.
+    """
+
+    def get_route_handler(self) -> Callable:
+        response_class = self.response_class
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+        endpoint = self.dependant.call
+        if (self.response_model is None and issubclass(response_class, RowsJSONResponse)
+                and asyncio.iscoroutinefunction(endpoint)):
+            status_code = self.status_code
+
+            async def respond(**values):
+                content = await endpoint(**values)
+                if isinstance(content, Response):
+                    return content
+                return response_class(content, status_code=status_code or 200)
+
+            self.dependant.call = respond
+        return super().get_route_handler()
+
+def wants_ndjson(request: Request, format: Optional[str] = None) -> bool:
+    """NDJSON is opt-in via ?format=ndjson or an Accept header"""
+    if format:
+        return format.lower() == "ndjson"
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+async def _json_array_body(key: str, first, batches: AsyncIterator) -> AsyncIterator[bytes]:
+    # Same document as returning {key: rows}, emitted one batch at a time
+    try:
+        yield f'{{"{key}":['.encode()
+        separator = b""
+        batch = first
+        while batch is not None:
+            if batch:
+                yield separator + _encode_batch(batch)
+                separator = b","
+            batch = await anext(batches, None)
+        yield b"]}"
+    except Exception as e:
+        # Headers are already sent, so all we can do is cut the body short
+        logger.error(f"Streaming response for {key} aborted: {e}")
+        raise
+    finally:
+        # Give the connection back promptly if the client went away
+        await batches.aclose()
+
+def _ndjson_lines(batch: Union[List[Dict], RowSet, JSONRows]) -> bytes:
+    if isinstance(batch, JSONRows):
+        return batch.join("\n") + b"\n"
+    if isinstance(batch, RowSet):
+        batch = batch.to_dicts()
+    return b"".join(encode_row(row) + b"\n" for row in batch)
+
+async def _ndjson_body(first, batches: AsyncIterator) -> AsyncIterator[bytes]:
+    try:
+        batch = first
+        while batch is not None:
+            if batch:
+                yield _ndjson_lines(batch)
+            batch = await anext(batches, None)
+    finally:
+        await batches.aclose()
+
+async def stream_list_response(
+    request: Request,
+    key: str,
+    batches: AsyncIterator[Union[List[Dict], RowSet, JSONRows]],
+    format: Optional[str] = None
+) -> StreamingResponse:
+    """
+    Stream row batches as {key: [...]} (default) or NDJSON
+
+    The first batch is fetched before the response starts so that pool
+    timeouts and query errors still produce a proper error status.
+    """
+    first = await anext(batches, None)
+    if wants_ndjson(request, format):
+        return StreamingResponse(_ndjson_body(first, batches), media_type=NDJSON_MEDIA_TYPE)
+    return StreamingResponse(_json_array_body(key, first, batches), media_type="application/json")
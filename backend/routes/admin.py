@@ -0,0 +1,47 @@
+import os
+import secrets
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from query_stats import query_stats
+from responses import JSONRoute
+
+# The statistics show every statement the app runs and can be reset, so the
+# endpoints exist only when a token is configured and demand it as a bearer token
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+
+def require_admin_token(request: Request):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Admin token required", headers={"WWW-Authenticate": "Bearer"})
+
+router = APIRouter(route_class=JSONRoute, dependencies=[Depends(require_admin_token)])
+
+QUERY_ORDERINGS = ("total_ms", "avg_ms", "p95_ms", "p99_ms", "max_ms", "calls", "errors", "rows")
+
+# Query statistics endpoints
+@router.get("/admin/queries")
+async def get_query_stats(
+    route: str = Query(None, description='Only queries issued by this route, e.g. "GET /customers"'),
+    order_by: str = Query("total_ms", description=f"One of {', '.join(QUERY_ORDERINGS)}"),
+    limit: int = Query(50, ge=1, le=1000, description="Number of statements")
+):
+    if order_by not in QUERY_ORDERINGS:
+        raise HTTPException(status_code=400, detail=f"order_by must be one of {', '.join(QUERY_ORDERINGS)}")
+    return {
+        "status": query_stats.get_status(),
+        "routes": query_stats.get_routes(),
+        "queries": query_stats.get_queries(route, order_by, limit)
+    }
+
+@router.get("/admin/slow-queries")
+async def get_slow_queries(
+    route: str = Query(None, description="Only slow queries issued by this route"),
+    limit: int = Query(50, ge=1, le=1000, description="Number of entries, newest first")
+):
+    return {"slow_queries": query_stats.get_slow_queries(route, limit)}
+
+@router.delete("/admin/queries")
+async def reset_query_stats():
+    query_stats.reset()
+    return {"message": "Query statistics reset"}
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, HTTPException, Query
+from autocomplete import autocomplete_indexes
+from responses import JSONRoute
+
+router = APIRouter(route_class=JSONRoute)
+
+# Typeahead for the customer, supplier and user pickers
+@router.get("/autocomplete/{entity}")
+async def autocomplete(
+    entity: str,
+    q: str = Query("", description="Prefix of the name, or of any word in it"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of matches")
+):
+    index = autocomplete_indexes.get(entity)
+    if index is None:
+        raise HTTPException(status_code=404, detail=f"entity must be one of {', '.join(autocomplete_indexes)}")
+    return {entity: await index.search(q, limit)}
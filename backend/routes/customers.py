@@ -1,57 +1,124 @@
-from fastapi import APIRouter, Query
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from models.customer import Customer, CustomerCreate, Supplier, SupplierCreate
-from database import execute_query
+from conditional import table_etag
+from database import execute_query_async, stream_query_async
+from responses import stream_list_response, RowsJSONResponse, JSONRoute
+from sql_json import fetch_json_document
+from autocomplete import autocomplete_indexes
+from pagination import decode_cursor, next_cursor, sort_clause, where_clause, search_pattern, paginated_response, count_rows
+from routes.projects import QUOTE_COLUMNS, CUSTOMER_PROJECTS_QUERY, CUSTOMER_ACCOUNTS_QUERY
+from routes.dashboard import ACTIVE_PROJECT_STATUSES
 
-router = APIRouter()
+router = APIRouter(route_class=JSONRoute)
+
+# Listed rather than c.*, like the columns in routes/projects.py: the
+# workspace's JSON encoding of these queries is kept per worker
+CUSTOMER_COLUMNS = """c.id, c.name, c.category, c.sales_rep_id, c.phone, c.email, c.address, c.contact_name,
+           c.contact_title, c.contact_phone, c.contact_email, c.currency_id, c.tax_rate, c.bank_name,
+           c.file_format, c.account_number, c.institution, c.transit, c.created_at, c.updated_at"""
+
+# Queries also planned by check_indexes.py exactly as the routes run them
+CUSTOMER_LIST_QUERY = f"""
+    SELECT {CUSTOMER_COLUMNS}, u.name as sales_rep_name, cur.currency as currency_name
+    FROM customers c
+    LEFT JOIN users u ON c.sales_rep_id = u.id
+    LEFT JOIN currencies cur ON c.currency_id = cur.id
+"""
+
+def customer_filters(search: Optional[str] = None) -> Tuple[List[str], tuple]:
+    if not search:
+        return [], ()
+    search_param = search_pattern(search)
+    return ["(c.name ILIKE %s OR c.email ILIKE %s OR c.category ILIKE %s)"], (search_param, search_param, search_param)
+
+# Keyset pagination: the rows after a cursor's (name, id)
+CUSTOMER_AFTER_CURSOR = "(c.name, c.id) > (%s, %s)"
+
+def customer_page_query(where: str, keyset: bool) -> str:
+    """One page of customers by name: after a cursor (whose condition where
+    holds), or at an OFFSET"""
+    return f"{CUSTOMER_LIST_QUERY}{where} ORDER BY c.name, c.id LIMIT %s" + ("" if keyset else " OFFSET %s")
+
+CUSTOMER_QUOTES_QUERY = f"""
+    SELECT {QUOTE_COLUMNS}, e.name as engineer_name, s.name as salesman_name
+    FROM quotes q
+    LEFT JOIN users e ON q.engineer_id = e.id
+    LEFT JOIN users s ON q.salesman_id = s.id
+    WHERE q.customer_id = %s
+"""
+CUSTOMER_QUOTES_BY_DATE = f"{CUSTOMER_QUOTES_QUERY} ORDER BY q.date DESC"
+
+def workspace_sections(customer_id: int) -> list:
+    """The fetch_json_document sections of /customers/{customer_id}/workspace"""
+    params = (customer_id,)
+    return [
+        ("customer", f"{CUSTOMER_LIST_QUERY} WHERE c.id = %s", params, None),
+        ("quotes", CUSTOMER_QUOTES_QUERY, params, "t.date DESC"),
+        ("projects", CUSTOMER_PROJECTS_QUERY, params, "t.date DESC"),
+        ("accounts", CUSTOMER_ACCOUNTS_QUERY, params, "t.date DESC"),
+        ("summary", """
+            SELECT q.quote_count, q.quoted_total,
+                   p.project_count, p.active_project_count,
+                   a.invoice_count, a.invoiced_total, a.outstanding_total
+            FROM (SELECT count(*) AS quote_count, coalesce(sum(sell_price), 0) AS quoted_total
+                  FROM quotes WHERE customer_id = %s) q,
+                 (SELECT count(*) AS project_count, count(*) FILTER (WHERE status = ANY(%s)) AS active_project_count
+                  FROM projects WHERE customer_id = %s) p,
+                 (SELECT count(*) AS invoice_count, coalesce(sum(amount), 0) AS invoiced_total,
+                         coalesce(sum(outstanding), 0) AS outstanding_total
+                  FROM customer_accounts WHERE customer_id = %s) a
+        """, params + (sorted(ACTIVE_PROJECT_STATUSES),) + params * 2, None),
+    ]
 
 # Customers endpoints
-@router.get("/customers")
+@router.get("/customers", dependencies=[Depends(table_etag("customers", "users", "currencies"))])
 async def get_customers(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(10, ge=1, le=100, description="Items per page"),
-    search: str = Query(None, description="Search by name, email, or category")
+    search: str = Query(None, description="Search by name, email, or category"),
+    cursor: str = Query(None, description="pagination.next_cursor of the previous page; replaces page")
 ):
-    offset = (page - 1) * limit
-
-    # Build base queries
-    base_query = """
-    SELECT c.*, u.name as sales_rep_name, cur.currency as currency_name
-    FROM customers c
-    LEFT JOIN users u ON c.sales_rep_id = u.id
-    LEFT JOIN currencies cur ON c.currency_id = cur.id
-    """
+    conditions, params = customer_filters(search)
 
-    count_query = "SELECT COUNT(*) as total FROM customers c"
-    params = None
+    if cursor:
+        # Keyset pagination: seek past the last row instead of counting and
+        # skipping OFFSET rows, so every page costs the same
+        conditions.append(CUSTOMER_AFTER_CURSOR)
+        customers = await execute_query_async(
+            customer_page_query(where_clause(conditions), keyset=True),
+            params + tuple(decode_cursor(cursor, (str, int))) + (limit + 1,),
+            fetch_all=True, as_tuples=True
+        )
+        return RowsJSONResponse({
+            "customers": customers,
+            "pagination": {
+                "limit": limit,
+                "next_cursor": next_cursor(customers, limit, ["name", "id"])
+            }
+        })
 
-    if search:
-        search_condition = " WHERE c.name ILIKE %s OR c.email ILIKE %s OR c.category ILIKE %s"
-        search_param = f"%{search}%"
-        base_query += search_condition
-        count_query += search_condition
-        params = (search_param, search_param, search_param)
+    where = where_clause(conditions)
 
-    # Get total count
-    total_result = execute_query(count_query, params, fetch_one=True)
-    total = total_result['total'] if total_result else 0
+    # Total from the maintained row count or the count cache, not a rescan
+    total, exact = await count_rows("customers", where, params, "c")
 
     # Get paginated results
-    paginated_query = f"{base_query} ORDER BY c.name LIMIT %s OFFSET %s"
-    if params:
-        final_params = params + (limit, offset)
-    else:
-        final_params = (limit, offset)
-    customers = execute_query(paginated_query, final_params, fetch_all=True)
-
-    return {
+    offset = (page - 1) * limit
+    customers = await execute_query_async(customer_page_query(where, keyset=False), params + (limit + 1, offset), fetch_all=True, as_tuples=True)
+
+    return RowsJSONResponse({
         "customers": customers,
         "pagination": {
             "page": page,
             "limit": limit,
             "total": total,
-            "pages": (total + limit - 1) // limit
+            "total_exact": exact,
+            "pages": (total + limit - 1) // limit,
+            # Continue from here with ?cursor= once past the first pages
+            "next_cursor": next_cursor(customers, limit, ["name", "id"])
         }
-    }
+    })
 
 @router.post("/customers")
 async def create_customer(customer: CustomerCreate):
@@ -60,12 +127,13 @@ async def create_customer(customer: CustomerCreate):
                 contact_phone, contact_email, currency_id, tax_rate, bank_name, file_format,
                 account_number, institution, transit)
                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id"""
-    result = execute_query(query, (
+    result = await execute_query_async(query, (
         customer.name, customer.category, customer.sales_rep_id, customer.phone, customer.email,
         customer.address, customer.contact_name, customer.contact_title, customer.contact_phone,
         customer.contact_email, customer.currency_id, customer.tax_rate, customer.bank_name,
         customer.file_format, customer.account_number, customer.institution, customer.transit
     ), fetch_one=True)
+    autocomplete_indexes["customers"].add(result['id'], customer.name)
     return {"message": "Customer created successfully", "customer_id": result['id']}
 
 @router.put("/customers/{customer_id}")
@@ -76,47 +144,77 @@ async def update_customer(customer_id: int, customer: CustomerCreate):
                    currency_id=%s, tax_rate=%s, bank_name=%s, file_format=%s, account_number=%s,
                    institution=%s, transit=%s
                WHERE id=%s"""
-    execute_query(query, (
+    await execute_query_async(query, (
         customer.name, customer.category, customer.sales_rep_id, customer.phone, customer.email,
         customer.address, customer.contact_name, customer.contact_title, customer.contact_phone,
         customer.contact_email, customer.currency_id, customer.tax_rate, customer.bank_name,
         customer.file_format, customer.account_number, customer.institution, customer.transit,
         customer_id
     ))
+    autocomplete_indexes["customers"].rename(customer_id, customer.name)
     return {"message": "Customer updated successfully"}
 
 @router.delete("/customers/{customer_id}")
 async def delete_customer(customer_id: int):
     query = "DELETE FROM customers WHERE id=%s"
-    execute_query(query, (customer_id,))
+    await execute_query_async(query, (customer_id,))
+    autocomplete_indexes["customers"].remove(customer_id)
     return {"message": "Customer deleted successfully"}
 
 # Customer Quotes endpoints
-@router.get("/customers/{customer_id}/quotes")
+@router.get("/customers/{customer_id}/quotes", dependencies=[Depends(table_etag("quotes", "users"))])
 async def get_customer_quotes(customer_id: int):
-    query = """
-    SELECT q.*, e.name as engineer_name, s.name as salesman_name
-    FROM quotes q
-    LEFT JOIN users e ON q.engineer_id = e.id
-    LEFT JOIN users s ON q.salesman_id = s.id
-    WHERE q.customer_id = %s
-    ORDER BY q.date DESC
-    """
-    quotes = execute_query(query, (customer_id,), fetch_all=True)
-    return {"quotes": quotes}
+    quotes = await execute_query_async(CUSTOMER_QUOTES_BY_DATE, (customer_id,), fetch_all=True, as_tuples=True)
+    return RowsJSONResponse({"quotes": quotes})
+
+# Customer workspace: everything the customer page shows, in one request
+@router.get(
+    "/customers/{customer_id}/workspace",
+    dependencies=[Depends(table_etag("customers", "users", "currencies", "quotes", "projects", "customer_accounts"))]
+)
+async def get_customer_workspace(customer_id: int):
+    workspace = await fetch_json_document(workspace_sections(customer_id))
+    if workspace["customer"] is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return workspace
 
 # Suppliers endpoints
-@router.get("/suppliers")
-async def get_suppliers():
-    query = """
+# Sortable columns; each has a matching (column, id) index
+SUPPLIER_SORTS = {"name": "s.name", "category": "s.category"}
+
+@router.get("/suppliers", dependencies=[Depends(table_etag("suppliers", "users", "currencies"))])
+async def get_suppliers(
+    request: Request,
+    page: int = Query(None, ge=1, description="Page number; omit page and limit for the full list"),
+    limit: int = Query(None, ge=1, le=100, description="Items per page"),
+    search: str = Query(None, description="Search by name, email, or category"),
+    category: str = Query(None, description="Only suppliers in this category"),
+    sort: str = Query(None, description=f"One of {', '.join(SUPPLIER_SORTS)} (default name)"),
+    order: str = Query(None, pattern="^(asc|desc)$", description="asc or desc"),
+    format: str = Query(None, description="json (default) or ndjson; full list only")
+):
+    conditions = []
+    params = ()
+    if search:
+        conditions.append("(s.name ILIKE %s OR s.email ILIKE %s OR s.category ILIKE %s)")
+        search_param = search_pattern(search)
+        params += (search_param, search_param, search_param)
+    if category:
+        conditions.append("s.category = %s")
+        params += (category,)
+
+    where = where_clause(conditions)
+    query = f"""
     SELECT s.*, u.name as sales_rep_name, cur.currency as currency_name
     FROM suppliers s
     LEFT JOIN users u ON s.sales_rep_id = u.id
-    LEFT JOIN currencies cur ON s.currency_id = cur.id
-    ORDER BY s.name
+    LEFT JOIN currencies cur ON s.currency_id = cur.id{where}
+    ORDER BY {sort_clause(sort, order, SUPPLIER_SORTS, "name", "asc", "s.id")}
     """
-    suppliers = execute_query(query, fetch_all=True)
-    return {"suppliers": suppliers}
+
+    if page is None and limit is None:
+        return await stream_list_response(request, "suppliers", stream_query_async(query, params or None, as_tuples=True), format)
+    return await paginated_response("suppliers", query, "suppliers", "s", where, params, page, limit)
 
 @router.post("/suppliers")
 async def create_supplier(supplier: SupplierCreate):
@@ -125,12 +223,13 @@ async def create_supplier(supplier: SupplierCreate):
                 contact_phone, contact_email, currency_id, tax_rate, bank_name, file_format,
                 account_number, institution, transit)
                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id"""
-    result = execute_query(query, (
+    result = await execute_query_async(query, (
         supplier.name, supplier.category, supplier.sales_rep_id, supplier.phone, supplier.email,
         supplier.address, supplier.contact_name, supplier.contact_title, supplier.contact_phone,
         supplier.contact_email, supplier.currency_id, supplier.tax_rate, supplier.bank_name,
         supplier.file_format, supplier.account_number, supplier.institution, supplier.transit
     ), fetch_one=True)
+    autocomplete_indexes["suppliers"].add(result['id'], supplier.name)
     return {"message": "Supplier created successfully", "supplier_id": result['id'], "supplier": {"id": result['id'], **supplier.model_dump()}}
 
 @router.put("/suppliers/{supplier_id}")
@@ -141,17 +240,19 @@ async def update_supplier(supplier_id: int, supplier: SupplierCreate):
                    currency_id=%s, tax_rate=%s, bank_name=%s, file_format=%s, account_number=%s,
                    institution=%s, transit=%s
                WHERE id=%s"""
-    execute_query(query, (
+    await execute_query_async(query, (
         supplier.name, supplier.category, supplier.sales_rep_id, supplier.phone, supplier.email,
         supplier.address, supplier.contact_name, supplier.contact_title, supplier.contact_phone,
         supplier.contact_email, supplier.currency_id, supplier.tax_rate, supplier.bank_name,
         supplier.file_format, supplier.account_number, supplier.institution, supplier.transit,
         supplier_id
     ))
+    autocomplete_indexes["suppliers"].rename(supplier_id, supplier.name)
     return {"message": "Supplier updated successfully"}
 
 @router.delete("/suppliers/{supplier_id}")
 async def delete_supplier(supplier_id: int):
     query = "DELETE FROM suppliers WHERE id=%s"
-    execute_query(query, (supplier_id,))
+    await execute_query_async(query, (supplier_id,))
+    autocomplete_indexes["suppliers"].remove(supplier_id)
     return {"message": "Supplier deleted successfully"}
@@ -0,0 +1,70 @@
+from decimal import Decimal
+
+from fastapi import APIRouter, Depends
+from conditional import table_etag
+from database import execute_query_async
+from responses import JSONRoute
+
+router = APIRouter(route_class=JSONRoute)
+
+# Quotes in any other status are open: still in the pipeline
+CLOSED_QUOTE_STATUSES = {"Approved", "Rejected", "Completed"}
+# Projects in either status are running: work has started and not ended
+ACTIVE_PROJECT_STATUSES = {"Active", "In Progress"}
+
+# Dashboard endpoints
+@router.get(
+    "/dashboard/summary",
+    dependencies=[Depends(table_etag("users", "customers", "quotes", "projects", "customer_accounts"))]
+)
+async def get_dashboard_summary():
+    # Bucket totals maintained by triggers (migration 0011) and row counts
+    # from table_stats: a few dozen rows, however large the tables grow
+    rows = await execute_query_async("""
+        SELECT table_name, bucket, row_count, amount FROM summary_totals
+        WHERE table_name IN ('users', 'quotes', 'projects', 'customer_accounts') AND row_count <> 0
+        UNION ALL
+        SELECT table_name, NULL, row_count, 0 FROM table_stats
+        WHERE table_name IN ('users', 'customers')
+        ORDER BY 1, 2
+    """, fetch_all=True, as_tuples=True)
+
+    totals = {}
+    buckets = {}
+    for table_name, bucket, row_count, amount in rows.rows:
+        if bucket is None:
+            totals[table_name] = row_count
+        else:
+            buckets.setdefault(table_name, {})[bucket] = (row_count, amount)
+
+    quotes = buckets.get("quotes", {})
+    open_quotes = [status for status in quotes if status not in CLOSED_QUOTE_STATUSES]
+    projects = buckets.get("projects", {})
+    receivables = buckets.get("customer_accounts", {}).get("open", (0, Decimal(0)))
+
+    return {
+        "users": {
+            "total": totals.get("users", 0),
+            "active": buckets.get("users", {}).get("active", (0, 0))[0]
+        },
+        "customers": {"total": totals.get("customers", 0)},
+        "quotes": {
+            "open": sum(quotes[status][0] for status in open_quotes),
+            "pipeline_value": sum((quotes[status][1] for status in open_quotes), Decimal(0)),
+            "by_status": [
+                {"status": status or None, "count": count, "value": value}
+                for status, (count, value) in quotes.items()
+            ]
+        },
+        "projects": {
+            "active": sum(projects[status][0] for status in ACTIVE_PROJECT_STATUSES if status in projects),
+            "by_status": [
+                {"status": status or None, "count": count}
+                for status, (count, _) in projects.items()
+            ]
+        },
+        "receivables": {
+            "open_invoices": receivables[0],
+            "outstanding": receivables[1]
+        }
+    }
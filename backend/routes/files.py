@@ -2,8 +2,9 @@ from fastapi import APIRouter, HTTPException, File, UploadFile
 import shutil
 import uuid
 from pathlib import Path
+from responses import JSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=JSONRoute)
 
 # Create uploads directory if it doesn't exist
 uploads_dir = Path("uploads")
@@ -1,22 +1,144 @@
-from fastapi import APIRouter, HTTPException
+from datetime import date
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from models.project import Quote, QuoteCreate, Project, ProjectCreate, CustomerAccount, CustomerAccountCreate
-from database import execute_query
+from conditional import table_etag
+from database import execute_query_async
+from responses import stream_list_response, RowsJSONResponse, JSONRoute
+from sql_json import stream_json_rows
+from pagination import sort_clause, output_order, date_range_filter, where_clause, search_pattern, paginated_response
 
-router = APIRouter()
+router = APIRouter(route_class=JSONRoute)
 
-# Projects endpoints
-@router.get("/projects")
-async def get_projects():
-    query = """
-    SELECT p.*, c.name as customer_name, e.name as engineer_name, s.name as salesman_name
+# Sortable columns of the list endpoints; each has a matching (column, id) index
+PROJECT_SORTS = {"date": "p.date", "name": "p.name", "project_id": "p.project_id"}
+QUOTE_SORTS = {"date": "q.date", "name": "q.name", "job_id": "q.job_id", "sell_price": "q.sell_price"}
+ACCOUNT_SORTS = {"date": "ca.date", "name": "ca.name", "invoice_number": "ca.invoice_number", "outstanding": "ca.outstanding"}
+
+# The columns of each table as the routes return them. Listed rather than
+# selected with p.*, since sql_json keeps each list query's JSON encoding
+# for the life of the worker: a migration must not change a query's
+# columns under it. A new column is returned once it is added here.
+PROJECT_COLUMNS = """p.id, p.project_id, p.name, p.customer_id, p.engineer_id, p.end_user, p.date,
+           p.salesman_id, p.status, p.created_at, p.updated_at"""
+QUOTE_COLUMNS = """q.id, q.job_id, q.name, q.customer_id, q.engineer_id, q.salesman_id, q.date,
+           q.sell_price, q.status, q.created_at, q.updated_at"""
+ACCOUNT_COLUMNS = """ca.id, ca.invoice_number, ca.date, ca.project_id, ca.customer_id, ca.name, ca.amount,
+           ca.outstanding, ca.reminder_date, ca.comments, ca.created_at, ca.updated_at"""
+
+# The list filters and queries, also planned by check_indexes.py exactly as
+# the routes run them
+def project_filters(search: Optional[str] = None, status: Optional[str] = None,
+                    date_from: Optional[date] = None, date_to: Optional[date] = None) -> Tuple[List[str], tuple]:
+    conditions, params = date_range_filter("p.date", date_from, date_to)
+    if search:
+        conditions.append("(p.project_id ILIKE %s OR p.name ILIKE %s OR p.end_user ILIKE %s)")
+        search_param = search_pattern(search)
+        params += (search_param, search_param, search_param)
+    if status:
+        conditions.append("p.status = %s")
+        params += (status,)
+    return conditions, params
+
+def quote_filters(search: Optional[str] = None, status: Optional[str] = None,
+                  date_from: Optional[date] = None, date_to: Optional[date] = None) -> Tuple[List[str], tuple]:
+    conditions, params = date_range_filter("q.date", date_from, date_to)
+    if search:
+        conditions.append("(q.job_id ILIKE %s OR q.name ILIKE %s)")
+        search_param = search_pattern(search)
+        params += (search_param, search_param)
+    if status:
+        conditions.append("q.status = %s")
+        params += (status,)
+    return conditions, params
+
+def account_filters(search: Optional[str] = None, status: Optional[str] = None,
+                    date_from: Optional[date] = None, date_to: Optional[date] = None) -> Tuple[List[str], tuple]:
+    conditions, params = date_range_filter("ca.date", date_from, date_to)
+    if search:
+        conditions.append("(ca.invoice_number ILIKE %s OR ca.name ILIKE %s)")
+        search_param = search_pattern(search)
+        params += (search_param, search_param)
+    if status:
+        # Accounts have no status column: an invoice is paid once nothing is outstanding
+        conditions.append("ca.outstanding > 0" if status == "outstanding" else "ca.outstanding <= 0")
+    return conditions, params
+
+def project_list_query(where: str, order_by: str) -> str:
+    return f"""
+    SELECT {PROJECT_COLUMNS}, c.name as customer_name, e.name as engineer_name, s.name as salesman_name
     FROM projects p
     LEFT JOIN customers c ON p.customer_id = c.id
     LEFT JOIN users e ON p.engineer_id = e.id
-    LEFT JOIN users s ON p.salesman_id = s.id
-    ORDER BY p.date DESC
+    LEFT JOIN users s ON p.salesman_id = s.id{where}
+    ORDER BY {order_by}
     """
-    projects = execute_query(query, fetch_all=True)
-    return {"projects": projects}
+
+def quote_list_query(where: str, order_by: str) -> str:
+    return f"""
+    SELECT {QUOTE_COLUMNS}, c.name as customer_name, e.name as engineer_name, s.name as salesman_name
+    FROM quotes q
+    LEFT JOIN customers c ON q.customer_id = c.id
+    LEFT JOIN users e ON q.engineer_id = e.id
+    LEFT JOIN users s ON q.salesman_id = s.id{where}
+    ORDER BY {order_by}
+    """
+
+def account_list_query(where: str, order_by: str) -> str:
+    return f"""
+    SELECT {ACCOUNT_COLUMNS}, c.name as customer_name, p.name as project_name
+    FROM customer_accounts ca
+    LEFT JOIN customers c ON ca.customer_id = c.id
+    LEFT JOIN projects p ON ca.project_id = p.id{where}
+    ORDER BY {order_by}
+    """
+
+# A customer's projects and accounts, unsorted for the customer workspace,
+# which sorts them inside its JSON aggregate, and by date for the routes
+CUSTOMER_PROJECTS_QUERY = f"""
+    SELECT {PROJECT_COLUMNS}, e.name as engineer_name, s.name as salesman_name
+    FROM projects p
+    LEFT JOIN users e ON p.engineer_id = e.id
+    LEFT JOIN users s ON p.salesman_id = s.id
+    WHERE p.customer_id = %s
+"""
+
+CUSTOMER_ACCOUNTS_QUERY = f"""
+    SELECT {ACCOUNT_COLUMNS}, p.name as project_name
+    FROM customer_accounts ca
+    LEFT JOIN projects p ON ca.project_id = p.id
+    WHERE ca.customer_id = %s
+"""
+
+CUSTOMER_PROJECTS_BY_DATE = f"{CUSTOMER_PROJECTS_QUERY} ORDER BY p.date DESC"
+CUSTOMER_ACCOUNTS_BY_DATE = f"{CUSTOMER_ACCOUNTS_QUERY} ORDER BY ca.date DESC"
+
+# Projects endpoints
+@router.get("/projects", dependencies=[Depends(table_etag("projects", "customers", "users"))])
+async def get_projects(
+    request: Request,
+    page: int = Query(None, ge=1, description="Page number; omit page and limit for the full list"),
+    limit: int = Query(None, ge=1, le=100, description="Items per page"),
+    search: str = Query(None, description="Search by project ID, name, or end user"),
+    status: str = Query(None, description="Only projects with this status"),
+    date_from: date = Query(None, description="Earliest project date"),
+    date_to: date = Query(None, description="Latest project date"),
+    sort: str = Query(None, description=f"One of {', '.join(PROJECT_SORTS)} (default date, newest first)"),
+    order: str = Query(None, pattern="^(asc|desc)$", description="asc or desc"),
+    format: str = Query(None, description="json (default) or ndjson; full list only")
+):
+    conditions, params = project_filters(search, status, date_from, date_to)
+    where = where_clause(conditions)
+    order_by = sort_clause(sort, order, PROJECT_SORTS, "date", "desc", "p.id")
+    query = project_list_query(where, order_by)
+
+    if page is None and limit is None:
+        return await stream_list_response(
+            request, "projects", stream_json_rows(query, output_order(order_by, "p"), params or None), format
+        )
+    return await paginated_response(
+        "projects", query, "projects", "p", where, params, page, limit, json_order_by=output_order(order_by, "p")
+    )
 
 @router.post("/projects")
 async def create_project(project: ProjectCreate):
@@ -24,7 +146,7 @@ async def create_project(project: ProjectCreate):
     INSERT INTO projects (project_id, name, customer_id, engineer_id, end_user, date, salesman_id, status)
     VALUES (%s, %s, %s, %s, %s, %s, %s, %s) RETURNING id
     """
-    result = execute_query(query, (
+    result = await execute_query_async(query, (
         project.project_id, project.name, project.customer_id, project.engineer_id,
         project.end_user, project.date, project.salesman_id, project.status
     ), fetch_one=True)
@@ -36,7 +158,7 @@ async def update_project(project_id: int, project: ProjectCreate):
     UPDATE projects SET project_id=%s, name=%s, customer_id=%s, engineer_id=%s,
     end_user=%s, date=%s, salesman_id=%s, status=%s WHERE id=%s
     """
-    execute_query(query, (
+    await execute_query_async(query, (
         project.project_id, project.name, project.customer_id, project.engineer_id,
         project.end_user, project.date, project.salesman_id, project.status, project_id
     ))
@@ -45,58 +167,63 @@ async def update_project(project_id: int, project: ProjectCreate):
 @router.delete("/projects/{project_id}")
 async def delete_project(project_id: int):
     query = "DELETE FROM projects WHERE id=%s"
-    execute_query(query, (project_id,))
+    await execute_query_async(query, (project_id,))
     return {"message": "Project deleted successfully"}
 
-@router.get("/projects/{project_id}")
+@router.get("/projects/{project_id}", dependencies=[Depends(table_etag("projects", "customers", "users"))])
 async def get_project(project_id: int):
-    query = """
-    SELECT p.*, c.name as customer_name, e.name as engineer_name, s.name as salesman_name
+    query = f"""
+    SELECT {PROJECT_COLUMNS}, c.name as customer_name, e.name as engineer_name, s.name as salesman_name
     FROM projects p
     LEFT JOIN customers c ON p.customer_id = c.id
     LEFT JOIN users e ON p.engineer_id = e.id
     LEFT JOIN users s ON p.salesman_id = s.id
     WHERE p.id = %s
     """
-    project = execute_query(query, (project_id,), fetch_one=True)
+    project = await execute_query_async(query, (project_id,), fetch_one=True)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return {"project": project}
 
 # Customer Projects endpoints
-@router.get("/customers/{customer_id}/projects")
+@router.get("/customers/{customer_id}/projects", dependencies=[Depends(table_etag("projects", "users"))])
 async def get_customer_projects(customer_id: int):
-    query = """
-    SELECT p.*, e.name as engineer_name, s.name as salesman_name
-    FROM projects p
-    LEFT JOIN users e ON p.engineer_id = e.id
-    LEFT JOIN users s ON p.salesman_id = s.id
-    WHERE p.customer_id = %s
-    ORDER BY p.date DESC
-    """
-    projects = execute_query(query, (customer_id,), fetch_all=True)
-    return {"projects": projects}
+    projects = await execute_query_async(CUSTOMER_PROJECTS_BY_DATE, (customer_id,), fetch_all=True, as_tuples=True)
+    return RowsJSONResponse({"projects": projects})
 
 # Quotes endpoints
-@router.get("/quotes")
-async def get_quotes():
-    query = """
-    SELECT q.*, c.name as customer_name, e.name as engineer_name, s.name as salesman_name
-    FROM quotes q
-    LEFT JOIN customers c ON q.customer_id = c.id
-    LEFT JOIN users e ON q.engineer_id = e.id
-    LEFT JOIN users s ON q.salesman_id = s.id
-    ORDER BY q.date DESC
-    """
-    quotes = execute_query(query, fetch_all=True)
-    return {"quotes": quotes}
+@router.get("/quotes", dependencies=[Depends(table_etag("quotes", "customers", "users"))])
+async def get_quotes(
+    request: Request,
+    page: int = Query(None, ge=1, description="Page number; omit page and limit for the full list"),
+    limit: int = Query(None, ge=1, le=100, description="Items per page"),
+    search: str = Query(None, description="Search by job ID or name"),
+    status: str = Query(None, description="Only quotes with this status"),
+    date_from: date = Query(None, description="Earliest quote date"),
+    date_to: date = Query(None, description="Latest quote date"),
+    sort: str = Query(None, description=f"One of {', '.join(QUOTE_SORTS)} (default date, newest first)"),
+    order: str = Query(None, pattern="^(asc|desc)$", description="asc or desc"),
+    format: str = Query(None, description="json (default) or ndjson; full list only")
+):
+    conditions, params = quote_filters(search, status, date_from, date_to)
+    where = where_clause(conditions)
+    order_by = sort_clause(sort, order, QUOTE_SORTS, "date", "desc", "q.id")
+    query = quote_list_query(where, order_by)
+
+    if page is None and limit is None:
+        return await stream_list_response(
+            request, "quotes", stream_json_rows(query, output_order(order_by, "q"), params or None), format
+        )
+    return await paginated_response(
+        "quotes", query, "quotes", "q", where, params, page, limit, json_order_by=output_order(order_by, "q")
+    )
 
 @router.post("/quotes")
 async def create_quote(quote: QuoteCreate):
     query = """INSERT INTO quotes
                (job_id, name, customer_id, engineer_id, salesman_id, date, sell_price, status)
                VALUES (%s, %s, %s, %s, %s, %s, %s, %s) RETURNING id"""
-    result = execute_query(query, (
+    result = await execute_query_async(query, (
         quote.job_id, quote.name, quote.customer_id, quote.engineer_id,
         quote.salesman_id, quote.date, quote.sell_price, quote.status
     ), fetch_one=True)
@@ -108,7 +235,7 @@ async def update_quote(quote_id: int, quote: QuoteCreate):
                SET job_id=%s, name=%s, customer_id=%s, engineer_id=%s, salesman_id=%s,
                    date=%s, sell_price=%s, status=%s
                WHERE id=%s"""
-    execute_query(query, (
+    await execute_query_async(query, (
         quote.job_id, quote.name, quote.customer_id, quote.engineer_id,
         quote.salesman_id, quote.date, quote.sell_price, quote.status, quote_id
     ))
@@ -117,36 +244,50 @@ async def update_quote(quote_id: int, quote: QuoteCreate):
 @router.delete("/quotes/{quote_id}")
 async def delete_quote(quote_id: int):
     query = "DELETE FROM quotes WHERE id=%s"
-    execute_query(query, (quote_id,))
+    await execute_query_async(query, (quote_id,))
     return {"message": "Quote deleted successfully"}
 
-@router.get("/quotes/{quote_id}")
+@router.get("/quotes/{quote_id}", dependencies=[Depends(table_etag("quotes", "customers", "users"))])
 async def get_quote(quote_id: int):
-    query = """
-    SELECT q.*, c.name as customer_name, e.name as engineer_name, s.name as salesman_name
+    query = f"""
+    SELECT {QUOTE_COLUMNS}, c.name as customer_name, e.name as engineer_name, s.name as salesman_name
     FROM quotes q
     LEFT JOIN customers c ON q.customer_id = c.id
     LEFT JOIN users e ON q.engineer_id = e.id
     LEFT JOIN users s ON q.salesman_id = s.id
     WHERE q.id = %s
     """
-    quote = execute_query(query, (quote_id,), fetch_one=True)
+    quote = await execute_query_async(query, (quote_id,), fetch_one=True)
     if not quote:
         raise HTTPException(status_code=404, detail="Quote not found")
     return {"quote": quote}
 
 # Accounts endpoints
-@router.get("/accounts")
-async def get_accounts():
-    query = """
-    SELECT ca.*, c.name as customer_name, p.name as project_name
-    FROM customer_accounts ca
-    LEFT JOIN customers c ON ca.customer_id = c.id
-    LEFT JOIN projects p ON ca.project_id = p.id
-    ORDER BY ca.date DESC
-    """
-    accounts = execute_query(query, fetch_all=True)
-    return {"accounts": accounts}
+@router.get("/accounts", dependencies=[Depends(table_etag("customer_accounts", "customers", "projects"))])
+async def get_accounts(
+    request: Request,
+    page: int = Query(None, ge=1, description="Page number; omit page and limit for the full list"),
+    limit: int = Query(None, ge=1, le=100, description="Items per page"),
+    search: str = Query(None, description="Search by invoice number or name"),
+    status: str = Query(None, pattern="^(outstanding|paid)$", description="outstanding or paid"),
+    date_from: date = Query(None, description="Earliest invoice date"),
+    date_to: date = Query(None, description="Latest invoice date"),
+    sort: str = Query(None, description=f"One of {', '.join(ACCOUNT_SORTS)} (default date, newest first)"),
+    order: str = Query(None, pattern="^(asc|desc)$", description="asc or desc"),
+    format: str = Query(None, description="json (default) or ndjson; full list only")
+):
+    conditions, params = account_filters(search, status, date_from, date_to)
+    where = where_clause(conditions)
+    order_by = sort_clause(sort, order, ACCOUNT_SORTS, "date", "desc", "ca.id")
+    query = account_list_query(where, order_by)
+
+    if page is None and limit is None:
+        return await stream_list_response(
+            request, "accounts", stream_json_rows(query, output_order(order_by, "ca"), params or None), format
+        )
+    return await paginated_response(
+        "accounts", query, "customer_accounts", "ca", where, params, page, limit, json_order_by=output_order(order_by, "ca")
+    )
 
 @router.post("/accounts")
 async def create_account(account: CustomerAccountCreate):
@@ -154,7 +295,7 @@ async def create_account(account: CustomerAccountCreate):
     INSERT INTO customer_accounts (invoice_number, date, project_id, customer_id, name, amount, outstanding, reminder_date, comments)
     VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id
     """
-    result = execute_query(query, (
+    result = await execute_query_async(query, (
         account.invoice_number, account.date, account.project_id, account.customer_id,
         account.name, account.amount, account.outstanding, account.reminder_date, account.comments
     ), fetch_one=True)
@@ -166,7 +307,7 @@ async def update_account(account_id: int, account: CustomerAccountCreate):
     UPDATE customer_accounts SET invoice_number=%s, date=%s, project_id=%s, customer_id=%s,
     name=%s, amount=%s, outstanding=%s, reminder_date=%s, comments=%s WHERE id=%s
     """
-    execute_query(query, (
+    await execute_query_async(query, (
         account.invoice_number, account.date, account.project_id, account.customer_id,
         account.name, account.amount, account.outstanding, account.reminder_date, account.comments, account_id
     ))
@@ -175,32 +316,25 @@ async def update_account(account_id: int, account: CustomerAccountCreate):
 @router.delete("/accounts/{account_id}")
 async def delete_account(account_id: int):
     query = "DELETE FROM customer_accounts WHERE id=%s"
-    execute_query(query, (account_id,))
+    await execute_query_async(query, (account_id,))
     return {"message": "Account deleted successfully"}
 
-@router.get("/accounts/{account_id}")
+@router.get("/accounts/{account_id}", dependencies=[Depends(table_etag("customer_accounts", "customers", "projects"))])
 async def get_account(account_id: int):
-    query = """
-    SELECT ca.*, c.name as customer_name, p.name as project_name
+    query = f"""
+    SELECT {ACCOUNT_COLUMNS}, c.name as customer_name, p.name as project_name
     FROM customer_accounts ca
     LEFT JOIN customers c ON ca.customer_id = c.id
     LEFT JOIN projects p ON ca.project_id = p.id
     WHERE ca.id = %s
     """
-    account = execute_query(query, (account_id,), fetch_one=True)
+    account = await execute_query_async(query, (account_id,), fetch_one=True)
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     return {"account": account}
 
 # Customer Accounts endpoints
-@router.get("/customers/{customer_id}/accounts")
+@router.get("/customers/{customer_id}/accounts", dependencies=[Depends(table_etag("customer_accounts", "projects"))])
 async def get_customer_accounts(customer_id: int):
-    query = """
-    SELECT ca.*, p.name as project_name
-    FROM customer_accounts ca
-    LEFT JOIN projects p ON ca.project_id = p.id
-    WHERE ca.customer_id = %s
-    ORDER BY ca.date DESC
-    """
-    accounts = execute_query(query, (customer_id,), fetch_all=True)
-    return {"accounts": accounts}
+    accounts = await execute_query_async(CUSTOMER_ACCOUNTS_BY_DATE, (customer_id,), fetch_all=True, as_tuples=True)
+    return RowsJSONResponse({"accounts": accounts})
@@ -0,0 +1,47 @@
+import re
+from typing import Optional
+
+from fastapi import APIRouter, Query
+from database import execute_query_async
+from responses import JSONRoute
+
+router = APIRouter(route_class=JSONRoute)
+
+SEARCH_ENTITIES = ("customer", "supplier", "project", "quote", "account")
+
+def search_query(text: str) -> Optional[str]:
+    """Prefix tsquery matching every word of text, or None if it has none.
+
+    Splits on punctuation like search_words() in the search_documents
+    migration does, and keeps only letters and digits, so nothing the user
+    types can be read as a tsquery operator.
+    """
+    words = re.findall(r"[^\W_]+", text.casefold())
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+# Global search across customers, suppliers, projects, quotes and accounts
+@router.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, description="Words to find, each matching the start of a word"),
+    type: str = Query(None, pattern=f"^({'|'.join(SEARCH_ENTITIES)})$", description="Only results of this type"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results")
+):
+    tsquery = search_query(q)
+    if tsquery is None:
+        return {"results": []}
+
+    query = """
+    SELECT d.entity as type, d.entity_id as id, d.label, d.detail, ts_rank(d.document, query) as rank
+    FROM search_documents d, to_tsquery('simple', %s) query
+    WHERE d.document @@ query
+    """
+    params = (tsquery,)
+    if type:
+        query += " AND d.entity = %s"
+        params += (type,)
+    query += " ORDER BY rank DESC, d.label, d.entity_id LIMIT %s"
+
+    results = await execute_query_async(query, params + (limit,), fetch_all=True)
+    return {"results": results}
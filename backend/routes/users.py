@@ -1,41 +1,57 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
 from models.user import User, UserCreate
-from database import execute_query
+from conditional import table_etag
+from database import execute_query_async
 from websocket_manager import manager
+from autocomplete import autocomplete_indexes
+from pagination import decode_cursor, next_cursor, where_clause, search_pattern, count_rows
+from responses import JSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=JSONRoute)
 
-@router.get("/users")
+@router.get("/users", dependencies=[Depends(table_etag("users"))])
 async def get_users(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(10, ge=1, le=100, description="Items per page"),
-    search: str = Query(None, description="Search by name or email")
+    search: str = Query(None, description="Search by name or email"),
+    cursor: str = Query(None, description="pagination.next_cursor of the previous page; replaces page")
 ):
-    offset = (page - 1) * limit
-
     # Build query with optional search
     base_query = "SELECT * FROM users"
-    count_query = "SELECT COUNT(*) as total FROM users"
-    params = None
+    conditions = []
+    params = ()
 
     if search:
-        search_condition = " WHERE name ILIKE %s OR email ILIKE %s"
-        search_param = f"%{search}%"
-        base_query += search_condition
-        count_query += search_condition
+        conditions.append("(name ILIKE %s OR email ILIKE %s)")
+        search_param = search_pattern(search)
         params = (search_param, search_param)
 
-    # Get total count
-    total_result = execute_query(count_query, params, fetch_one=True)
-    total = total_result['total'] if total_result else 0
+    if cursor:
+        # Keyset pagination: seek past the last row, no COUNT and no OFFSET
+        conditions.append("(name, id) > (%s, %s)")
+        users = await execute_query_async(
+            f"{base_query} WHERE {' AND '.join(conditions)} ORDER BY name, id LIMIT %s",
+            params + tuple(decode_cursor(cursor, (str, int))) + (limit + 1,),
+            fetch_all=True
+        )
+        return {
+            "users": users,
+            "pagination": {
+                "limit": limit,
+                "next_cursor": next_cursor(users, limit, ["name", "id"])
+            }
+        }
+
+    where = where_clause(conditions)
+    base_query += where
+
+    # Total from the maintained row count or the count cache, not a rescan
+    total, exact = await count_rows("users", where, params)
 
     # Get paginated results
-    paginated_query = f"{base_query} ORDER BY name LIMIT %s OFFSET %s"
-    if params:
-        final_params = params + (limit, offset)
-    else:
-        final_params = (limit, offset)
-    users = execute_query(paginated_query, final_params, fetch_all=True)
+    offset = (page - 1) * limit
+    paginated_query = f"{base_query} ORDER BY name, id LIMIT %s OFFSET %s"
+    users = await execute_query_async(paginated_query, params + (limit + 1, offset), fetch_all=True)
 
     return {
         "users": users,
@@ -43,19 +59,27 @@ async def get_users(
             "page": page,
             "limit": limit,
             "total": total,
-            "pages": (total + limit - 1) // limit
+            "total_exact": exact,
+            "pages": (total + limit - 1) // limit,
+            # Continue from here with ?cursor= once past the first pages
+            "next_cursor": next_cursor(users, limit, ["name", "id"])
         }
     }
 
-@router.get("/users/active-count")
+@router.get("/users/active-count", dependencies=[Depends(table_etag("users"))])
 async def get_active_users_count():
-    result = execute_query("SELECT COUNT(*) as count FROM users WHERE active = TRUE", fetch_one=True)
-    return {"active_users_count": result['count']}
+    # The active bucket the dashboard's triggers maintain (migration 0011):
+    # exact, and one slot sum however many users there are
+    result = await execute_query_async(
+        "SELECT row_count FROM summary_totals WHERE table_name = 'users' AND bucket = 'active'", fetch_one=True
+    )
+    return {"active_users_count": result['row_count'] if result else 0, "exact": True}
 
 @router.post("/users")
 async def create_user(user: UserCreate):
     query = "INSERT INTO users (name, email, active) VALUES (%s, %s, %s) RETURNING id"
-    result = execute_query(query, (user.name, user.email, user.active), fetch_one=True)
+    result = await execute_query_async(query, (user.name, user.email, user.active), fetch_one=True)
+    autocomplete_indexes["users"].add(result['id'], user.name)
 
     # Broadcast the event
     await manager.broadcast_event("user_created", {"id": result['id'], **user.model_dump()})
@@ -65,7 +89,8 @@ async def create_user(user: UserCreate):
 @router.put("/users/{user_id}")
 async def update_user(user_id: int, user: UserCreate):
     query = "UPDATE users SET name=%s, email=%s, active=%s WHERE id=%s"
-    execute_query(query, (user.name, user.email, user.active, user_id))
+    await execute_query_async(query, (user.name, user.email, user.active, user_id))
+    autocomplete_indexes["users"].rename(user_id, user.name)
 
     # Broadcast the event
     await manager.broadcast_event("user_updated", {"id": user_id, **user.model_dump()})
@@ -75,7 +100,8 @@ async def update_user(user_id: int, user: UserCreate):
 @router.delete("/users/{user_id}")
 async def delete_user(user_id: int):
     query = "DELETE FROM users WHERE id=%s"
-    execute_query(query, (user_id,))
+    await execute_query_async(query, (user_id,))
+    autocomplete_indexes["users"].remove(user_id)
 
     # Broadcast the event
     await manager.broadcast_event("user_deleted", {"id": user_id})
@@ -0,0 +1,212 @@
+"""
+List queries whose rows Postgres encodes as JSON.
+
+The rows come back as JSON text, one per row, exactly as responses.py
+would have encoded them. They are written into the response untouched, so
+no dict or value object is created per row. Each route opts in by calling
+these instead of execute_query_async / stream_query_async.
+"""
+import os
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from database import RowSet, execute_query_async, fetch_snapshot_async, stream_query_async, STREAM_BATCH_SIZE
+from responses import JSONRows, JSONText
+
+logger = logging.getLogger(__name__)
+
+# Column types whose to_json() text is what responses.py writes
+SAME_AS_PYTHON = {
+    "smallint", "integer", "bigint", "numeric", "boolean",
+    "text", "character varying", "character", "date", "uuid"
+}
+# Column types written through the json_timestamp() SQL function instead
+TIMESTAMPS = {"timestamp without time zone", "timestamp with time zone"}
+
+JSON_QUERY_CACHE_SIZE = int(os.getenv('DB_JSON_QUERY_CACHE_SIZE', 1000))
+
+class JSONQueryCache:
+    """The JSON select list per query text (over its rows as t), or None
+    where a column type has no exact SQL encoding; least recently used
+    first out.
+
+    The route queries list their columns (routes/projects.py), so a
+    migration cannot change a query's columns under its entry. An entry
+    whose statement fails is dropped all the same: the next request
+    describes the query again, in case a column's type changed.
+    """
+
+    def __init__(self, max_size: int = JSON_QUERY_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._select_lists = OrderedDict()
+
+    def get(self, query: str) -> Tuple[bool, Optional[str]]:
+        """(found, select list)"""
+        with self._lock:
+            if query not in self._select_lists:
+                return False, None
+            self._select_lists.move_to_end(query)
+            return True, self._select_lists[query]
+
+    def put(self, query: str, select_list: Optional[str]):
+        with self._lock:
+            self._select_lists[query] = select_list
+            self._select_lists.move_to_end(query)
+            while len(self._select_lists) > self.max_size:
+                self._select_lists.popitem(last=False)
+
+    def forget(self, query: str):
+        with self._lock:
+            self._select_lists.pop(query, None)
+
+# Global JSON select list cache
+json_queries = JSONQueryCache()
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+async def _json_values(query: str, params: Optional[tuple]) -> Optional[str]:
+    """A select list over query's rows (as t) giving each column as
+    responses.py would encode it"""
+    found, select_list = json_queries.get(query)
+    if found:
+        return select_list
+
+    described = await execute_query_async(f"SELECT * FROM ({query}) t LIMIT 0", params, fetch_all=True, as_tuples=True)
+    columns = described.columns
+    if len(set(columns)) != len(columns):
+        logger.warning(f"Encoding rows in Python, not SQL, for duplicate column names: {', '.join(columns)}")
+        json_queries.put(query, None)
+        return None
+
+    # pg_typeof() needs a row: outer join the empty result to one
+    types = await execute_query_async(
+        f"SELECT {', '.join(f'pg_typeof(t.{_quote(column)})::text' for column in columns)} "
+        f"FROM (SELECT 1) one LEFT JOIN (SELECT * FROM ({query}) q LIMIT 0) t ON TRUE",
+        params, fetch_all=True, as_tuples=True
+    )
+
+    values = []
+    unsupported = []
+    for column, type_name in zip(columns, types.rows[0]):
+        if type_name in TIMESTAMPS:
+            values.append(f"json_timestamp(t.{_quote(column)}) AS {_quote(column)}")
+        elif type_name in SAME_AS_PYTHON:
+            values.append(f"t.{_quote(column)}")
+        else:
+            unsupported.append(f"{column} ({type_name})")
+
+    if unsupported:
+        logger.warning(f"Encoding rows in Python, not SQL, for {', '.join(unsupported)}")
+        select_list = None
+    else:
+        select_list = ', '.join(values)
+    json_queries.put(query, select_list)
+    return select_list
+
+async def json_rows_query(query: str, order_by: str, params: Optional[tuple]) -> Optional[str]:
+    """query rewritten to return one JSON object per row.
+
+    order_by is query's own ORDER BY over its output columns as t (see
+    pagination.output_order): a subquery's order is not kept, so the
+    rewritten query sorts again. The planner takes the order from the
+    subquery when it can, so this adds no sort of its own.
+    """
+    select_list = await _json_values(query, params)
+    if select_list is None:
+        return None
+    return f"SELECT row_to_json(j)::text FROM ({query}) t CROSS JOIN LATERAL (SELECT {select_list}) j ORDER BY {order_by}"
+
+async def fetch_json_rows(query: str, order_by: str, params: Optional[tuple] = None) -> Union[JSONRows, RowSet]:
+    """All rows of query as JSON text (or a RowSet, see _json_values)"""
+    json_query = await json_rows_query(query, order_by, params)
+    if json_query is None:
+        return await execute_query_async(query, params, fetch_all=True, as_tuples=True)
+    try:
+        result = await execute_query_async(json_query, params, fetch_all=True, as_tuples=True)
+    except Exception:
+        json_queries.forget(query)
+        raise
+    return JSONRows([row[0] for row in result.rows])
+
+async def stream_json_rows(
+    query: str,
+    order_by: str,
+    params: Optional[tuple] = None,
+    batch_size: int = STREAM_BATCH_SIZE
+) -> AsyncIterator[Union[JSONRows, RowSet]]:
+    """Counterpart of stream_query_async yielding batches of JSON text"""
+    json_query = await json_rows_query(query, order_by, params)
+    if json_query is None:
+        async with aclosing(stream_query_async(query, params, batch_size, as_tuples=True)) as batches:
+            async for batch in batches:
+                yield batch
+        return
+
+    try:
+        async with aclosing(stream_query_async(json_query, params, batch_size, as_tuples=True)) as batches:
+            async for batch in batches:
+                yield JSONRows([row[0] for row in batch.rows])
+    except Exception:
+        json_queries.forget(query)
+        raise
+
+async def fetch_json_document(sections: List[Tuple[str, str, tuple, Optional[str]]]) -> Dict[str, Any]:
+    """Several queries answered by one statement, as one JSON value each.
+
+    sections are (name, query, params, order_by). With order_by, an ORDER BY
+    over the query's output columns as t (e.g. "t.date DESC"), the rows
+    come as a JSON array in that order; the query itself must not sort, as
+    a subquery's order is not kept. With order_by None, the first row comes
+    as an object (None when there is none). One round trip on one
+    connection, instead of a query per section.
+    """
+    statement = await json_document_query(sections)
+
+    if statement is None:
+        # Encoded in Python, but still read from one snapshot: the sections
+        # must agree with each other as they do in the single statement
+        results = await fetch_snapshot_async([
+            (f"SELECT * FROM ({query}) t ORDER BY {order_by}" if order_by is not None else f"SELECT * FROM ({query}) t LIMIT 1", params)
+            for _, query, params, order_by in sections
+        ])
+        return {
+            name: rows if order_by is not None else (rows.to_dicts()[0] if rows else None)
+            for (name, _, _, order_by), rows in zip(sections, results)
+        }
+
+    try:
+        result = await execute_query_async(statement[0], statement[1], fetch_all=True, as_tuples=True)
+    except Exception:
+        for _, query, _, _ in sections:
+            json_queries.forget(query)
+        raise
+    return {
+        name: None if text is None else JSONText(text)
+        for name, text in zip(result.columns, result.rows[0])
+    }
+
+async def json_document_query(sections: List[Tuple[str, str, tuple, Optional[str]]]) -> Optional[Tuple[str, tuple]]:
+    """The single statement and parameters answering fetch_json_document's
+    sections, or None if a section cannot be encoded in SQL"""
+    select_lists = [await _json_values(query, params) for _, query, params, _ in sections]
+    if None in select_lists:
+        return None
+
+    values = []
+    all_params = ()
+    for (name, query, params, order_by), select_list in zip(sections, select_lists):
+        rows = f"FROM ({query}) t CROSS JOIN LATERAL (SELECT {select_list}) j"
+        if order_by is not None:
+            values.append(
+                f"(SELECT '[' || coalesce(string_agg(row_to_json(j)::text, ',' ORDER BY {order_by}), '') || ']' "
+                f"{rows}) AS {_quote(name)}"
+            )
+        else:
+            values.append(f"(SELECT row_to_json(j)::text {rows} LIMIT 1) AS {_quote(name)}")
+        all_params += tuple(params or ())
+    return f"SELECT {', '.join(values)}", all_params
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The backend modules import each other by their flat names, and main.py
+# serves uploads/ relative to the working directory: run as from backend/
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+import autocomplete
+from autocomplete import PrefixIndex, normalize, word_suffixes
+
+NAMES = {1: "Acme Steel Ltd", 2: "Beta Builders", 3: "Steel City Supply", 4: "acme  plumbing"}
+
+@pytest.fixture
+def index(monkeypatch):
+    async def fake_query(query, params=None, fetch_one=False, fetch_all=False, as_tuples=False):
+        if fetch_one:
+            return {"version": 1}
+        return [{"version": 1, "id": row_id, "name": name} for row_id, name in NAMES.items()]
+    monkeypatch.setattr(autocomplete, "execute_query_async", fake_query)
+    index = PrefixIndex("customers")
+    asyncio.run(index.load())
+    return index
+
+def names(results):
+    return [result["name"] for result in results]
+
+def test_normalize_and_suffixes():
+    assert normalize("  ACME   Steel ") == "acme steel"
+    assert word_suffixes("acme steel ltd") == ["steel ltd", "ltd"]
+    assert word_suffixes("acme") == []
+
+def test_prefix_is_case_and_space_insensitive(index):
+    assert names(index.lookup("ACME", 10)) == ["acme  plumbing", "Acme Steel Ltd"]
+    assert names(index.lookup("acme s", 10)) == ["Acme Steel Ltd"]
+
+def test_first_word_matches_rank_before_later_words(index):
+    assert names(index.lookup("steel", 10)) == ["Steel City Supply", "Acme Steel Ltd"]
+
+def test_limit_and_no_match(index):
+    assert len(index.lookup("", 2)) == 2
+    assert index.lookup("zeta", 10) == []
+
+def test_each_row_appears_once(index):
+    index.add(5, "Supply Supply Co")
+    assert [result["id"] for result in index.lookup("supply", 10)] == [5, 3]
+
+def test_writes_apply_at_once(index):
+    index.add(6, "Gamma Group")
+    assert names(index.lookup("gam", 10)) == ["Gamma Group"]
+    index.rename(6, "Delta Group")
+    assert index.lookup("gam", 10) == []
+    assert names(index.lookup("group", 10)) == ["Delta Group"]
+    index.remove(6)
+    assert index.lookup("group", 10) == []
+
+def test_rename_ignores_rows_it_does_not_hold(index):
+    index.rename(99, "Ghost Row")
+    assert index.lookup("ghost", 10) == []
+
+def test_writes_before_loading_are_left_to_the_load():
+    index = PrefixIndex("customers")
+    index.add(1, "Acme")
+    assert index.lookup("acme", 10) == []
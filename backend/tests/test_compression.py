@@ -0,0 +1,224 @@
+import asyncio
+import json
+import os
+import tracemalloc
+import zlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+import compression
+import conditional
+import middleware
+import routes.projects
+from compression import (
+    CompressedCache, CompressedHit, Compressor, cache_key, choose_encoding, compress, compressed_cache
+)
+from main import app
+from middleware import CompressionMiddleware
+from responses import JSONRows
+
+# brotli is optional: without it only gzip is offered
+ENCODINGS = ["gzip", "br"] if compression.brotli is not None else ["gzip"]
+needs_brotli = pytest.mark.skipif(compression.brotli is None, reason="brotli is not installed")
+
+def decompressor(encoding):
+    if encoding == "br":
+        return compression.brotli.Decompressor().process
+    return zlib.decompressobj(16 + zlib.MAX_WBITS).decompress
+
+def scope(method="GET", path="/projects", accept_encoding="gzip, br"):
+    return {
+        "type": "http", "method": method, "path": path, "query_string": b"",
+        "headers": [(b"accept-encoding", accept_encoding.encode())]
+    }
+
+@pytest.mark.parametrize("accept_encoding, encoding", [
+    pytest.param("gzip, deflate, br", "br", marks=needs_brotli),
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    pytest.param("*", "br", marks=needs_brotli),
+    ("gzip;q=0, br;q=0", None),
+    ("identity", None),
+    ("", None),
+    pytest.param("gzip;q=oops, br", "br", marks=needs_brotli),
+])
+def test_choose_encoding(accept_encoding, encoding):
+    assert choose_encoding(accept_encoding) == encoding
+
+def test_choose_encoding_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding("br, gzip") == "gzip"
+    assert choose_encoding("br") is None
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_compress_round_trip(encoding):
+    body = b'{"projects":[' + b",".join(b'{"id":%d}' % i for i in range(500)) + b"]}"
+    compressed = compress(body, encoding)
+    assert len(compressed) < len(body)
+    assert decompressor(encoding)(compressed) == body
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_each_flush_decodes_on_its_own(encoding):
+    compressor = Compressor(encoding)
+    decode = decompressor(encoding)
+    for i in range(5):
+        chunk = b'{"id":%d,"name":"Project %d"},' % (i, i)
+        assert decode(compressor.compress(chunk) + compressor.flush()) == chunk
+    assert decode(compressor.finish()) == b""
+
+def test_cache_get_and_put():
+    cache = CompressedCache(max_bytes=1000)
+    assert cache.get(("a",)) is None
+    cache.put(("a",), "application/json", b"x" * 100)
+    assert cache.get(("a",)) == ("application/json", b"x" * 100)
+    cache.put(("a",), "application/json", b"y" * 50)
+    assert cache.get(("a",)) == ("application/json", b"y" * 50)
+    assert cache.get_status() == {"entries": 1, "bytes": 50, "max_bytes": 1000, "hits": 2, "misses": 1}
+
+def test_cache_evicts_least_recently_used():
+    cache = CompressedCache(max_bytes=1000)
+    for key in "abcd":
+        cache.put((key,), "text/plain", b"x" * 250)
+    cache.get(("a",))
+    cache.put(("e",), "text/plain", b"x" * 250)
+    assert cache.get(("b",)) is None
+    assert all(cache.get((key,)) is not None for key in "acde")
+    assert cache.get_status()["bytes"] == 1000
+
+def test_cache_skips_bodies_over_a_quarter_of_its_size():
+    cache = CompressedCache(max_bytes=1000)
+    cache.put(("a",), "text/plain", b"x" * 251)
+    assert cache.get(("a",)) is None
+    assert cache.get_status()["bytes"] == 0
+
+def test_check_raises_for_a_cached_get_only():
+    cache = CompressedCache()
+    request = scope(accept_encoding="gzip")
+    cache.put(cache_key(request, 'W/"v1"', "gzip"), "application/json", b"body")
+
+    with pytest.raises(CompressedHit) as hit:
+        cache.check(request, 'W/"v1"')
+    assert (hit.value.content_type, hit.value.encoding, hit.value.body) == ("application/json", "gzip", b"body")
+
+    cache.check(request, 'W/"v2"')
+    cache.check(scope(accept_encoding="br"), 'W/"v1"')
+    cache.check(scope(accept_encoding=""), 'W/"v1"')
+    cache.check(scope(method="POST", accept_encoding="gzip"), 'W/"v1"')
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_middleware_streams_decodable_chunks(encoding):
+    chunks = [b"[" + b'{"id":%d},' % i * 200 for i in range(3)] + [b"{}]"]
+
+    async def streaming_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        for chunk in chunks[:-1]:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": chunks[-1]})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(CompressionMiddleware(streaming_app)(scope(accept_encoding=encoding), None, send))
+
+    start, *bodies = messages
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == encoding.encode()
+    assert b"content-length" not in headers
+    # Each message decodes to its chunk as it arrives, not at the end
+    decode = decompressor(encoding)
+    assert [decode(message["body"]) for message in bodies] == chunks
+    assert [message.get("more_body", False) for message in bodies] == [True, True, True, False]
+
+def stream_with_etag(chunks):
+    """An app streaming chunks as a JSON response with an ETag"""
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"application/json"), (b"etag", b'W/"v1"')
+        ]})
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    return app
+
+def test_middleware_caches_small_streamed_bodies(monkeypatch):
+    cache = CompressedCache(max_bytes=1024 * 1024)
+    monkeypatch.setattr(middleware, "compressed_cache", cache)
+    chunks = [b'{"id":%d},' % i * 100 for i in range(10)]
+
+    async def discard(message):
+        pass
+
+    asyncio.run(CompressionMiddleware(stream_with_etag(chunks))(scope(accept_encoding="gzip"), None, discard))
+    _, body = cache.get(cache_key(scope(), 'W/"v1"', "gzip"))
+    assert decompressor("gzip")(body) == b"".join(chunks)
+
+def test_middleware_does_not_hold_streamed_bodies_too_big_to_cache(monkeypatch):
+    cache = CompressedCache(max_bytes=1024 * 1024)
+    monkeypatch.setattr(middleware, "compressed_cache", cache)
+    # 8 MB that does not compress, 32 times what the cache would keep
+    chunks = (os.urandom(64 * 1024) for _ in range(128))
+    sent = [0]
+
+    async def count(message):
+        sent[0] += len(message.get("body", b""))
+
+    tracemalloc.start()
+    try:
+        asyncio.run(CompressionMiddleware(stream_with_etag(chunks))(scope(accept_encoding="gzip"), None, count))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert sent[0] > 8 * 1024 * 1024
+    assert peak < cache.max_body_bytes + 2 * 1024 * 1024
+    assert cache.get_status()["entries"] == 0
+
+@pytest.fixture
+def client(monkeypatch):
+    """The app, with table_stats versions and the /projects list served from memory"""
+    batches = [
+        [json.dumps({"id": i, "name": f"Project {i}", "status": "Active"}) for i in range(start, start + 100)]
+        for start in (0, 100)
+    ]
+    calls = []
+
+    async def fake_versions(query, params=None, fetch_one=False, fetch_all=False, as_tuples=False):
+        return [{"table_name": table, "version": 1} for table in ("projects", "customers", "users")]
+
+    async def fake_stream(query, order_by, params=None):
+        calls.append(query)
+        for batch in batches:
+            yield JSONRows(batch)
+
+    monkeypatch.setattr(conditional, "execute_query_async", fake_versions)
+    monkeypatch.setattr(routes.projects, "stream_json_rows", fake_stream)
+    compressed_cache._bodies.clear()
+    client = TestClient(app)
+    client.calls = calls
+    return client
+
+def test_streamed_list_is_compressed_and_cached(client):
+    response = client.get("/projects", headers={"accept-encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.headers["etag"].startswith('W/"')
+    projects = response.json()["projects"]
+    assert [project["id"] for project in projects] == list(range(200))
+    assert len(client.calls) == 1
+
+    # The same ETag again: the cached compressed body, without the query
+    again = client.get("/projects", headers={"accept-encoding": "gzip"})
+    assert again.status_code == 200
+    assert again.headers["content-encoding"] == "gzip"
+    assert again.json() == response.json()
+    assert len(client.calls) == 1
+
+def test_uncompressed_for_clients_that_do_not_ask(client):
+    response = client.get("/projects", headers={"accept-encoding": "identity"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert len(response.json()["projects"]) == 200
@@ -0,0 +1,85 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import conditional
+import routes.projects
+from compression import compressed_cache
+from conditional import etag_matches, make_etag
+from main import app
+
+def test_make_etag_is_weak_and_stable():
+    etag = make_etag("/projects", "", [("projects", 3)])
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == make_etag("/projects", "", [("projects", 3)])
+
+def test_make_etag_changes_with_any_part():
+    etag = make_etag("/projects", "", [("projects", 3)])
+    assert etag != make_etag("/projects", "", [("projects", 4)])
+    assert etag != make_etag("/projects", "page=2", [("projects", 3)])
+    assert etag != make_etag("/quotes", "", [("projects", 3)])
+
+@pytest.mark.parametrize("if_none_match, matches", [
+    ('W/"abc"', True),
+    ('"abc"', True),
+    ('"xyz", W/"abc"', True),
+    ("*", True),
+    ('W/"abcd"', False),
+    ('"xyz"', False),
+])
+def test_etag_matches_weakly(if_none_match, matches):
+    assert etag_matches(if_none_match, 'W/"abc"') is matches
+
+@pytest.fixture
+def client(monkeypatch):
+    """The app, with table_stats versions and /projects/{id} served from memory"""
+    versions = {"projects": 1, "customers": 1, "users": 1}
+    calls = []
+
+    async def fake_versions(query, params=None, fetch_one=False, fetch_all=False, as_tuples=False):
+        return [{"table_name": table, "version": version} for table, version in versions.items()]
+
+    async def fake_project(query, params=None, fetch_one=False, fetch_all=False, as_tuples=False):
+        calls.append(params)
+        return {"id": params[0], "name": "Tower", "customer_name": "Acme"}
+
+    monkeypatch.setattr(conditional, "execute_query_async", fake_versions)
+    monkeypatch.setattr(routes.projects, "execute_query_async", fake_project)
+    compressed_cache._bodies.clear()
+    client = TestClient(app)
+    client.versions = versions
+    client.calls = calls
+    return client
+
+def test_not_modified_skips_the_route(client):
+    response = client.get("/projects/1")
+    assert response.status_code == 200
+    assert response.json() == {"project": {"id": 1, "name": "Tower", "customer_name": "Acme"}}
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+
+    again = client.get("/projects/1", headers={"if-none-match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    assert len(client.calls) == 1
+
+def test_a_write_changes_the_etag(client):
+    etag = client.get("/projects/1").headers["etag"]
+    client.versions["customers"] += 1
+    response = client.get("/projects/1", headers={"if-none-match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+def test_each_url_has_its_own_etag(client):
+    etag = client.get("/projects/1").headers["etag"]
+    response = client.get("/projects/2", headers={"if-none-match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+def test_no_etag_without_versions(client, monkeypatch):
+    async def untracked(query, params=None, fetch_one=False, fetch_all=False, as_tuples=False):
+        return []
+    monkeypatch.setattr(conditional, "execute_query_async", untracked)
+    response = client.get("/projects/1", headers={"if-none-match": "*"})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
@@ -0,0 +1,48 @@
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+
+import conditional
+import routes.dashboard
+from database import RowSet
+from main import app
+
+TOTALS = [
+    ("customer_accounts", "open", 2, Decimal("150.25")),
+    ("customer_accounts", "settled", 5, Decimal("0")),
+    ("customers", None, 12, 0),
+    ("projects", "Active", 3, Decimal("0")),
+    ("projects", "Completed", 4, Decimal("0")),
+    ("projects", "In Progress", 2, Decimal("0")),
+    ("projects", "Planning", 1, Decimal("0")),
+    ("quotes", "Approved", 1, Decimal("100.00")),
+    ("quotes", "Draft", 2, Decimal("250.50")),
+    ("quotes", "Sent", 1, Decimal("49.50")),
+    ("users", "active", 7, Decimal("0")),
+    ("users", None, 9, 0),
+]
+
+@pytest.fixture
+def client(monkeypatch):
+    """The app, with table versions and summary totals served from memory"""
+    async def fake_versions(query, params=None, fetch_one=False, fetch_all=False, as_tuples=False):
+        return [{"table_name": table, "version": 1} for table in ("users", "customers", "quotes", "projects", "customer_accounts")]
+
+    async def fake_totals(query, params=None, fetch_one=False, fetch_all=False, as_tuples=False):
+        return RowSet(["table_name", "bucket", "row_count", "amount"], TOTALS)
+
+    monkeypatch.setattr(conditional, "execute_query_async", fake_versions)
+    monkeypatch.setattr(routes.dashboard, "execute_query_async", fake_totals)
+    return TestClient(app)
+
+def test_summary_from_bucket_totals(client):
+    summary = client.get("/dashboard/summary").json()
+    assert summary["users"] == {"total": 9, "active": 7}
+    assert summary["customers"] == {"total": 12}
+    assert summary["quotes"]["open"] == 3
+    assert summary["quotes"]["pipeline_value"] == 300.00
+    assert summary["receivables"] == {"open_invoices": 2, "outstanding": 150.25}
+
+def test_in_progress_projects_are_active(client):
+    assert client.get("/dashboard/summary").json()["projects"]["active"] == 5
@@ -0,0 +1,386 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import psycopg
+import psycopg2
+import pytest
+from fastapi.testclient import TestClient
+
+import database
+import middleware
+from database import (
+    DatabasePool, PoolTimeoutError, ReplicaRouter, execute_query_async, get_db_connection, is_read_query,
+    start_read_your_writes
+)
+from middleware import READ_YOUR_WRITES_COOKIE, ReadYourWritesMiddleware
+
+@pytest.mark.parametrize("query", [
+    "SELECT * FROM customers",
+    "  select id from users where id = %s",
+    "\n    SELECT p.*, c.name\n    FROM projects p\n    LEFT JOIN customers c ON p.customer_id = c.id\n",
+    "EXPLAIN SELECT 1",
+    "explain (format json) select * from quotes",
+])
+def test_plain_reads(query):
+    assert is_read_query(query)
+
+@pytest.mark.parametrize("query", [
+    "INSERT INTO customers (name) VALUES (%s) RETURNING id",
+    "UPDATE projects SET name = %s WHERE id = %s",
+    "DELETE FROM quotes WHERE id = %s",
+    "SELECT * FROM customers WHERE id = %s FOR UPDATE",
+    "SELECT * FROM customers WHERE id = %s\n    FOR UPDATE",
+    "SELECT * FROM customers WHERE id = %s\nFOR UPDATE",
+    "SELECT * FROM customers WHERE id = %s FOR NO KEY UPDATE",
+    "SELECT * FROM customers WHERE id = %s for share",
+    "SELECT * FROM customers WHERE id = %s FOR KEY SHARE",
+    "EXPLAIN ANALYZE DELETE FROM quotes",
+    "WITH moved AS (DELETE FROM quotes RETURNING *) SELECT count(*) FROM moved",
+    "SET LOCAL statement_timeout = 1000",
+])
+def test_writes_and_locking_reads(query):
+    assert not is_read_query(query)
+
+class StubServer:
+    """What the stub connections talk to; a failover drops every connection
+    opened before it"""
+
+    def __init__(self):
+        self.generation = 0
+        self.opened = []
+
+    def connect(self, connection_factory=None, **config):
+        connection = StubConnection(self)
+        self.opened.append(connection)
+        return connection
+
+    def fail_over(self):
+        self.generation += 1
+
+class StubConnection:
+    """Stands in for a PooledConnection"""
+
+    def __init__(self, server):
+        self.server = server
+        self.generation = server.generation
+        self.created_at = self.last_used = time.monotonic()
+        self.broken = False
+        self.closed = 0
+        self.autocommit = False
+        self.statements = OrderedDict()
+        self.info = SimpleNamespace(transaction_status=psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+        self.pings = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params=None):
+        if self.generation != self.server.generation:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self.pings += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+def age(connection, seconds):
+    connection.created_at -= seconds
+    connection.last_used -= seconds
+
+@pytest.fixture
+def server(monkeypatch):
+    server = StubServer()
+    monkeypatch.setattr(database.psycopg2, "connect", server.connect)
+    return server
+
+@pytest.fixture
+def make_pool(server, monkeypatch):
+    """DatabasePool factory over the stub server; settings are DB_POOL_* values"""
+    pools = []
+
+    def make(**settings):
+        settings = {"min": 1, "max": 3, "timeout": 2, "resize_interval": 3600, "ping_after": 5,
+                    "max_lifetime": 3600, "max_idle": 600, **settings}
+        for name, value in settings.items():
+            monkeypatch.setenv(f"DB_POOL_{name.upper()}", str(value))
+        pool = DatabasePool(f"stub-{len(pools)}", {"host": "stub", "database": "app", "user": "app", "password": "", "port": 5432})
+        pool._initialize_pool()
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close_all_connections()
+        DatabasePool._instances.pop(pool.name, None)
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+def test_pool_grows_to_max_and_never_beyond(make_pool, server):
+    pool = make_pool(min=1, max=3, timeout=0.1)
+    assert len(server.opened) == 1
+    connections = [pool.get_connection() for _ in range(3)]
+    assert len(server.opened) == 3
+
+    started = time.monotonic()
+    with pytest.raises(PoolTimeoutError):
+        pool.get_connection()
+    assert time.monotonic() - started >= 0.1
+    # Waited for a pooled connection rather than opening a direct one
+    assert len(server.opened) == 3
+    status = pool.get_pool_status()
+    assert (status["open_connections"], status["acquire_timeouts"], status["requests_waiting"]) == (3, 1, 0)
+
+    for connection in connections:
+        pool.return_connection(connection)
+    assert pool.get_pool_status()["available_connections"] == 3
+
+def test_waiters_get_returned_connections_in_arrival_order(make_pool, server):
+    pool = make_pool(min=1, max=1)
+    held = pool.get_connection()
+    served = []
+
+    def wait_in_line(name):
+        connection = pool.get_connection()
+        served.append((name, connection))
+        time.sleep(0.01)
+        pool.return_connection(connection)
+
+    threads = []
+    for name in ("first", "second", "third"):
+        thread = threading.Thread(target=wait_in_line, args=(name,))
+        thread.start()
+        threads.append(thread)
+        wait_for(lambda: len(pool._waiters) == len(threads))
+
+    pool.return_connection(held)
+    for thread in threads:
+        thread.join(2)
+    assert [name for name, _ in served] == ["first", "second", "third"]
+    # Handed from one to the next, never parked idle or reopened
+    assert all(connection is held for _, connection in served)
+    assert len(server.opened) == 1
+
+def test_waiter_opens_a_connection_when_one_is_dropped(make_pool, server):
+    pool = make_pool(min=1, max=1)
+    held = pool.get_connection()
+    served = []
+    thread = threading.Thread(target=lambda: served.append(pool.get_connection()))
+    thread.start()
+    wait_for(lambda: len(pool._waiters) == 1)
+
+    held.broken = True
+    pool.return_connection(held)
+    thread.join(2)
+    assert served[0] is server.opened[1]
+    assert held.closed
+    assert pool.get_pool_status()["open_connections"] == 1
+
+def test_idle_connections_shrink_to_the_last_window_peak(make_pool, server):
+    pool = make_pool(min=1, max=4)
+    connections = [pool.get_connection() for _ in range(3)]
+    for connection in connections:
+        pool.return_connection(connection)
+    assert pool.get_pool_status()["available_connections"] == 3
+
+    # The window that saw 3 in use ends: its peak is kept
+    pool._window_start -= 3600
+    pool.return_connection(pool.get_connection())
+    assert pool.get_pool_status()["open_connections"] == 3
+
+    # A window that needed only one: down to that
+    connection = pool.get_connection()
+    pool._window_start -= 3600
+    pool.return_connection(connection)
+    assert pool.get_pool_status()["open_connections"] == 1
+    assert pool._idle[0] is connection
+    assert sum(opened.closed for opened in connections) == 2
+
+def test_connections_past_their_lifetime_are_replaced(make_pool, server):
+    pool = make_pool(min=1, max_lifetime=60)
+    old = server.opened[0]
+    age(old, 61)
+    connection = pool.get_connection()
+    assert connection is not old and old.closed
+
+    # And on return, when it outlived its lifetime while checked out
+    age(connection, 61)
+    pool.return_connection(connection)
+    assert connection.closed
+    assert pool.get_pool_status()["expired_lifetime"] == 2
+
+def test_reaper_closes_long_idle_connections_down_to_min(make_pool, server):
+    pool = make_pool(min=1, max=4, max_idle=60)
+    connections = [pool.get_connection() for _ in range(3)]
+    for connection in connections:
+        pool.return_connection(connection)
+    for connection in connections:
+        age(connection, 61)
+
+    pool.reap()
+    status = pool.get_pool_status()
+    assert (status["open_connections"], status["reaped_idle"]) == (1, 2)
+
+def test_reaper_tops_the_pool_back_up_to_min(make_pool, server):
+    pool = make_pool(min=2, max=4, max_lifetime=60)
+    for connection in server.opened:
+        age(connection, 61)
+
+    pool.reap()
+    status = pool.get_pool_status()
+    assert (status["available_connections"], status["expired_lifetime"]) == (2, 2)
+    assert len(server.opened) == 4 and all(not connection.closed for connection in server.opened[2:])
+
+def test_recently_used_connections_skip_the_ping(make_pool, server):
+    pool = make_pool(min=1, ping_after=5)
+    connection = pool.get_connection()
+    assert connection.pings == 0
+    pool.return_connection(connection)
+
+    age(connection, 6)
+    assert pool.get_connection() is connection
+    assert connection.pings == 1
+
+def test_pool_recovers_within_one_request_after_failover(make_pool, server):
+    """After one connection fails, idle connections are pinged before reuse
+    even if recently used, so the next request gets a live one"""
+    pool = make_pool(min=1, max=4)
+    connections = [pool.get_connection() for _ in range(3)]
+    for connection in connections:
+        pool.return_connection(connection)
+    server.fail_over()
+
+    with pytest.raises(psycopg2.OperationalError):
+        with get_db_connection(pool) as connection:
+            connection.execute("SELECT 1")
+    assert connection.broken and connection.closed
+
+    connection = pool.get_connection()
+    connection.execute("SELECT 1")
+    assert connection is server.opened[-1]
+    assert all(dead.closed for dead in connections)
+    assert pool.get_pool_status()["validation_failures"] == 2
+
+class StubAsyncPool:
+    """An async pool that records the statements routed to it"""
+
+    def __init__(self, name):
+        self.name = name
+        self.down = False
+        self.statements = []
+
+async def run_on_stub(pool, query, params, fetch_one, fetch_all, as_tuples=False):
+    if pool.down:
+        raise psycopg.OperationalError("connection refused")
+    pool.statements.append(query)
+    return {"pool": pool.name} if fetch_one else None
+
+@pytest.fixture
+def pools(monkeypatch):
+    """A stub primary and replica behind execute_query_async"""
+    primary, replica = StubAsyncPool("primary"), StubAsyncPool("replica-1")
+    monkeypatch.setattr(database, "ASYNC_BACKEND", "psycopg")
+    monkeypatch.setattr(database, "async_db_pool", primary)
+    monkeypatch.setattr(database, "async_replica_pools", [replica])
+    monkeypatch.setattr(database, "replica_router", ReplicaRouter())
+    monkeypatch.setattr(database, "_process_primary_until", 0.0)
+    monkeypatch.setattr(database, "_run_query_async", run_on_stub)
+    return primary, replica
+
+READ = "SELECT * FROM customers WHERE id = %s"
+WRITE = "UPDATE customers SET name = %s WHERE id = %s"
+
+async def served_by(query=READ):
+    result = await execute_query_async(query, (1,), fetch_one=True)
+    return result["pool"] if result else None
+
+def test_reads_go_to_the_replica_and_writes_to_the_primary(pools):
+    async def request():
+        start_read_your_writes()
+        return [await served_by(), await served_by("SELECT * FROM customers WHERE id = %s FOR UPDATE")]
+
+    assert asyncio.run(request()) == ["replica-1", "primary"]
+
+def test_reads_after_a_write_stay_on_the_primary_for_the_window(pools, monkeypatch):
+    monkeypatch.setattr(database, "READ_YOUR_WRITES_SECONDS", 0.05)
+
+    async def request():
+        state = start_read_your_writes()
+        before = await served_by()
+        await execute_query_async(WRITE, ("Acme", 1))
+        after = await served_by()
+        await asyncio.sleep(0.06)
+        return state, before, after, await served_by()
+
+    state, before, after, later = asyncio.run(request())
+    assert (before, after, later) == ("replica-1", "primary", "replica-1")
+    assert state.wrote
+    assert database.replica_router.get_status()["pinned_reads"] == 1
+
+def test_a_later_request_inside_the_window_reads_from_the_primary(pools):
+    async def request(primary_until=0.0, query=READ):
+        state = start_read_your_writes(primary_until)
+        served = await served_by(query)
+        return state.primary_until, served
+
+    primary_until, _ = asyncio.run(request(query=WRITE))
+    assert primary_until > time.time()
+    assert asyncio.run(request(primary_until))[1] == "primary"
+    assert asyncio.run(request(time.time() - 1))[1] == "replica-1"
+
+def test_writes_outside_a_request_pin_the_process(pools):
+    asyncio.run(execute_query_async(WRITE, ("Acme", 1)))
+    assert asyncio.run(served_by()) == "primary"
+
+def test_reads_fall_back_to_the_primary_while_the_replica_is_down(pools):
+    primary, replica = pools
+    replica.down = True
+    assert asyncio.run(served_by()) == "primary"
+    replica.down = False
+    # Skipped for DB_REPLICA_RETRY_SECONDS, not retried on the next read
+    assert asyncio.run(served_by()) == "primary"
+    assert database.replica_router.get_status()["down"] == ["replica-1"]
+
+@pytest.fixture
+def client(pools, monkeypatch):
+    """ReadYourWritesMiddleware over an app that writes on POST and reports
+    which pool served a GET's read"""
+    monkeypatch.setattr(middleware, "replica_pools", [object()])
+
+    async def app(scope, receive, send):
+        if scope["method"] == "POST":
+            await execute_query_async(WRITE, ("Acme", 1))
+            body = b"written"
+        else:
+            body = (await served_by()).encode()
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": body})
+
+    return TestClient(ReadYourWritesMiddleware(app))
+
+def test_cookie_keeps_the_next_requests_on_the_primary(client):
+    assert client.get("/").text == "replica-1"
+    assert READ_YOUR_WRITES_COOKIE not in client.cookies
+
+    response = client.post("/")
+    assert f"{READ_YOUR_WRITES_COOKIE}=" in response.headers["set-cookie"]
+    assert float(client.cookies[READ_YOUR_WRITES_COOKIE]) > time.time()
+    # The deadline comes back with the next request, to any worker
+    assert client.get("/").text == "primary"
+
+    # Another client, or this one once the window has passed
+    assert TestClient(client.app).get("/").text == "replica-1"
+    client.cookies.set(READ_YOUR_WRITES_COOKIE, f"{time.time() - 1:.3f}")
+    assert client.get("/").text == "replica-1"
+
+def test_garbled_cookie_is_ignored(client):
+    client.cookies.set(READ_YOUR_WRITES_COOKIE, "soon")
+    assert client.get("/").text == "replica-1"
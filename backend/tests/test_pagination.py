@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from database import RowSet
+from pagination import decode_cursor, encode_cursor, next_cursor, output_order
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(["Acme Corporation", 42])
+    assert "=" not in cursor
+    assert decode_cursor(cursor, (str, int)) == ["Acme Corporation", 42]
+
+def test_cursor_dates_come_back_as_dates():
+    cursor = encode_cursor([date(2024, 2, 29), 7])
+    assert decode_cursor(cursor, (date, int)) == [date(2024, 2, 29), 7]
+
+def test_cursor_keeps_non_ascii_names():
+    assert decode_cursor(encode_cursor(["Müller & Söhne", 3]), (str, int)) == ["Müller & Söhne", 3]
+
+@pytest.mark.parametrize("cursor", [
+    raw_cursor(["x", "y"]),
+    raw_cursor([1, 2]),
+    raw_cursor(["a", True]),
+    raw_cursor(["a", 1.5]),
+    raw_cursor(["a", 2 ** 63]),
+    raw_cursor(["a", None]),
+    raw_cursor(["a"]),
+    raw_cursor(["a", 1, 2]),
+    raw_cursor({"name": "a", "id": 1}),
+    "not base64!",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    "",
+])
+def test_forged_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, (str, int))
+    assert error.value.status_code == 400
+
+def test_date_cursor_rejects_other_strings():
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(raw_cursor(["last tuesday", 1]), (date, int))
+    assert error.value.status_code == 400
+
+def test_next_cursor_trims_the_look_ahead_row():
+    rows = [{"name": name, "id": row_id} for row_id, name in enumerate("abc", 1)]
+    cursor = next_cursor(rows, 2, ["name", "id"])
+    assert [row["name"] for row in rows] == ["a", "b"]
+    assert decode_cursor(cursor, (str, int)) == ["b", 2]
+
+def test_next_cursor_on_a_row_set():
+    rows = RowSet(["id", "name"], [(1, "a"), (2, "b"), (3, "c")])
+    cursor = next_cursor(rows, 2, ["name", "id"])
+    assert rows.rows == [(1, "a"), (2, "b")]
+    assert decode_cursor(cursor, (str, int)) == ["b", 2]
+
+def test_no_cursor_on_the_last_page():
+    rows = [{"name": "a", "id": 1}]
+    assert next_cursor(rows, 2, ["name", "id"]) is None
+    assert len(rows) == 1
+
+def test_output_order():
+    assert output_order("p.date DESC, p.id DESC", "p") == "t.date DESC, t.id DESC"
+    # Only the given alias, not one that ends with it
+    assert output_order("ca.name ASC, ca.id ASC", "a") == "ca.name ASC, ca.id ASC"
+    assert output_order("ca.name ASC, ca.id ASC", "ca") == "t.name ASC, t.id ASC"
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import routes.business
+from compression import compressed_cache
+from main import app
+from reference_cache import ReferenceCache, reference_cache
+
+def listening(cache, monkeypatch=None):
+    """cache as if its listener were connected, without starting one"""
+    if monkeypatch is None:
+        cache._listener = threading.Thread()
+        cache._listening = True
+    else:
+        monkeypatch.setattr(cache, "_listener", threading.Thread())
+        monkeypatch.setattr(cache, "_listening", True)
+    return cache
+
+class Loader:
+    """A table load counting its calls; during() runs inside the load"""
+
+    def __init__(self, during=None):
+        self.calls = 0
+        self.during = during
+
+    async def __call__(self):
+        self.calls += 1
+        if self.during is not None:
+            self.during()
+        return [{"id": 1, "name": f"load {self.calls}"}]
+
+def get(cache, load, table="departments"):
+    return asyncio.run(cache.get(table, load))
+
+def test_hits_until_the_entry_expires():
+    cache = listening(ReferenceCache(ttl=0.05))
+    load = Loader()
+    assert get(cache, load) == get(cache, load) == [{"id": 1, "name": "load 1"}]
+    assert load.calls == 1
+
+    time.sleep(0.06)
+    assert get(cache, load) == [{"id": 1, "name": "load 2"}]
+
+def test_invalidate_drops_one_table():
+    cache = listening(ReferenceCache())
+    departments, teams = Loader(), Loader()
+    get(cache, departments, "departments")
+    get(cache, teams, "teams")
+
+    cache.invalidate("departments")
+    get(cache, departments, "departments")
+    get(cache, teams, "teams")
+    assert (departments.calls, teams.calls) == (2, 1)
+
+def test_load_that_raced_an_invalidation_is_not_kept():
+    cache = listening(ReferenceCache())
+    load = Loader(during=lambda: cache.invalidate("departments"))
+    get(cache, load)
+    load.during = None
+    get(cache, load)
+    get(cache, load)
+    assert load.calls == 2
+
+def test_load_that_raced_a_listener_reconnect_is_not_kept():
+    cache = listening(ReferenceCache())
+    load = Loader(during=cache.clear)
+    get(cache, load)
+    load.during = None
+    get(cache, load)
+    assert load.calls == 2
+
+def test_nothing_cached_while_not_listening():
+    cache = listening(ReferenceCache())
+    cache._listening = False
+    load = Loader()
+    get(cache, load)
+    get(cache, load)
+    assert load.calls == 2
+
+    cache._listening = True
+    get(cache, load)
+    get(cache, load)
+    assert load.calls == 3
+
+def test_zero_ttl_disables_the_cache():
+    cache = ReferenceCache(ttl=0)
+    load = Loader()
+    get(cache, load)
+    get(cache, load)
+    assert load.calls == 2
+    assert cache._listener is None
+
+@pytest.fixture
+def client(monkeypatch):
+    """The app, with departments served from memory through a listening cache"""
+    departments = [{"id": 1, "number": "10", "name": "Sales"}]
+    statements = []
+
+    async def fake_execute(query, params=None, fetch_one=False, fetch_all=False, as_tuples=False):
+        statements.append(query.split()[0])
+        if query.startswith("SELECT"):
+            return [dict(department) for department in departments]
+        return {"id": 2} if fetch_one else None
+
+    monkeypatch.setattr(routes.business, "execute_query_async", fake_execute)
+    listening(reference_cache, monkeypatch)
+    monkeypatch.setattr(reference_cache, "_entries", {})
+    compressed_cache._bodies.clear()
+    client = TestClient(app)
+    client.statements = statements
+    client.departments = departments
+    return client
+
+def test_writes_invalidate_the_cached_table(client):
+    department = {"number": "20", "name": "Service"}
+    client.get("/settings/departments")
+    client.get("/settings/departments")
+    assert client.statements == ["SELECT"]
+
+    writes = {
+        "POST": lambda: client.post("/settings/departments", json=department),
+        "PUT": lambda: client.put("/settings/departments/1", json=department),
+        "DELETE": lambda: client.delete("/settings/departments/1"),
+    }
+    for method, write in writes.items():
+        client.statements.clear()
+        assert write().status_code == 200
+        client.departments[0]["name"] = f"Sales after {method}"
+        assert client.get("/settings/departments").json() == {"departments": client.departments}
+        client.get("/settings/departments")
+        assert client.statements[1:] == ["SELECT"]
+
+def test_cached_table_answers_conditional_gets(client):
+    response = client.get("/settings/departments")
+    again = client.get("/settings/departments", headers={"if-none-match": response.headers["etag"]})
+    assert again.status_code == 304
+    assert client.statements == ["SELECT"]
@@ -0,0 +1,48 @@
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from database import RowSet
+from responses import JSONRows, JSONText, RowsJSONResponse, encode_json
+
+def test_decimals_are_written_exactly():
+    assert encode_json({"amount": Decimal("12500.10")}) == b'{"amount":12500.10}'
+    assert encode_json([Decimal("0.1"), Decimal("-3"), Decimal("1E+3")]) == b"[0.1,-3,1E+3]"
+    # Beyond a float's precision
+    assert encode_json(Decimal("12345678901234567890.123456789")) == b"12345678901234567890.123456789"
+
+@pytest.mark.parametrize("value", [Decimal("NaN"), Decimal("Infinity"), Decimal("-Infinity")])
+def test_non_finite_decimals_are_refused(value):
+    with pytest.raises(TypeError):
+        encode_json({"amount": value})
+
+def test_dates_and_times_as_iso_text():
+    assert encode_json({"date": date(2024, 2, 29)}) == b'{"date":"2024-02-29"}'
+    assert encode_json(datetime(2024, 2, 29, 13, 5, 9)) == b'"2024-02-29T13:05:09"'
+    assert encode_json(datetime(2024, 2, 29, 13, 5, 9, tzinfo=timezone.utc)) == b'"2024-02-29T13:05:09+00:00"'
+
+def test_uuids_and_non_ascii_text():
+    value = uuid.UUID("12345678-1234-5678-1234-567812345678")
+    assert encode_json({"id": value, "name": "Müller"}) == '{"id":"12345678-1234-5678-1234-567812345678","name":"Müller"}'.encode()
+
+def test_row_sets_become_lists_of_objects():
+    rows = RowSet(["id", "date", "amount"], [(1, date(2024, 1, 2), Decimal("5.50")), (2, None, Decimal("0"))])
+    assert encode_json({"accounts": rows}) == (
+        b'{"accounts":[{"id":1,"date":"2024-01-02","amount":5.50},{"id":2,"date":null,"amount":0}]}'
+    )
+
+def test_json_from_postgres_is_written_untouched():
+    rows = JSONRows(['{"id":1,"name":"a"}', '{"id":2,"name":"b"}'])
+    assert encode_json({"projects": rows, "summary": JSONText('{"count":2}')}) == (
+        b'{"projects":[{"id":1,"name":"a"},{"id":2,"name":"b"}],"summary":{"count":2}}'
+    )
+    assert encode_json({"projects": JSONRows([])}) == b'{"projects":[]}'
+
+def test_response_body_and_type():
+    response = RowsJSONResponse({"total": Decimal("1.10"), "when": date(2024, 5, 1)})
+    assert response.body == b'{"total":1.10,"when":"2024-05-01"}'
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {"total": 1.1, "when": "2024-05-01"}
@@ -0,0 +1,112 @@
+import asyncio
+
+import psycopg2
+import pytest
+
+import sql_json
+from database import RowSet, cleanup_database_async, execute_query_async, get_db_config
+from pagination import output_order, paginated_response, sort_clause, where_clause
+from responses import JSONRows, RowsJSONResponse
+from routes.projects import (
+    ACCOUNT_SORTS, PROJECT_SORTS, QUOTE_SORTS, account_list_query, project_list_query, quote_list_query
+)
+from sql_json import JSONQueryCache, fetch_json_rows, json_rows_query, stream_json_rows
+
+LISTS = [
+    ("projects", project_list_query, PROJECT_SORTS, "projects", "p"),
+    ("quotes", quote_list_query, QUOTE_SORTS, "quotes", "q"),
+    ("accounts", account_list_query, ACCOUNT_SORTS, "customer_accounts", "ca"),
+]
+ORDERS = [(sort, order) for sort in (None, "name") for order in (None, "asc")]
+
+@pytest.fixture(scope="module")
+def database():
+    """A migrated database to run the list queries on"""
+    try:
+        psycopg2.connect(**get_db_config(), connect_timeout=2).close()
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"no database: {e}")
+
+def run(coroutine):
+    async def run_and_close():
+        try:
+            return await coroutine
+        finally:
+            await cleanup_database_async()
+    return asyncio.run(run_and_close())
+
+@pytest.mark.usefixtures("database")
+@pytest.mark.parametrize("sort, order", ORDERS)
+@pytest.mark.parametrize("key, list_query, sorts, table, alias", LISTS)
+def test_sql_encoded_page_is_the_python_encoded_page(key, list_query, sorts, table, alias, sort, order):
+    order_by = sort_clause(sort, order, sorts, "date", "desc", f"{alias}.id")
+    query = list_query(where_clause([]), order_by)
+
+    async def both_pages():
+        # Otherwise both pages are encoded in Python
+        assert await json_rows_query(query, output_order(order_by, alias), ()) is not None
+        in_python = await paginated_response(key, query, table, alias, "", (), 3, 25)
+        in_sql = await paginated_response(key, query, table, alias, "", (), 3, 25, json_order_by=output_order(order_by, alias))
+        return in_python, in_sql
+
+    in_python, in_sql = run(both_pages())
+    assert in_sql.body == in_python.body
+
+@pytest.mark.usefixtures("database")
+@pytest.mark.parametrize("key, list_query, sorts, table, alias", LISTS)
+def test_sql_encoded_stream_is_the_python_encoded_list(key, list_query, sorts, table, alias):
+    order_by = sort_clause("name", "desc", sorts, "date", "desc", f"{alias}.id")
+    query = list_query(where_clause([]), order_by)
+
+    async def both_lists():
+        rows = []
+        async for batch in stream_json_rows(query, output_order(order_by, alias), batch_size=100):
+            assert isinstance(batch, JSONRows)
+            rows.extend(batch.rows)
+        in_python = await execute_query_async(query, fetch_all=True, as_tuples=True)
+        return RowsJSONResponse({key: in_python}), RowsJSONResponse({key: JSONRows(rows)})
+
+    in_python, in_sql = run(both_lists())
+    assert in_sql.body == in_python.body
+
+def test_cache_keeps_the_most_recently_used_queries():
+    cache = JSONQueryCache(max_size=2)
+    assert cache.get("a") == (False, None)
+    cache.put("a", "t.\"id\"")
+    cache.put("b", None)
+    cache.get("a")
+    cache.put("c", "t.\"name\"")
+    assert cache.get("a") == (True, "t.\"id\"")
+    assert cache.get("b") == (False, None)
+    assert cache.get("c") == (True, "t.\"name\"")
+
+def test_failed_statement_drops_its_select_list(monkeypatch):
+    """The next request describes the query again, in case a column changed"""
+    statements = []
+    fail = [True]
+
+    async def fake_execute(query, params=None, fetch_one=False, fetch_all=False, as_tuples=False):
+        statements.append(query)
+        if query.startswith("SELECT * FROM"):
+            return RowSet(["id"], [])
+        if "pg_typeof" in query:
+            return RowSet(["pg_typeof"], [("integer",)])
+        if fail[0]:
+            raise Exception("Database error: function json_timestamp(text) does not exist")
+        return RowSet(["row_to_json"], [('{"id":1}',)])
+
+    monkeypatch.setattr(sql_json, "execute_query_async", fake_execute)
+    monkeypatch.setattr(sql_json, "json_queries", JSONQueryCache())
+    query = "SELECT id FROM projects ORDER BY id"
+
+    with pytest.raises(Exception):
+        asyncio.run(fetch_json_rows(query, "t.id"))
+    assert sql_json.json_queries.get(query) == (False, None)
+
+    fail[0] = False
+    statements.clear()
+    assert asyncio.run(fetch_json_rows(query, "t.id")).rows == ['{"id":1}']
+    assert len(statements) == 3
+    statements.clear()
+    asyncio.run(fetch_json_rows(query, "t.id"))
+    assert len(statements) == 1
@@ -0,0 +1,37 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import conditional
+import routes.users
+from main import app
+
+@pytest.fixture
+def client(monkeypatch):
+    """The app, with the users version and summary totals served from memory"""
+    statements = []
+    active = {"row_count": 1710}
+
+    async def fake_versions(query, params=None, fetch_one=False, fetch_all=False, as_tuples=False):
+        return [{"table_name": "users", "version": 1}]
+
+    async def fake_totals(query, params=None, fetch_one=False, fetch_all=False, as_tuples=False):
+        statements.append(query)
+        return dict(active) if active else None
+
+    monkeypatch.setattr(conditional, "execute_query_async", fake_versions)
+    monkeypatch.setattr(routes.users, "execute_query_async", fake_totals)
+    client = TestClient(app)
+    client.statements = statements
+    client.active = active
+    return client
+
+def test_active_count_comes_from_the_maintained_bucket(client):
+    response = client.get("/users/active-count")
+    assert response.json() == {"active_users_count": 1710, "exact": True}
+    assert len(client.statements) == 1
+    assert "summary_totals" in client.statements[0]
+    assert "COUNT(" not in client.statements[0].upper()
+
+def test_active_count_without_active_users(client):
+    client.active.clear()
+    assert client.get("/users/active-count").json() == {"active_users_count": 0, "exact": True}
@@ -1,3 +1,9 @@
+-- Generated by `python backend/migrate.py --sql` from backend/migrations/.
+-- Edit the migrations, not this file. For a new database only: existing
+-- databases are upgraded with `python backend/migrate.py`.
+
+-- 0001_initial_schema.sql
+
 -- PostgreSQL Schema for Supabase
 -- Note: Supabase automatically creates the database, so no CREATE DATABASE needed
 
@@ -353,3 +359,688 @@ INSERT INTO customer_accounts (invoice_number, date, project_id, customer_id, na
 ('INV-2024-001', '2024-02-01', 1, 1, 'Office Renovation - Phase 1', 12500.00, 5000.00, '2024-03-01', 'Partial payment received'),
 ('INV-2024-002', '2024-02-15', 2, 2, 'IT Infrastructure - Initial Setup', 22500.00, 22500.00, '2024-03-15', 'Awaiting approval'),
 ('INV-2024-003', '2024-03-01', 3, 3, 'Warehouse Automation - Consultation', 15000.00, 0.00, NULL, 'Paid in full');
+
+-- 0002_keyset_pagination_indexes.sql
+
+-- Composite indexes matching the ORDER BY of the paginated /customers and
+-- /users lists, so a keyset page is an index range scan of `limit` rows
+
+CREATE INDEX IF NOT EXISTS idx_customers_name_id ON customers(name, id);
+
+CREATE INDEX IF NOT EXISTS idx_users_name_id ON users(name, id);
+
+-- 0003_list_sort_indexes.sql
+
+-- Indexes behind the sort and filter options of the paginated /projects,
+-- /quotes, /accounts and /suppliers lists. Every sort key is paired with
+-- the id tiebreaker so a page is read in index order and the scan stops
+-- after LIMIT + OFFSET rows; status filters get (status, date, id) so the
+-- default newest-first order still comes straight from the index.
+
+CREATE INDEX IF NOT EXISTS idx_projects_date_id ON projects(date, id);
+CREATE INDEX IF NOT EXISTS idx_projects_name_id ON projects(name, id);
+CREATE INDEX IF NOT EXISTS idx_projects_status_date_id ON projects(status, date, id);
+
+CREATE INDEX IF NOT EXISTS idx_quotes_date_id ON quotes(date, id);
+CREATE INDEX IF NOT EXISTS idx_quotes_name_id ON quotes(name, id);
+CREATE INDEX IF NOT EXISTS idx_quotes_sell_price_id ON quotes(sell_price, id);
+CREATE INDEX IF NOT EXISTS idx_quotes_status_date_id ON quotes(status, date, id);
+
+CREATE INDEX IF NOT EXISTS idx_customer_accounts_date_id ON customer_accounts(date, id);
+CREATE INDEX IF NOT EXISTS idx_customer_accounts_name_id ON customer_accounts(name, id);
+CREATE INDEX IF NOT EXISTS idx_customer_accounts_outstanding_id ON customer_accounts(outstanding, id);
+CREATE INDEX IF NOT EXISTS idx_customer_accounts_open_date_id ON customer_accounts(date, id) WHERE outstanding > 0;
+
+-- (name, id) covers everything the single-column name index did
+DROP INDEX IF EXISTS idx_suppliers_name;
+CREATE INDEX IF NOT EXISTS idx_suppliers_name_id ON suppliers(name, id);
+CREATE INDEX IF NOT EXISTS idx_suppliers_category_id ON suppliers(category, id);
+
+-- 0004_table_stats.sql
+
+-- Row counts and change versions for the paginated tables, maintained by
+-- statement-level triggers. List endpoints read unfiltered totals from here
+-- instead of running COUNT(*), and cache filtered counts per version.
+
+CREATE TABLE IF NOT EXISTS table_stats (
+    table_name VARCHAR(63) PRIMARY KEY,
+    row_count BIGINT NOT NULL DEFAULT 0,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION table_stats_after_insert()
+RETURNS TRIGGER AS $$
+DECLARE
+    inserted BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO inserted FROM new_rows;
+    IF inserted > 0 THEN
+        UPDATE table_stats SET row_count = row_count + inserted, version = version + 1
+        WHERE table_name = TG_TABLE_NAME;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION table_stats_after_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM new_rows) THEN
+        UPDATE table_stats SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION table_stats_after_delete()
+RETURNS TRIGGER AS $$
+DECLARE
+    deleted BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO deleted FROM old_rows;
+    IF deleted > 0 THEN
+        UPDATE table_stats SET row_count = row_count - deleted, version = version + 1
+        WHERE table_name = TG_TABLE_NAME;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION table_stats_after_truncate()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE table_stats SET row_count = 0, version = version + 1 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Attach the triggers and take the initial count with writers locked out,
+-- so no row is counted twice or missed
+CREATE OR REPLACE FUNCTION track_table_stats(tracked regclass)
+RETURNS VOID AS $$
+DECLARE
+    name TEXT := (SELECT relname FROM pg_class WHERE oid = tracked);
+BEGIN
+    EXECUTE format('LOCK TABLE %s IN SHARE MODE', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_stats_insert', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_stats_update', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_stats_delete', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_stats_truncate', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER INSERT ON %s REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION table_stats_after_insert()', name || '_stats_insert', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER UPDATE ON %s REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION table_stats_after_update()', name || '_stats_update', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER DELETE ON %s REFERENCING OLD TABLE AS old_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION table_stats_after_delete()', name || '_stats_delete', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER TRUNCATE ON %s
+                    FOR EACH STATEMENT EXECUTE FUNCTION table_stats_after_truncate()', name || '_stats_truncate', tracked);
+    EXECUTE format('INSERT INTO table_stats (table_name, row_count, version) SELECT %L, COUNT(*), 1 FROM %s
+                    ON CONFLICT (table_name) DO UPDATE SET row_count = EXCLUDED.row_count,
+                    version = table_stats.version + 1', name, tracked);
+END;
+$$ language 'plpgsql';
+
+SELECT track_table_stats('users');
+SELECT track_table_stats('customers');
+SELECT track_table_stats('suppliers');
+SELECT track_table_stats('projects');
+SELECT track_table_stats('quotes');
+SELECT track_table_stats('customer_accounts');
+
+-- 0005_trigram_search_indexes.sql
+
+-- Trigram indexes for the substring search of /customers, /suppliers and
+-- /users. `col ILIKE '%term%'` can use a gin_trgm_ops index, and the OR of
+-- one ILIKE per column becomes a BitmapOr of these indexes instead of a
+-- sequential scan of the whole table, so search stays fast as tables grow.
+-- Terms shorter than three characters carry no trigrams and still scan.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_customers_name_trgm ON customers USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_customers_email_trgm ON customers USING gin (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_customers_category_trgm ON customers USING gin (category gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_suppliers_name_trgm ON suppliers USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_suppliers_email_trgm ON suppliers USING gin (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_suppliers_category_trgm ON suppliers USING gin (category gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_users_name_trgm ON users USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_email_trgm ON users USING gin (email gin_trgm_ops);
+
+-- 0006_search_documents.sql
+
+-- Global search (GET /search): one tsvector document per customer, supplier,
+-- project, quote and account, kept in step with its row by statement-level
+-- triggers and searched through a single GIN index. The documents live in
+-- their own table so the `SELECT t.*` list queries do not carry them.
+
+CREATE TABLE IF NOT EXISTS search_documents (
+    entity VARCHAR(20) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    detail TEXT,
+    document TSVECTOR NOT NULL,
+    PRIMARY KEY (entity, entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_search_documents_document ON search_documents USING gin (document);
+
+-- Words of a column as a weighted tsvector. Punctuation separates words on
+-- both sides of the match (search_query() in routes/search.py splits the
+-- same way), so INV-2024-001 is found by "2024-00" and an email by its
+-- domain. The 'simple' configuration leaves codes and names unstemmed.
+CREATE OR REPLACE FUNCTION search_words(value TEXT, weight "char")
+RETURNS TSVECTOR AS $$
+    SELECT setweight(to_tsvector('simple', regexp_replace(coalesce(value, ''), '[\W_]+', ' ', 'g')), weight)
+$$ language 'sql' IMMUTABLE;
+
+-- What is searchable, defined once for the triggers and the backfill.
+-- Identifiers (A) rank over names (B) over the rest (C).
+CREATE OR REPLACE VIEW search_sources AS
+SELECT 'customer'::VARCHAR(20) AS entity, id AS entity_id, name::TEXT AS label, email::TEXT AS detail,
+       search_words(name, 'A') || search_words(concat_ws(' ', contact_name, email, contact_email), 'B') ||
+       search_words(category, 'C') AS document
+FROM customers
+UNION ALL
+SELECT 'supplier', id, name, email,
+       search_words(name, 'A') || search_words(concat_ws(' ', contact_name, email, contact_email), 'B') ||
+       search_words(category, 'C')
+FROM suppliers
+UNION ALL
+SELECT 'project', id, name, project_id,
+       search_words(project_id, 'A') || search_words(name, 'B') || search_words(end_user, 'C')
+FROM projects
+UNION ALL
+SELECT 'quote', id, name, job_id,
+       search_words(job_id, 'A') || search_words(name, 'B')
+FROM quotes
+UNION ALL
+SELECT 'account', id, name, invoice_number,
+       search_words(invoice_number, 'A') || search_words(name, 'B') || search_words(comments, 'C')
+FROM customer_accounts;
+
+-- TG_ARGV[0] is the entity the table's rows are indexed as
+CREATE OR REPLACE FUNCTION search_documents_after_write()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO search_documents (entity, entity_id, label, detail, document)
+    SELECT entity, entity_id, label, detail, document FROM search_sources
+    WHERE entity = TG_ARGV[0] AND entity_id IN (SELECT id FROM new_rows)
+    ON CONFLICT (entity, entity_id) DO UPDATE
+    SET label = EXCLUDED.label, detail = EXCLUDED.detail, document = EXCLUDED.document
+    -- Updates that touch no searchable column leave the document alone
+    WHERE (search_documents.label, search_documents.detail, search_documents.document)
+          IS DISTINCT FROM (EXCLUDED.label, EXCLUDED.detail, EXCLUDED.document);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION search_documents_after_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM search_documents
+    WHERE entity = TG_ARGV[0] AND entity_id IN (SELECT id FROM old_rows);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION search_documents_after_truncate()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM search_documents WHERE entity = TG_ARGV[0];
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Attach the triggers and index the existing rows with writers locked out,
+-- as track_table_stats does
+CREATE OR REPLACE FUNCTION track_search_documents(tracked regclass, entity_name TEXT)
+RETURNS VOID AS $$
+DECLARE
+    name TEXT := (SELECT relname FROM pg_class WHERE oid = tracked);
+BEGIN
+    EXECUTE format('LOCK TABLE %s IN SHARE MODE', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_search_insert', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_search_update', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_search_delete', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_search_truncate', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER INSERT ON %s REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION search_documents_after_write(%L)', name || '_search_insert', tracked, entity_name);
+    EXECUTE format('CREATE TRIGGER %I AFTER UPDATE ON %s REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION search_documents_after_write(%L)', name || '_search_update', tracked, entity_name);
+    EXECUTE format('CREATE TRIGGER %I AFTER DELETE ON %s REFERENCING OLD TABLE AS old_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION search_documents_after_delete(%L)', name || '_search_delete', tracked, entity_name);
+    EXECUTE format('CREATE TRIGGER %I AFTER TRUNCATE ON %s
+                    FOR EACH STATEMENT EXECUTE FUNCTION search_documents_after_truncate(%L)', name || '_search_truncate', tracked, entity_name);
+    DELETE FROM search_documents WHERE entity = entity_name;
+    INSERT INTO search_documents (entity, entity_id, label, detail, document)
+    SELECT entity, entity_id, label, detail, document FROM search_sources WHERE entity = entity_name;
+END;
+$$ language 'plpgsql';
+
+SELECT track_search_documents('customers', 'customer');
+SELECT track_search_documents('suppliers', 'supplier');
+SELECT track_search_documents('projects', 'project');
+SELECT track_search_documents('quotes', 'quote');
+SELECT track_search_documents('customer_accounts', 'account');
+
+-- 0007_foreign_key_indexes.sql
+
+-- Indexes for the foreign key columns and the per-customer lists.
+--
+-- /customers/{id}/projects, /quotes and /accounts filter on customer_id and
+-- order by date DESC: (customer_id, date) serves both, read backwards. The
+-- same indexes turn the ON DELETE CASCADE of a customer from a scan of each
+-- child table into an index lookup, and the engineer/salesman/project
+-- indexes do that for the ON DELETE SET NULL of users and projects.
+--
+-- The list queries join users, customers and projects only for their name;
+-- (id) INCLUDE (name) answers those lookups from the index alone.
+
+CREATE INDEX IF NOT EXISTS idx_projects_customer_id_date ON projects(customer_id, date);
+CREATE INDEX IF NOT EXISTS idx_quotes_customer_id_date ON quotes(customer_id, date);
+CREATE INDEX IF NOT EXISTS idx_customer_accounts_customer_id_date ON customer_accounts(customer_id, date);
+
+CREATE INDEX IF NOT EXISTS idx_customer_accounts_project_id ON customer_accounts(project_id);
+CREATE INDEX IF NOT EXISTS idx_projects_engineer_id ON projects(engineer_id);
+CREATE INDEX IF NOT EXISTS idx_projects_salesman_id ON projects(salesman_id);
+CREATE INDEX IF NOT EXISTS idx_quotes_engineer_id ON quotes(engineer_id);
+CREATE INDEX IF NOT EXISTS idx_quotes_salesman_id ON quotes(salesman_id);
+CREATE INDEX IF NOT EXISTS idx_customers_sales_rep_id ON customers(sales_rep_id);
+CREATE INDEX IF NOT EXISTS idx_customers_currency_id ON customers(currency_id);
+
+CREATE INDEX IF NOT EXISTS idx_users_id_name ON users(id) INCLUDE (name);
+CREATE INDEX IF NOT EXISTS idx_customers_id_name ON customers(id) INCLUDE (name);
+CREATE INDEX IF NOT EXISTS idx_projects_id_name ON projects(id) INCLUDE (name);
+
+-- 0008_reference_data_notify.sql
+
+-- Notify every app worker when a reference table changes, so each drops its
+-- cached copy (reference_cache.py) whichever worker or client made the write.
+-- The payload is the table name; notifications are delivered on commit.
+
+CREATE OR REPLACE FUNCTION notify_reference_data_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('reference_data_changed', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION track_reference_data(tracked regclass)
+RETURNS VOID AS $$
+DECLARE
+    name TEXT := (SELECT relname FROM pg_class WHERE oid = tracked);
+BEGIN
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_reference_changed', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_reference_truncated', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE ON %s
+                    FOR EACH STATEMENT EXECUTE FUNCTION notify_reference_data_changed()', name || '_reference_changed', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER TRUNCATE ON %s
+                    FOR EACH STATEMENT EXECUTE FUNCTION notify_reference_data_changed()', name || '_reference_truncated', tracked);
+END;
+$$ language 'plpgsql';
+
+SELECT track_reference_data('departments');
+SELECT track_reference_data('locations');
+SELECT track_reference_data('manufacturers');
+SELECT track_reference_data('teams');
+SELECT track_reference_data('warehouses');
+SELECT track_reference_data('commissions');
+SELECT track_reference_data('currencies');
+SELECT track_reference_data('account_types');
+
+-- 0009_conditional_get_table_stats.sql
+
+-- Conditional GETs build their ETags from table_stats versions: track the
+-- tables joined into list responses that are not tracked yet
+SELECT track_table_stats('currencies');
+SELECT track_table_stats('chart_of_accounts');
+
+-- 0010_json_timestamp.sql
+
+-- Timestamps as JSON exactly as the API's encoder writes them (responses.py,
+-- Python's isoformat()): six digits of microseconds, left out entirely when
+-- zero. to_json() trims trailing zeros instead. List responses built in
+-- Postgres (sql_json.py) pass their timestamp columns through these; every
+-- other column type they use already agrees with to_json().
+
+CREATE OR REPLACE FUNCTION json_timestamp(value timestamp)
+RETURNS json AS $$
+    SELECT to_json(to_char(value, CASE WHEN date_part('microseconds', value)::bigint % 1000000 = 0
+                                       THEN 'YYYY-MM-DD"T"HH24:MI:SS'
+                                       ELSE 'YYYY-MM-DD"T"HH24:MI:SS.US' END))
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION json_timestamp(value timestamptz)
+RETURNS json AS $$
+    SELECT to_json(to_char(value, CASE WHEN date_part('microseconds', value)::bigint % 1000000 = 0
+                                       THEN 'YYYY-MM-DD"T"HH24:MI:SSTZH:TZM'
+                                       ELSE 'YYYY-MM-DD"T"HH24:MI:SS.USTZH:TZM' END))
+$$ LANGUAGE sql STABLE;
+
+-- 0011_dashboard_summary.sql
+
+-- Row counts and amounts per bucket (a status, active or not, open or
+-- settled) for the /dashboard/summary endpoint, maintained by
+-- statement-level triggers like table_stats. Each write adds the change
+-- of its rows to the buckets they left and entered, so the dashboard reads
+-- a handful of rows instead of scanning the tables.
+
+CREATE TABLE IF NOT EXISTS summary_totals (
+    table_name VARCHAR(63) NOT NULL,
+    bucket VARCHAR(100) NOT NULL,
+    row_count BIGINT NOT NULL DEFAULT 0,
+    amount NUMERIC NOT NULL DEFAULT 0,
+    PRIMARY KEY (table_name, bucket)
+);
+
+-- TG_ARGV: the bucket and amount expressions over a row of the table
+CREATE OR REPLACE FUNCTION summary_totals_changed()
+RETURNS TRIGGER AS $$
+DECLARE
+    added TEXT := format('SELECT %s, 1, %s FROM new_rows', TG_ARGV[0], TG_ARGV[1]);
+    removed TEXT := format('SELECT %s, -1, -(%s) FROM old_rows', TG_ARGV[0], TG_ARGV[1]);
+    changes TEXT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changes := added;
+    ELSIF TG_OP = 'DELETE' THEN
+        changes := removed;
+    ELSE
+        changes := added || ' UNION ALL ' || removed;
+    END IF;
+    -- Updates that leave a bucket's totals as they were write nothing;
+    -- buckets are locked in name order so concurrent writers cannot deadlock
+    EXECUTE format(
+        'INSERT INTO summary_totals (table_name, bucket, row_count, amount)
+         SELECT %L, bucket, SUM(row_count), SUM(amount)
+         FROM (%s) changes(bucket, row_count, amount)
+         GROUP BY bucket
+         HAVING SUM(row_count) <> 0 OR SUM(amount) <> 0
+         ORDER BY bucket
+         ON CONFLICT (table_name, bucket) DO UPDATE
+         SET row_count = summary_totals.row_count + EXCLUDED.row_count,
+             amount = summary_totals.amount + EXCLUDED.amount',
+        TG_TABLE_NAME, changes
+    );
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION summary_totals_truncated()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM summary_totals WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Attach the triggers and take the initial totals with writers locked out
+CREATE OR REPLACE FUNCTION track_summary_totals(tracked regclass, bucket TEXT, amount TEXT)
+RETURNS VOID AS $$
+DECLARE
+    name TEXT := (SELECT relname FROM pg_class WHERE oid = tracked);
+BEGIN
+    EXECUTE format('LOCK TABLE %s IN SHARE MODE', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_summary_insert', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_summary_update', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_summary_delete', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_summary_truncate', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER INSERT ON %s REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION summary_totals_changed(%L, %L)',
+                   name || '_summary_insert', tracked, bucket, amount);
+    EXECUTE format('CREATE TRIGGER %I AFTER UPDATE ON %s REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION summary_totals_changed(%L, %L)',
+                   name || '_summary_update', tracked, bucket, amount);
+    EXECUTE format('CREATE TRIGGER %I AFTER DELETE ON %s REFERENCING OLD TABLE AS old_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION summary_totals_changed(%L, %L)',
+                   name || '_summary_delete', tracked, bucket, amount);
+    EXECUTE format('CREATE TRIGGER %I AFTER TRUNCATE ON %s
+                    FOR EACH STATEMENT EXECUTE FUNCTION summary_totals_truncated()',
+                   name || '_summary_truncate', tracked);
+    DELETE FROM summary_totals WHERE table_name = name;
+    EXECUTE format('INSERT INTO summary_totals (table_name, bucket, row_count, amount)
+                    SELECT %L, %s, COUNT(*), SUM(%s) FROM %s GROUP BY 2',
+                   name, bucket, amount, tracked);
+END;
+$$ language 'plpgsql';
+
+SELECT track_summary_totals('users', 'CASE WHEN active THEN ''active'' ELSE ''inactive'' END', '0');
+SELECT track_summary_totals('quotes', 'COALESCE(status, '''')', 'COALESCE(sell_price, 0)');
+SELECT track_summary_totals('projects', 'COALESCE(status, '''')', '0');
+SELECT track_summary_totals('customer_accounts', 'CASE WHEN outstanding > 0 THEN ''open'' ELSE ''settled'' END', 'outstanding');
+
+-- 0012_table_stats_slots.sql
+
+-- Spread each table's table_stats counters over 16 slot rows. With one row
+-- per table, every write transaction held that row's lock until it
+-- committed, so concurrent writers to a table ran one at a time. Each
+-- backend now updates the slot picked by its process id, and table_stats
+-- becomes a view summing the slots: a version still changes on every
+-- write, and readers are unchanged.
+
+-- The slot a backend's counter updates go to; summary_totals uses it too
+CREATE OR REPLACE FUNCTION counter_slot()
+RETURNS SMALLINT AS $$
+    SELECT (pg_backend_pid() % 16)::SMALLINT;
+$$ language 'sql' STABLE;
+
+CREATE TABLE IF NOT EXISTS table_stats_slots (
+    table_name VARCHAR(63) NOT NULL,
+    slot SMALLINT NOT NULL,
+    row_count BIGINT NOT NULL DEFAULT 0,
+    version BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (table_name, slot)
+);
+
+-- Slot 0 carries the counters so far; the others start at zero
+INSERT INTO table_stats_slots (table_name, slot, row_count, version)
+SELECT table_name, slot, CASE WHEN slot = 0 THEN row_count ELSE 0 END, CASE WHEN slot = 0 THEN version ELSE 0 END
+FROM table_stats CROSS JOIN generate_series(0, 15) slot;
+
+DROP TABLE table_stats;
+
+CREATE VIEW table_stats AS
+SELECT table_name, SUM(row_count)::BIGINT AS row_count, SUM(version)::BIGINT AS version
+FROM table_stats_slots
+GROUP BY table_name;
+
+CREATE OR REPLACE FUNCTION table_stats_after_insert()
+RETURNS TRIGGER AS $$
+DECLARE
+    inserted BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO inserted FROM new_rows;
+    IF inserted > 0 THEN
+        UPDATE table_stats_slots SET row_count = row_count + inserted, version = version + 1
+        WHERE table_name = TG_TABLE_NAME AND slot = counter_slot();
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION table_stats_after_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM new_rows) THEN
+        UPDATE table_stats_slots SET version = version + 1
+        WHERE table_name = TG_TABLE_NAME AND slot = counter_slot();
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION table_stats_after_delete()
+RETURNS TRIGGER AS $$
+DECLARE
+    deleted BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO deleted FROM old_rows;
+    IF deleted > 0 THEN
+        UPDATE table_stats_slots SET row_count = row_count - deleted, version = version + 1
+        WHERE table_name = TG_TABLE_NAME AND slot = counter_slot();
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- TRUNCATE already locks writers out of the table, so taking every slot is free
+CREATE OR REPLACE FUNCTION table_stats_after_truncate()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE table_stats_slots SET row_count = 0, version = version + 1 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- As in 0004, but the initial count goes to slot 0 and the version keeps
+-- growing across re-tracking, so no ETag or cached count comes back
+CREATE OR REPLACE FUNCTION track_table_stats(tracked regclass)
+RETURNS VOID AS $$
+DECLARE
+    name TEXT := (SELECT relname FROM pg_class WHERE oid = tracked);
+    previous BIGINT;
+BEGIN
+    EXECUTE format('LOCK TABLE %s IN SHARE MODE', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_stats_insert', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_stats_update', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_stats_delete', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_stats_truncate', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER INSERT ON %s REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION table_stats_after_insert()', name || '_stats_insert', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER UPDATE ON %s REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION table_stats_after_update()', name || '_stats_update', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER DELETE ON %s REFERENCING OLD TABLE AS old_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION table_stats_after_delete()', name || '_stats_delete', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER TRUNCATE ON %s
+                    FOR EACH STATEMENT EXECUTE FUNCTION table_stats_after_truncate()', name || '_stats_truncate', tracked);
+    previous := COALESCE((SELECT SUM(version) FROM table_stats_slots WHERE table_name = name), 0);
+    DELETE FROM table_stats_slots WHERE table_name = name;
+    EXECUTE format('INSERT INTO table_stats_slots (table_name, slot, row_count, version)
+                    SELECT %L, slot, CASE WHEN slot = 0 THEN total ELSE 0 END, CASE WHEN slot = 0 THEN %s + 1 ELSE 0 END
+                    FROM (SELECT COUNT(*) AS total FROM %s) counted CROSS JOIN generate_series(0, 15) slot',
+                   name, previous, tracked);
+END;
+$$ language 'plpgsql';
+
+-- 0013_summary_totals_slots.sql
+
+-- Spread summary_totals over the same 16 slots as table_stats (0012):
+-- writers to a bucket no longer wait on each other's row lock, and
+-- summary_totals becomes a view summing each bucket's slots.
+
+CREATE TABLE IF NOT EXISTS summary_totals_slots (
+    table_name VARCHAR(63) NOT NULL,
+    bucket VARCHAR(100) NOT NULL,
+    slot SMALLINT NOT NULL,
+    row_count BIGINT NOT NULL DEFAULT 0,
+    amount NUMERIC NOT NULL DEFAULT 0,
+    PRIMARY KEY (table_name, bucket, slot)
+);
+
+INSERT INTO summary_totals_slots (table_name, bucket, slot, row_count, amount)
+SELECT table_name, bucket, 0, row_count, amount FROM summary_totals;
+
+DROP TABLE summary_totals;
+
+CREATE VIEW summary_totals AS
+SELECT table_name, bucket, SUM(row_count)::BIGINT AS row_count, SUM(amount) AS amount
+FROM summary_totals_slots
+GROUP BY table_name, bucket;
+
+-- As in 0011, into this backend's slot; slot rows are created on first use
+CREATE OR REPLACE FUNCTION summary_totals_changed()
+RETURNS TRIGGER AS $$
+DECLARE
+    added TEXT := format('SELECT %s, 1, %s FROM new_rows', TG_ARGV[0], TG_ARGV[1]);
+    removed TEXT := format('SELECT %s, -1, -(%s) FROM old_rows', TG_ARGV[0], TG_ARGV[1]);
+    changes TEXT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changes := added;
+    ELSIF TG_OP = 'DELETE' THEN
+        changes := removed;
+    ELSE
+        changes := added || ' UNION ALL ' || removed;
+    END IF;
+    -- Updates that leave a bucket's totals as they were write nothing;
+    -- buckets are locked in name order so concurrent writers cannot deadlock
+    EXECUTE format(
+        'INSERT INTO summary_totals_slots (table_name, bucket, slot, row_count, amount)
+         SELECT %L, bucket, counter_slot(), SUM(row_count), SUM(amount)
+         FROM (%s) changes(bucket, row_count, amount)
+         GROUP BY bucket
+         HAVING SUM(row_count) <> 0 OR SUM(amount) <> 0
+         ORDER BY bucket
+         ON CONFLICT (table_name, bucket, slot) DO UPDATE
+         SET row_count = summary_totals_slots.row_count + EXCLUDED.row_count,
+             amount = summary_totals_slots.amount + EXCLUDED.amount',
+        TG_TABLE_NAME, changes
+    );
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION summary_totals_truncated()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM summary_totals_slots WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- As in 0011, with the initial totals in slot 0
+CREATE OR REPLACE FUNCTION track_summary_totals(tracked regclass, bucket TEXT, amount TEXT)
+RETURNS VOID AS $$
+DECLARE
+    name TEXT := (SELECT relname FROM pg_class WHERE oid = tracked);
+BEGIN
+    EXECUTE format('LOCK TABLE %s IN SHARE MODE', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_summary_insert', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_summary_update', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_summary_delete', tracked);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', name || '_summary_truncate', tracked);
+    EXECUTE format('CREATE TRIGGER %I AFTER INSERT ON %s REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION summary_totals_changed(%L, %L)',
+                   name || '_summary_insert', tracked, bucket, amount);
+    EXECUTE format('CREATE TRIGGER %I AFTER UPDATE ON %s REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION summary_totals_changed(%L, %L)',
+                   name || '_summary_update', tracked, bucket, amount);
+    EXECUTE format('CREATE TRIGGER %I AFTER DELETE ON %s REFERENCING OLD TABLE AS old_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION summary_totals_changed(%L, %L)',
+                   name || '_summary_delete', tracked, bucket, amount);
+    EXECUTE format('CREATE TRIGGER %I AFTER TRUNCATE ON %s
+                    FOR EACH STATEMENT EXECUTE FUNCTION summary_totals_truncated()',
+                   name || '_summary_truncate', tracked);
+    DELETE FROM summary_totals_slots WHERE table_name = name;
+    EXECUTE format('INSERT INTO summary_totals_slots (table_name, bucket, slot, row_count, amount)
+                    SELECT %L, %s, 0, COUNT(*), SUM(%s) FROM %s GROUP BY 2',
+                   name, bucket, amount, tracked);
+END;
+$$ language 'plpgsql';
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    checksum CHAR(64) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    duration_ms INTEGER
+);
+
+INSERT INTO schema_migrations (version, name, checksum) VALUES
+(1, '0001_initial_schema.sql', '2203dec0c69e504a65e7a5b36de6f91cc53842a9e7ffc8f6c80b03c857293762'),
+(2, '0002_keyset_pagination_indexes.sql', 'a848b6282645c581d958fe346d5b85d063ec079612f2f19f8e311a9410d66b9b'),
+(3, '0003_list_sort_indexes.sql', '31e6a60e6fc0b52c01c874804c4eabf02976730b3501a9d50e39263c997e91e0'),
+(4, '0004_table_stats.sql', 'dc4aabfed9a12f4189537d272cd7276af4e63a21b579882567b8f204a0c52ab0'),
+(5, '0005_trigram_search_indexes.sql', 'a24bae956eda0bf3154b679c5ba0aa1f0ea9ee70e2a4734e31b0453066b24757'),
+(6, '0006_search_documents.sql', '52a888c14ddc841556928265bf4bc5f0065e48113ace18964773082740a09005'),
+(7, '0007_foreign_key_indexes.sql', '9d74a7641d3feb6a0a8962fde9d557b554dd1ce602a0c61ce30012fdd2962d42'),
+(8, '0008_reference_data_notify.sql', '2a660a00682d513a16f5ead13b2b5635a77d7cc7d16206e80dd76dc0b5bb6b6f'),
+(9, '0009_conditional_get_table_stats.sql', '364f4439ec22edb043613c87c79b9e379ca33cec2dfbe13bea407a877630f471'),
+(10, '0010_json_timestamp.sql', '6c326b24236edf94e39f23ab686c8af8dc9ae579a45b13ddf84dbea02fd56bb5'),
+(11, '0011_dashboard_summary.sql', 'ae7dfc46f26f273a1bb0f4a3d4ede3332343aab12e04693fdc00557691880a9b'),
+(12, '0012_table_stats_slots.sql', '28479a633a2422fc7fd896d7d09b1298dd95a307188790d6b37520c9721feeea'),
+(13, '0013_summary_totals_slots.sql', 'b7b3083f57d849773f76a1277b3916d127347dd894d929a86ddb78c52afacb3a')
+ON CONFLICT (version) DO NOTHING;
@@ -15,6 +15,7 @@ import type {
 export const queryKeys = {
   users: ['users'] as const,
   activeUsersCount: ['users', 'active-count'] as const,
+  dashboardSummary: ['dashboard', 'summary'] as const,
   customers: ['customers'] as const,
   suppliers: ['suppliers'] as const,
   currencies: ['currencies'] as const,
@@ -46,6 +47,14 @@ export const useActiveUsersCount = () => {
   });
 };
 
+// Dashboard Query
+export const useDashboardSummary = () => {
+  return useQuery({
+    queryKey: queryKeys.dashboardSummary,
+    queryFn: apiService.getDashboardSummary,
+  });
+};
+
 // Paginated Users Query
 export const usePaginatedUsers = (params: PaginationParams) => {
   return useQuery({
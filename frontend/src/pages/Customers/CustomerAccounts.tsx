@@ -36,9 +36,11 @@ const { RangePicker } = DatePicker;
 
 interface CustomerAccountsProps {
   customerId: number;
+  // Rows already loaded with the customer workspace; fetched here otherwise
+  initialAccounts?: CustomerAccount[];
 }
 
-const CustomerAccounts: React.FC<CustomerAccountsProps> = ({ customerId }) => {
+const CustomerAccounts: React.FC<CustomerAccountsProps> = ({ customerId, initialAccounts }) => {
   const [accounts, setAccounts] = useState<CustomerAccount[]>([]);
   const [filteredAccounts, setFilteredAccounts] = useState<CustomerAccount[]>([]);
   const [loading, setLoading] = useState(false);
@@ -195,8 +197,13 @@ const CustomerAccounts: React.FC<CustomerAccountsProps> = ({ customerId }) => {
   };
 
   useEffect(() => {
-    fetchAccounts();
-  }, [customerId]);
+    if (initialAccounts) {
+      setAccounts(initialAccounts);
+      setFilteredAccounts(initialAccounts);
+    } else {
+      fetchAccounts();
+    }
+  }, [customerId, initialAccounts]);
 
   useEffect(() => {
     applyFilters();
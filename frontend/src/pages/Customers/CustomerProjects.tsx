@@ -33,9 +33,11 @@ const { RangePicker } = DatePicker;
 
 interface CustomerProjectsProps {
   customerId: number;
+  // Rows already loaded with the customer workspace; fetched here otherwise
+  initialProjects?: Project[];
 }
 
-const CustomerProjects: React.FC<CustomerProjectsProps> = ({ customerId }) => {
+const CustomerProjects: React.FC<CustomerProjectsProps> = ({ customerId, initialProjects }) => {
   const [projects, setProjects] = useState<Project[]>([]);
   const [filteredProjects, setFilteredProjects] = useState<Project[]>([]);
   const [loading, setLoading] = useState(false);
@@ -61,8 +63,13 @@ const CustomerProjects: React.FC<CustomerProjectsProps> = ({ customerId }) => {
   };
 
   useEffect(() => {
-    fetchProjects();
-  }, [customerId]);
+    if (initialProjects) {
+      setProjects(initialProjects);
+      setFilteredProjects(initialProjects);
+    } else {
+      fetchProjects();
+    }
+  }, [customerId, initialProjects]);
 
   const fetchProjects = async () => {
     setLoading(true);
@@ -33,9 +33,11 @@ const { RangePicker } = DatePicker;
 
 interface CustomerQuotesProps {
   customerId: number;
+  // Rows already loaded with the customer workspace; fetched here otherwise
+  initialQuotes?: Quote[];
 }
 
-const CustomerQuotes: React.FC<CustomerQuotesProps> = ({ customerId }) => {
+const CustomerQuotes: React.FC<CustomerQuotesProps> = ({ customerId, initialQuotes }) => {
   const [quotes, setQuotes] = useState<Quote[]>([]);
   const [filteredQuotes, setFilteredQuotes] = useState<Quote[]>([]);
   const [loading, setLoading] = useState(false);
@@ -61,8 +63,13 @@ const CustomerQuotes: React.FC<CustomerQuotesProps> = ({ customerId }) => {
   };
 
   useEffect(() => {
-    fetchQuotes();
-  }, [customerId]);
+    if (initialQuotes) {
+      setQuotes(initialQuotes);
+      setFilteredQuotes(initialQuotes);
+    } else {
+      fetchQuotes();
+    }
+  }, [customerId, initialQuotes]);
 
   const fetchQuotes = async () => {
     setLoading(true);
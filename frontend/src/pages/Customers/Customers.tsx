@@ -9,7 +9,7 @@ import {
 } from 'antd';
 import { PlusOutlined, UserOutlined } from '@ant-design/icons';
 import { apiService } from '../../api';
-import type { Customer } from '../../api';
+import type { Customer, CustomerWorkspace } from '../../api';
 import { useErrorHandler } from '../../hooks/useErrorHandler';
 import ErrorToast from '../../components/ErrorDisplay/ErrorToast';
 import CustomerInfo from './CustomerInfo';
@@ -24,6 +24,7 @@ const { TabPane } = Tabs;
 const Customers: React.FC = () => {
   const [customers, setCustomers] = useState<Customer[]>([]);
   const [selectedCustomer, setSelectedCustomer] = useState<Customer | null>(null);
+  const [workspace, setWorkspace] = useState<CustomerWorkspace | null>(null);
   const [loading, setLoading] = useState(false);
   const [showAddModal, setShowAddModal] = useState(false);
 
@@ -49,6 +50,25 @@ const Customers: React.FC = () => {
     fetchCustomers();
   }, []);
 
+  // One request for everything the tabs show
+  const fetchWorkspace = async (customerId: number) => {
+    try {
+      setWorkspace(await apiService.getCustomerWorkspace(customerId));
+    } catch (error: any) {
+      showError(error.message || 'Failed to fetch customer details');
+    }
+  };
+
+  useEffect(() => {
+    setWorkspace(null);
+    if (selectedCustomer) {
+      fetchWorkspace(selectedCustomer.id);
+    }
+  }, [selectedCustomer?.id]);
+
+  // Ignore a late response for a previously selected customer
+  const currentWorkspace = workspace && workspace.customer.id === selectedCustomer?.id ? workspace : undefined;
+
   const handleCustomerSelect = (customer: Customer) => {
     setSelectedCustomer(customer);
   };
@@ -165,13 +185,13 @@ const Customers: React.FC = () => {
                   />
                 </TabPane>
                 <TabPane tab="Quotes" key="quotes">
-                  <CustomerQuotes customerId={selectedCustomer.id} />
+                  <CustomerQuotes customerId={selectedCustomer.id} initialQuotes={currentWorkspace?.quotes} />
                 </TabPane>
                 <TabPane tab="Accounts" key="accounts">
-                  <CustomerAccounts customerId={selectedCustomer.id} />
+                  <CustomerAccounts customerId={selectedCustomer.id} initialAccounts={currentWorkspace?.accounts} />
                 </TabPane>
                 <TabPane tab="Projects" key="projects">
-                  <CustomerProjects customerId={selectedCustomer.id} />
+                  <CustomerProjects customerId={selectedCustomer.id} initialProjects={currentWorkspace?.projects} />
                 </TabPane>
               </Tabs>
             </Card>
@@ -1,8 +1,8 @@
 import React, { useState } from 'react';
 import { Card, Typography, Space, Input, Table, Row, Col, Statistic, Alert } from 'antd';
-import { SearchOutlined, UserOutlined, TeamOutlined, BankOutlined } from '@ant-design/icons';
+import { SearchOutlined, UserOutlined, TeamOutlined, BankOutlined, ShopOutlined, FileTextOutlined, ProjectOutlined, DollarOutlined } from '@ant-design/icons';
 import type { User } from '../api';
-import { useUsers, useActiveUsersCount } from '../hooks/useApiQueries';
+import { useUsers, useDashboardSummary } from '../hooks/useApiQueries';
 
 const { Title } = Typography;
 const { Search } = Input;
@@ -12,7 +12,7 @@ const Dashboard: React.FC = () => {
 
   // Use React Query hooks
   const { data: users = [], isLoading: usersLoading, error: usersError } = useUsers();
-  const { data: activeUsersCount = 0, isLoading: activeCountLoading } = useActiveUsersCount();
+  const { data: summary, isLoading: summaryLoading } = useDashboardSummary();
 
   // Filter users based on search
   const filteredUsers = React.useMemo(() => {
@@ -25,7 +25,7 @@ const Dashboard: React.FC = () => {
     );
   }, [users, searchText]);
 
-  const loading = usersLoading || activeCountLoading;
+  const loading = usersLoading || summaryLoading;
 
   // Handle search functionality - search by name OR email
   const handleSearch = (value: string) => {
@@ -88,7 +88,7 @@ const Dashboard: React.FC = () => {
               <Card role="region" aria-label="Total Users Statistics">
                 <Statistic
                   title="Total Users"
-                  value={users.length}
+                  value={summary?.users.total ?? users.length}
                   prefix={<UserOutlined aria-hidden="true" />}
                   valueStyle={{ color: '#3f8600' }}
                 />
@@ -98,7 +98,7 @@ const Dashboard: React.FC = () => {
               <Card role="region" aria-label="Active Users Statistics">
                 <Statistic
                   title="Active Users"
-                  value={activeUsersCount}
+                  value={summary?.users.active ?? 0}
                   prefix={<TeamOutlined aria-hidden="true" />}
                   valueStyle={{ color: '#1890ff' }}
                 />
@@ -125,6 +125,51 @@ const Dashboard: React.FC = () => {
               </Card>
             </Col>
           </Row>
+          <Row gutter={16} className="mt-4">
+            <Col span={6}>
+              <Card role="region" aria-label="Customers Statistics">
+                <Statistic
+                  title="Customers"
+                  value={summary?.customers.total ?? 0}
+                  prefix={<ShopOutlined aria-hidden="true" />}
+                  loading={summaryLoading}
+                />
+              </Card>
+            </Col>
+            <Col span={6}>
+              <Card role="region" aria-label="Open Quotes Statistics">
+                <Statistic
+                  title={`Open Quotes (${summary?.quotes.open ?? 0})`}
+                  value={summary?.quotes.pipeline_value ?? 0}
+                  precision={2}
+                  prefix={<FileTextOutlined aria-hidden="true" />}
+                  loading={summaryLoading}
+                />
+              </Card>
+            </Col>
+            <Col span={6}>
+              <Card role="region" aria-label="Active Projects Statistics">
+                <Statistic
+                  title="Active Projects"
+                  value={summary?.projects.active ?? 0}
+                  prefix={<ProjectOutlined aria-hidden="true" />}
+                  loading={summaryLoading}
+                />
+              </Card>
+            </Col>
+            <Col span={6}>
+              <Card role="region" aria-label="Outstanding Receivables Statistics">
+                <Statistic
+                  title={`Outstanding Receivables (${summary?.receivables.open_invoices ?? 0} invoices)`}
+                  value={summary?.receivables.outstanding ?? 0}
+                  precision={2}
+                  prefix={<DollarOutlined aria-hidden="true" />}
+                  valueStyle={{ color: '#cf1322' }}
+                  loading={summaryLoading}
+                />
+              </Card>
+            </Col>
+          </Row>
         </section>
 
         {/* Users Table */}
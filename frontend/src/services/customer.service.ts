@@ -9,7 +9,8 @@ import type {
   SupplierCreate,
   Quote,
   Project,
-  CustomerAccount
+  CustomerAccount,
+  CustomerWorkspace
 } from '../types';
 
 export const customerService = {
@@ -35,6 +36,12 @@ export const customerService = {
   },
 
   // Customer-specific data
+  // The customer with its quotes, projects, accounts and totals, in one request
+  getCustomerWorkspace: async (customerId: number): Promise<CustomerWorkspace> => {
+    const response = await apiClient.get(`/customers/${customerId}/workspace`);
+    return response.data;
+  },
+
   getCustomerQuotes: async (customerId: number): Promise<Quote[]> => {
     const response = await apiClient.get(`/customers/${customerId}/quotes`);
     return response.data.quotes;
@@ -0,0 +1,13 @@
+/**
+ * Dashboard API service
+ */
+import apiClient from './api-client';
+import type { DashboardSummary } from '../types';
+
+export const dashboardService = {
+  // Counts and totals kept up to date by the database, not computed from lists
+  getDashboardSummary: async (): Promise<DashboardSummary> => {
+    const response = await apiClient.get('/dashboard/summary');
+    return response.data;
+  },
+};
@@ -11,6 +11,7 @@ import { customerService } from './customer.service';
 import { projectService } from './project.service';
 import { fileService } from './file.service';
 import { healthService } from './health.service';
+import { dashboardService } from './dashboard.service';
 
 // Export individual services for modular imports
 export { userService } from './user.service';
@@ -20,6 +21,7 @@ export { customerService } from './customer.service';
 export { projectService } from './project.service';
 export { fileService } from './file.service';
 export { healthService } from './health.service';
+export { dashboardService } from './dashboard.service';
 export { default as apiClient } from './api-client';
 
 // Backward compatibility: Combined apiService object
@@ -44,6 +46,9 @@ export const apiService = {
 
   // Quotes, Projects, Accounts
   ...projectService,
+
+  // Dashboard
+  ...dashboardService,
 };
 
 // Default export for backward compatibility
@@ -0,0 +1,22 @@
+/**
+ * Dashboard type definitions
+ */
+
+export interface QuoteStatusTotal {
+  status: string | null;
+  count: number;
+  value: number;
+}
+
+export interface ProjectStatusTotal {
+  status: string | null;
+  count: number;
+}
+
+export interface DashboardSummary {
+  users: { total: number; active: number };
+  customers: { total: number };
+  quotes: { open: number; pipeline_value: number; by_status: QuoteStatusTotal[] };
+  projects: { active: number; by_status: ProjectStatusTotal[] };
+  receivables: { open_invoices: number; outstanding: number };
+}
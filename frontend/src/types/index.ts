@@ -11,3 +11,4 @@ export * from './accounting';
 export * from './business';
 export * from './customer';
 export * from './project';
+export * from './dashboard';
@@ -2,6 +2,7 @@
  * Project, Quote, and Account type definitions
  */
 import type { BaseEntity } from './common';
+import type { Customer } from './customer';
 
 export interface Quote extends BaseEntity {
   job_id: string;
@@ -78,3 +79,21 @@ export interface CustomerAccountCreate {
   reminder_date?: string;
   comments?: string;
 }
+
+export interface CustomerWorkspaceSummary {
+  quote_count: number;
+  quoted_total: number;
+  project_count: number;
+  active_project_count: number;
+  invoice_count: number;
+  invoiced_total: number;
+  outstanding_total: number;
+}
+
+export interface CustomerWorkspace {
+  customer: Customer;
+  quotes: Quote[];
+  projects: Project[];
+  accounts: CustomerAccount[];
+  summary: CustomerWorkspaceSummary;
+}
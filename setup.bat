@@ -27,8 +27,8 @@ echo.
 echo Setup completed successfully!
 echo.
 echo Next steps:
-echo 1. Set up MySQL database and run: mysql -u root -p ^< database/schema.sql
-echo 2. Update backend/.env with your database credentials
+echo 1. Set up a PostgreSQL database and update backend/.env with its credentials
+echo 2. Apply the migrations: cd backend ^&^& python migrate.py
 echo 3. Start backend: cd backend ^&^& python main.py
 echo 4. Start frontend: cd frontend ^&^& npm run dev
 echo.